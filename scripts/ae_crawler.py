@@ -0,0 +1,442 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import traceback
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlparse
+import httpx
+from bs4 import BeautifulSoup
+
+
+## Constants
+DEFAULT_DB_PATH = "data/asli_engineering/ae_crawl.db"
+DEFAULT_WORKERS = 16
+DEFAULT_PER_HOST_LIMIT = 4
+REQUEST_TIMEOUT_SECONDS = 15
+MAX_FETCH_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 1.0
+USER_AGENT = "Mozilla/5.0 (compatible; ae-kb-builder/1.0)"
+YOUTUBE_HOSTS = ("youtube.com", "www.youtube.com", "m.youtube.com", "youtu.be")
+
+## Page statuses
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class Seed:
+    """
+    A crawl entry point.
+
+    Links are followed up to `max_depth` hops from the seed; `follow`
+    decides whether a link found at a given depth is enqueued.
+    """
+
+    url: str
+    max_depth: int = 1
+    follow: Callable[[str, int], bool] = lambda url, depth: True
+
+
+def _follow_knowledge_base(url: str, depth: int) -> bool:
+    # Topic pages under /knowledge-base, then every page they link to.
+    if depth == 1:
+        return "knowledge-base" in url and "drive.google.com" not in url
+    return True
+
+
+AE_SEEDS = [
+    Seed("https://arpitbhayani.me/", max_depth=0),
+    Seed("https://arpitbhayani.me/blogs", max_depth=1),
+    Seed("https://arpitbhayani.me/knowledge-base", max_depth=2, follow=_follow_knowledge_base),
+]
+
+
+@dataclass
+class CrawlStats:
+    fetched: int = 0
+    not_modified: int = 0
+    unchanged: int = 0
+    changed: int = 0
+    failed: int = 0
+    started_at: float = field(default_factory=time.time)
+
+    def summary(self) -> str:
+        return (
+            f"{self.fetched} fetched ({self.changed} new/changed, {self.unchanged} unchanged), "
+            f"{self.not_modified} not modified (304), {self.failed} failed "
+            f"in {time.time() - self.started_at:.1f}s"
+        )
+
+
+def normalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """Resolves a link against its page and drops fragments; None for non-HTTP links."""
+    url = urldefrag(urljoin(base, url) if base else url)[0]
+    return url if urlparse(url).scheme in ("http", "https") else None
+
+
+def is_youtube(url: str) -> bool:
+    return urlparse(url).netloc in YOUTUBE_HOSTS
+
+
+class Frontier:
+    """
+    The persistent crawl state, in SQLite.
+
+    Every known URL has a row with its status, depth, validators (ETag and
+    Last-Modified), content hash, body and outgoing links. A crawl run marks
+    pages as pending and only finishes once none are left, so an interrupted
+    crawl resumes where it stopped, and a later run re-validates pages with
+    conditional requests instead of downloading them again. A page that fails
+    during a refresh keeps its last good body, so it is served unchanged
+    rather than dropped from the knowledge base.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS pages
+               (url TEXT PRIMARY KEY, seed TEXT, depth INTEGER, status TEXT, run_id INTEGER,
+                http_status INTEGER, etag TEXT, last_modified TEXT, content_hash TEXT,
+                body TEXT, links TEXT, fetched_at REAL, changed_at REAL, error TEXT)"""
+        )
+        page_columns = [row[1] for row in self.conn.execute("PRAGMA table_info(pages)")]
+        if "budget" not in page_columns:
+            self.conn.execute("ALTER TABLE pages ADD COLUMN budget INTEGER")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_status ON pages (status)")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS runs
+               (id INTEGER PRIMARY KEY AUTOINCREMENT, started_at REAL, finished_at REAL,
+                abandoned_at REAL)"""
+        )
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(runs)")]
+        if "abandoned_at" not in columns:
+            self.conn.execute("ALTER TABLE runs ADD COLUMN abandoned_at REAL")
+        self.conn.commit()
+
+    def start_run(self, resume: bool = True) -> Tuple[int, bool]:
+        """
+        Returns (run id, resumed): the unfinished run if resuming, else a new run.
+
+        Starting a new run abandons any unfinished one, so it is never resumed later.
+        """
+        if resume:
+            row = self.conn.execute(
+                """SELECT id FROM runs WHERE finished_at IS NULL AND abandoned_at IS NULL
+                   ORDER BY id DESC LIMIT 1"""
+            ).fetchone()
+            if row:
+                return row[0], True
+        self.conn.execute(
+            "UPDATE runs SET abandoned_at = ? WHERE finished_at IS NULL AND abandoned_at IS NULL",
+            (time.time(),),
+        )
+        cursor = self.conn.execute("INSERT INTO runs (started_at) VALUES (?)", (time.time(),))
+        self.conn.commit()
+        return cursor.lastrowid, False
+
+    def finish_run(self, run_id: int) -> None:
+        self.conn.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), run_id))
+        self.conn.commit()
+
+    def enqueue(self, url: str, seed: str, depth: int, run_id: int, budget: int) -> bool:
+        """
+        Marks a URL pending for this run under a seed.
+
+        `budget` is how many more hops the seed may follow from this page
+        (`seed.max_depth - depth`). A URL already queued in this run is only
+        queued again, under the new seed, when that leaves it more hops to
+        follow, so the result does not depend on which seed reaches it first.
+
+        Returns:
+            bool: False if the URL is already handled in this run with at least this budget.
+        """
+        row = self.conn.execute("SELECT run_id, budget FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            self.conn.execute(
+                "INSERT INTO pages (url, seed, depth, budget, status, run_id) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, seed, depth, budget, PENDING, run_id),
+            )
+            return True
+        if row[0] == run_id and row[1] is not None and row[1] >= budget:
+            return False
+        self.conn.execute(
+            "UPDATE pages SET seed = ?, depth = ?, budget = ?, status = ?, run_id = ? WHERE url = ?",
+            (seed, depth, budget, PENDING, run_id, url),
+        )
+        return True
+
+    def retry_failed(self, run_id: int) -> None:
+        """Re-queues the run's failed pages, e.g. requests cut off by an interruption."""
+        self.conn.execute(
+            "UPDATE pages SET status = ? WHERE status = ? AND run_id = ?", (PENDING, FAILED, run_id)
+        )
+        self.conn.commit()
+
+    def pending(self, run_id: int) -> List[Tuple[str, str, int]]:
+        return self.conn.execute(
+            "SELECT url, seed, depth FROM pages WHERE status = ? AND run_id = ?", (PENDING, run_id)
+        ).fetchall()
+
+    def validators(self, url: str) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
+        """Returns (etag, last_modified, content_hash, links) stored for a URL."""
+        row = self.conn.execute(
+            "SELECT etag, last_modified, content_hash, links FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+        return row if row else (None, None, None, None)
+
+    def save(self, url: str, **columns) -> None:
+        assignments = ", ".join(f"{name} = ?" for name in columns)
+        self.conn.execute(f"UPDATE pages SET {assignments} WHERE url = ?", (*columns.values(), url))
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def latest_run(self) -> Optional[int]:
+        row = self.conn.execute(
+            "SELECT id FROM runs WHERE finished_at IS NOT NULL ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        return row[0] if row else None
+
+    def page_index(self, run_id: Optional[int] = None) -> List[Tuple[str, str, float]]:
+        """
+        Returns (url, content_hash, changed_at) for the pages of a run, in URL order.
+
+        Pages that a later run no longer reaches are left out, while pages that
+        failed in the run are included with their last good body. Defaults to
+        the latest finished run.
+        """
+        run_id = run_id if run_id is not None else self.latest_run()
+        return self.conn.execute(
+            """SELECT url, content_hash, changed_at FROM pages
+               WHERE status IN (?, ?) AND run_id = ? AND body IS NOT NULL ORDER BY url""",
+            (DONE, FAILED, run_id),
+        ).fetchall()
+
+    def body(self, url: str) -> Optional[str]:
+        row = self.conn.execute("SELECT body FROM pages WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+
+def extract_links(html: str, base_url: str) -> List[str]:
+    soup = BeautifulSoup(html, "html.parser")
+    links = (normalize_url(a.get("href"), base_url) for a in soup.find_all("a") if a.get("href"))
+    return list(dict.fromkeys(link for link in links if link))
+
+
+def fetch_youtube_transcript(url: str) -> str:
+    from youtube_transcript_api import YouTubeTranscriptApi
+    from youtube_transcript_api.formatters import TextFormatter
+
+    parsed = urlparse(url)
+    video_id = parsed.path.lstrip("/") if parsed.netloc == "youtu.be" else url.split("=")[-1]
+    transcript = YouTubeTranscriptApi.get_transcript(video_id)
+    return TextFormatter().format_transcript(transcript)
+
+
+class Crawler:
+    """
+    A concurrent, resumable crawler over an httpx keep-alive connection pool.
+
+    A fixed number of asyncio workers pull URLs from a queue. A per-host
+    semaphore caps concurrent requests to any one site, and every request
+    for an already-known page carries If-None-Match / If-Modified-Since, so
+    unchanged pages come back as an empty 304.
+    """
+
+    def __init__(
+        self,
+        frontier: Frontier,
+        workers: int = DEFAULT_WORKERS,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    ):
+        self.frontier = frontier
+        self.workers = workers
+        self.host_limits: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(per_host_limit)
+        )
+        self.stats = CrawlStats()
+
+    async def crawl(self, seeds: List[Seed] = AE_SEEDS, resume: bool = True) -> CrawlStats:
+        """
+        Crawls from the seeds, or resumes an interrupted crawl.
+
+        Args:
+            seeds (List[Seed]): The entry points and link-following rules.
+            resume (bool): Continue the last unfinished run instead of starting a new one.
+
+        Returns:
+            CrawlStats: Counters for this run.
+        """
+        self.stats = CrawlStats()
+        self.seeds = {seed.url: seed for seed in seeds}
+        self.run_id, resumed = self.frontier.start_run(resume)
+        if resumed:
+            self.frontier.retry_failed(self.run_id)
+        else:
+            for seed in seeds:
+                self.frontier.enqueue(seed.url, seed.url, 0, self.run_id, seed.max_depth)
+            self.frontier.commit()
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in self.frontier.pending(self.run_id):
+            queue.put_nowait(item)
+
+        limits = httpx.Limits(max_connections=self.workers, max_keepalive_connections=self.workers)
+        async with httpx.AsyncClient(
+            limits=limits,
+            timeout=REQUEST_TIMEOUT_SECONDS,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+        ) as client:
+            workers = [asyncio.create_task(self._worker(client, queue)) for _ in range(self.workers)]
+            await queue.join()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        self.frontier.finish_run(self.run_id)
+        return self.stats
+
+    async def _worker(self, client: httpx.AsyncClient, queue: asyncio.Queue) -> None:
+        while True:
+            url, seed_url, depth = await queue.get()
+            try:
+                try:
+                    links = await self._process(client, url)
+                except Exception as e:
+                    self._fail(url, e)
+                    # Follow the last good copy's links, so the pages below it are kept too.
+                    links = json.loads(self.frontier.validators(url)[3] or "[]")
+                seed = self.seeds.get(seed_url)
+                if seed and depth < seed.max_depth:
+                    for link in links:
+                        if seed.follow(link, depth + 1) and self.frontier.enqueue(
+                            link, seed_url, depth + 1, self.run_id, seed.max_depth - depth - 1
+                        ):
+                            queue.put_nowait((link, seed_url, depth + 1))
+            except Exception as e:
+                self._fail(url, e)
+            finally:
+                self.frontier.commit()
+                queue.task_done()
+
+    def _fail(self, url: str, error: Exception) -> None:
+        """Marks a page failed; its last good body, hash and links are left in place."""
+        traceback.print_exc()
+        self.stats.failed += 1
+        self.frontier.save(url, status=FAILED, error=str(error), fetched_at=time.time())
+
+    async def _process(self, client: httpx.AsyncClient, url: str) -> List[str]:
+        """Fetches one page, stores it and returns its outgoing links."""
+        etag, last_modified, old_hash, old_links = self.frontier.validators(url)
+        now = time.time()
+
+        if is_youtube(url):
+            # Transcripts do not change; fetch each video once.
+            if old_hash:
+                self.stats.not_modified += 1
+                self.frontier.save(url, status=DONE, fetched_at=now)
+                return []
+            body = await asyncio.to_thread(fetch_youtube_transcript, url)
+            self._store(url, 200, None, None, body, [], old_hash, now)
+            return []
+
+        headers = {}
+        if old_hash:
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        response = await self._fetch(client, url, headers)
+        if response.status_code == 304:
+            self.stats.not_modified += 1
+            self.frontier.save(url, status=DONE, http_status=304, fetched_at=now, error=None)
+            return json.loads(old_links or "[]")
+        response.raise_for_status()
+
+        body = response.text
+        links = []
+        if "html" in response.headers.get("content-type", ""):
+            links = await asyncio.to_thread(extract_links, body, str(response.url))
+        self._store(
+            url,
+            response.status_code,
+            response.headers.get("etag"),
+            response.headers.get("last-modified"),
+            body,
+            links,
+            old_hash,
+            now,
+        )
+        return links
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str, headers: Dict[str, str]) -> httpx.Response:
+        host = urlparse(url).netloc
+        for attempt in range(1, MAX_FETCH_ATTEMPTS + 1):
+            try:
+                async with self.host_limits[host]:
+                    response = await client.get(url, headers=headers)
+                if response.status_code < 500 and response.status_code != 429:
+                    return response
+                if attempt == MAX_FETCH_ATTEMPTS:
+                    return response
+            except httpx.TransportError:
+                if attempt == MAX_FETCH_ATTEMPTS:
+                    raise
+            await asyncio.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+    def _store(self, url, http_status, etag, last_modified, body, links, old_hash, now) -> None:
+        content_hash = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        self.stats.fetched += 1
+        columns = dict(
+            status=DONE,
+            http_status=http_status,
+            etag=etag,
+            last_modified=last_modified,
+            links=json.dumps(links),
+            fetched_at=now,
+            error=None,
+        )
+        if content_hash == old_hash:
+            self.stats.unchanged += 1
+        else:
+            self.stats.changed += 1
+            columns.update(content_hash=content_hash, body=body, changed_at=now)
+        self.frontier.save(url, **columns)
+
+
+def main() -> None:
+    """
+    Crawls (or refreshes) the Asli Engineering knowledge base into the frontier DB.
+
+    Args:
+        None
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Crawl the Asli Engineering knowledge base.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Frontier database path.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST_LIMIT)
+    parser.add_argument("--restart", action="store_true", help="Start a new run instead of resuming.")
+    args = parser.parse_args()
+
+    crawler = Crawler(Frontier(args.db), workers=args.workers, per_host_limit=args.per_host)
+    stats = asyncio.run(crawler.crawl(AE_SEEDS, resume=not args.restart))
+    print(f"Crawl finished: {stats.summary()}")
+
+
+if __name__ == "__main__":
+    main()
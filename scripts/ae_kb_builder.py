@@ -0,0 +1,272 @@
+import argparse
+import hashlib
+import importlib.metadata
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+from ae_crawler import DEFAULT_DB_PATH, Frontier
+
+
+## Constants
+DEFAULT_SECTIONS_DIR = "data/asli_engineering/sections"
+DEFAULT_OUTPUT_PATH = "data/asli_engineering/ae_kb.md"
+KB_HEADER = "# AE Knowledge Base\n\n"
+SECTION_PREFIX = "# http"
+MANIFEST_SUFFIX = ".manifest.json"
+COPY_BUFFER_BYTES = 1024 * 1024
+# Bump when the HTML-to-markdown conversion or cleaning rules change, so stored sections are rebuilt.
+CONVERTER_REVISION = 1
+
+
+def manifest_path(output_path: str) -> str:
+    return f"{output_path}{MANIFEST_SUFFIX}"
+
+
+def converter_tag() -> str:
+    """Identifies the conversion: the markdownify version plus our own revision."""
+    try:
+        markdownify_version = importlib.metadata.version("markdownify")
+    except importlib.metadata.PackageNotFoundError:
+        markdownify_version = "missing"
+    return f"markdownify{markdownify_version}-r{CONVERTER_REVISION}"
+
+
+@dataclass
+class Delta:
+    """What changed between two knowledge-base versions, by section URL."""
+
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    def report(self, old_name: str, new_name: str, limit: int = 20) -> str:
+        """Formats the delta as markdown."""
+        lines = [
+            f"# KB delta: {old_name} -> {new_name}",
+            "",
+            f"- Added: {len(self.added)}",
+            f"- Removed: {len(self.removed)}",
+            f"- Changed: {len(self.changed)}",
+            f"- Unchanged: {self.unchanged}",
+        ]
+        for title, urls in (("Added", self.added), ("Removed", self.removed), ("Changed", self.changed)):
+            if urls:
+                lines += ["", f"## {title}", ""] + [f"- {url}" for url in urls[:limit]]
+                if len(urls) > limit:
+                    lines.append(f"- ... and {len(urls) - limit} more")
+        return "\n".join(lines) + "\n"
+
+
+def compute_delta(old: Dict[str, str], new: Dict[str, str]) -> Delta:
+    """Compares two {section key: content hash} maps."""
+    delta = Delta()
+    for key, content_hash in new.items():
+        if key not in old:
+            delta.added.append(key)
+        elif old[key] != content_hash:
+            delta.changed.append(key)
+        else:
+            delta.unchanged += 1
+    delta.removed = [key for key in old if key not in new]
+    return delta
+
+
+def iter_kb_sections(path: str) -> Iterator[Tuple[str, str]]:
+    """
+    Streams a consolidated KB file and yields (section key, content hash).
+
+    Sections start at `# http...` heading lines. A URL that appears more than
+    once gets a numbered key (`url #2`), so repeated sections stay distinct.
+    Lines are hashed stripped and blank lines skipped, so whitespace-only
+    differences between markdownify runs do not count as changes.
+    """
+    seen: Dict[str, int] = {}
+    url, digest = None, None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith(SECTION_PREFIX):
+                if url is not None:
+                    yield url, digest.hexdigest()
+                url = line[2:].strip()
+                seen[url] = seen.get(url, 0) + 1
+                if seen[url] > 1:
+                    url = f"{url} #{seen[url]}"
+                digest = hashlib.sha256()
+            elif digest is not None and line.strip():
+                digest.update(line.strip().encode("utf-8") + b"\n")
+    if url is not None:
+        yield url, digest.hexdigest()
+
+
+def diff_kb_files(old_path: str, new_path: str) -> Delta:
+    """Computes the delta between two consolidated KB markdown files."""
+    return compute_delta(dict(iter_kb_sections(old_path)), dict(iter_kb_sections(new_path)))
+
+
+@dataclass
+class BuildStats:
+    sections: int = 0
+    converted: int = 0
+    reused: int = 0
+    bytes_written: int = 0
+    seconds: float = 0.0
+    delta: Optional[Delta] = None
+
+
+class KnowledgeBaseBuilder:
+    """
+    Builds the consolidated KB markdown incrementally from the crawl frontier.
+
+    Each page is converted to a markdown section stored under its content
+    hash and the converter tag, so a page is only run through markdownify
+    when its content or the conversion itself changed.
+    A manifest records which sections make up a build, the output is
+    assembled by streaming section files to disk, and the previous manifest
+    gives a delta report for free.
+    """
+
+    def __init__(self, frontier: Frontier, sections_dir: str = DEFAULT_SECTIONS_DIR):
+        self.frontier = frontier
+        self.sections_dir = sections_dir
+        self.converter = converter_tag()
+        os.makedirs(sections_dir, exist_ok=True)
+
+    def section_key(self, content_hash: str) -> str:
+        return f"{content_hash}-{self.converter}"
+
+    def section_path(self, section_key: str) -> str:
+        return os.path.join(self.sections_dir, f"{section_key}.md")
+
+    def _ensure_section(self, url: str, section_key: str) -> bool:
+        """Writes the section file if it is missing; returns True if it was converted."""
+        path = self.section_path(section_key)
+        if os.path.exists(path):
+            return False
+        from markdownify import markdownify as md
+
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            # Bodies are only read from the frontier for pages that need converting.
+            f.write(md(self.frontier.body(url)))
+        os.replace(temp_path, path)
+        return True
+
+    def build(self, output_path: str = DEFAULT_OUTPUT_PATH, previous_manifest: Optional[str] = None) -> BuildStats:
+        """
+        Builds the KB file and its manifest.
+
+        Args:
+            output_path (str): Where to write the consolidated markdown.
+            previous_manifest (Optional[str]): A manifest to compute the delta
+                against; defaults to the manifest of the existing output file.
+
+        Returns:
+            BuildStats: Conversion counts, bytes written and the delta.
+        """
+        started_at = time.perf_counter()
+        stats = BuildStats()
+        previous_manifest = previous_manifest or manifest_path(output_path)
+        previous = {}
+        if os.path.exists(previous_manifest):
+            with open(previous_manifest, encoding="utf-8") as f:
+                previous = {s["url"]: s["content_hash"] for s in json.load(f)["sections"]}
+
+        sections = []
+        for url, content_hash, changed_at in self.frontier.page_index():
+            section_key = self.section_key(content_hash)
+            if self._ensure_section(url, section_key):
+                stats.converted += 1
+            else:
+                stats.reused += 1
+            sections.append(
+                {"url": url, "content_hash": content_hash, "section": section_key, "changed_at": changed_at}
+            )
+        stats.sections = len(sections)
+
+        if os.path.dirname(output_path):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        temp_path = f"{output_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as out:
+            out.write(KB_HEADER)
+            for section in sections:
+                out.write(f"# {section['url']}\n")
+                with open(self.section_path(section["section"]), encoding="utf-8") as f:
+                    shutil.copyfileobj(f, out, COPY_BUFFER_BYTES)
+                out.write("\n\n")
+            stats.bytes_written = out.tell()
+        os.replace(temp_path, output_path)
+
+        with open(manifest_path(output_path), "w", encoding="utf-8") as f:
+            json.dump(
+                {"built_at": time.time(), "output": output_path, "converter": self.converter, "sections": sections},
+                f,
+                indent=2,
+            )
+
+        stats.delta = compute_delta(previous, {s["url"]: s["content_hash"] for s in sections})
+        stats.seconds = time.perf_counter() - started_at
+        return stats
+
+    def prune(self, manifests: List[str]) -> int:
+        """Deletes section files not referenced by any of the given manifests."""
+        keep = set()
+        for path in manifests:
+            with open(path, encoding="utf-8") as f:
+                # Manifests written before sections were keyed by converter only have the hash.
+                keep.update(f"{s.get('section', s['content_hash'])}.md" for s in json.load(f)["sections"])
+        removed = 0
+        for name in os.listdir(self.sections_dir):
+            if name.endswith(".md") and name not in keep:
+                os.remove(os.path.join(self.sections_dir, name))
+                removed += 1
+        return removed
+
+
+def main() -> None:
+    """
+    Builds the knowledge base incrementally, or reports the delta between two KB files.
+
+    Args:
+        None
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Incremental Asli Engineering KB builder.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="Build the KB from the crawl frontier.")
+    build_parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Frontier database path.")
+    build_parser.add_argument("--output", default=DEFAULT_OUTPUT_PATH)
+    build_parser.add_argument("--sections", default=DEFAULT_SECTIONS_DIR)
+    build_parser.add_argument("--previous", help="Manifest to diff against.")
+    build_parser.add_argument("--prune", action="store_true", help="Delete unreferenced sections.")
+    diff_parser = commands.add_parser("diff", help="Report the delta between two KB files.")
+    diff_parser.add_argument("old")
+    diff_parser.add_argument("new")
+    args = parser.parse_args()
+
+    if args.command == "diff":
+        started_at = time.perf_counter()
+        delta = diff_kb_files(args.old, args.new)
+        print(delta.report(os.path.basename(args.old), os.path.basename(args.new)))
+        print(f"Compared in {time.perf_counter() - started_at:.2f}s")
+        return
+
+    builder = KnowledgeBaseBuilder(Frontier(args.db), args.sections)
+    stats = builder.build(args.output, args.previous)
+    print(
+        f"Built {args.output}: {stats.sections} sections "
+        f"({stats.converted} converted, {stats.reused} reused), "
+        f"{stats.bytes_written / 1e6:.1f} MB in {stats.seconds:.2f}s"
+    )
+    print(stats.delta.report(args.previous or "previous build", os.path.basename(args.output)))
+    if args.prune:
+        print(f"Pruned {builder.prune([manifest_path(args.output)])} unused sections")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import statistics
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # Fall back to exact search over the memory-mapped matrix.
+    hnswlib = None
+
+
+## Constants
+DEFAULT_KB_PATH = "data/asli_engineering/ae_kb_v0_0_2.md"
+DEFAULT_INDEX_DIR = "data/asli_engineering/ae_rag"
+DEFAULT_OLLAMA_MODEL = "nomic-embed-text"
+DEFAULT_HASH_DIM = 2048
+EMBED_BATCH_SIZE = 64
+MAX_CHUNK_CHARS = 2000
+MIN_CHUNK_CHARS = 80
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+SOURCE_PREFIX = "# http"
+HEADING = re.compile(r"^(#{1,6})\s+(.*)")
+TOKEN = re.compile(r"[a-z0-9]+")
+
+## Index files
+VECTORS_FILE = "vectors.f32"
+CHUNKS_FILE = "chunks.jsonl"
+META_FILE = "meta.json"
+HNSW_FILE = "hnsw.bin"
+
+
+@dataclass
+class Chunk:
+    id: str
+    url: str
+    heading: str
+    text: str
+    deleted: bool = False
+
+
+@dataclass
+class Hit:
+    score: float
+    url: str
+    heading: str
+    text: str
+
+
+@dataclass
+class QueryResult:
+    hits: List[Hit]
+    embed_ms: float
+    search_ms: float
+
+    @property
+    def total_ms(self) -> float:
+        return self.embed_ms + self.search_ms
+
+
+def _chunk_id(url: str, heading: str, text: str) -> str:
+    return hashlib.sha256(f"{url}\0{heading}\0{text}".encode("utf-8")).hexdigest()[:32]
+
+
+def _split_long(text: str, max_chars: int) -> Iterator[str]:
+    """Splits text on paragraph boundaries into pieces of at most ~max_chars."""
+    piece = ""
+    for paragraph in text.split("\n\n"):
+        if piece and len(piece) + len(paragraph) > max_chars:
+            yield piece
+            piece = ""
+        piece = f"{piece}\n\n{paragraph}" if piece else paragraph
+    if piece:
+        yield piece
+
+
+def iter_chunks(path: str, max_chars: int = MAX_CHUNK_CHARS) -> Iterator[Chunk]:
+    """
+    Streams the KB markdown and yields one chunk per heading section.
+
+    `# http...` lines set the source URL; every other ATX heading starts a
+    new chunk. Sections longer than `max_chars` are split on paragraphs, and
+    near-empty ones (navigation, blank headings) are dropped. Repeated
+    sections get the same chunk id, so they are stored once.
+    """
+    url, heading, lines = "", "", []
+
+    def flush() -> Iterator[Chunk]:
+        text = re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+        for piece in _split_long(text, max_chars):
+            if len(piece) >= MIN_CHUNK_CHARS:
+                yield Chunk(_chunk_id(url, heading, piece), url, heading, piece)
+
+    with open(path, encoding="utf-8") as f:
+        for raw in f:
+            line = raw.rstrip()
+            match = HEADING.match(line)
+            if match:
+                yield from flush()
+                lines = []
+                if line.startswith(SOURCE_PREFIX):
+                    url, heading = line[2:].strip(), ""
+                else:
+                    heading = match.group(2).strip()
+                continue
+            lines.append(line)
+    yield from flush()
+
+
+class HashingEmbedder:
+    """
+    A dependency-free embedder: signed feature hashing of unigrams and bigrams.
+
+    Uses crc32 so vectors are stable across processes (unlike `hash`).
+    """
+
+    def __init__(self, dim: int = DEFAULT_HASH_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = TOKEN.findall(text.lower())
+            for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        # Sublinear term frequency, so repeated boilerplate words do not dominate.
+        return _normalize(np.sign(vectors) * np.log1p(np.abs(vectors)))
+
+
+class OllamaEmbedder:
+    """Embeds with a local Ollama embedding model, in batches."""
+
+    def __init__(self, model: str = DEFAULT_OLLAMA_MODEL):
+        import ollama
+
+        self.client = ollama
+        self.model = model
+        self.name = f"ollama-{model}"
+        self.dim = len(self.embed(["dimension probe"])[0])
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        response = self.client.embed(model=self.model, input=texts)
+        return _normalize(np.asarray(response["embeddings"], dtype=np.float32))
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def get_embedder(prefer_ollama: bool = True, model: str = DEFAULT_OLLAMA_MODEL):
+    """Returns an Ollama embedder if a local server and model are available, else hashing."""
+    if prefer_ollama:
+        try:
+            return OllamaEmbedder(model)
+        except Exception as e:
+            print(f"Ollama embeddings unavailable ({e}); using the hashing embedder.")
+    return HashingEmbedder()
+
+
+@dataclass
+class IndexStats:
+    chunks: int = 0
+    added: int = 0
+    removed: int = 0
+    reused: int = 0
+    seconds: float = 0.0
+
+
+class RagIndex:
+    """
+    A persisted vector index over the KB chunks.
+
+    Vectors live in a memory-mapped float32 matrix (row i is label i in the
+    HNSW graph); chunk metadata is a JSON Lines file in the same order.
+    Rebuilding only embeds chunks whose content id is new and marks vanished
+    chunks deleted, so an unchanged KB costs a single streaming pass.
+    """
+
+    def __init__(self, index_dir: str = DEFAULT_INDEX_DIR, embedder=None):
+        self.index_dir = index_dir
+        self.embedder = embedder or get_embedder()
+        self.chunks: List[Chunk] = []
+        self.latencies_ms: List[float] = []
+        os.makedirs(index_dir, exist_ok=True)
+        self.vectors: Optional[np.ndarray] = None
+        self.graph = None
+        self._load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_dir, name)
+
+    def _load(self) -> None:
+        if not os.path.exists(self._path(META_FILE)):
+            return
+        with open(self._path(META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["embedder"] != self.embedder.name or meta["dim"] != self.embedder.dim:
+            print(f"Index was built with {meta['embedder']}; rebuilding with {self.embedder.name}.")
+            return
+        with open(self._path(CHUNKS_FILE), encoding="utf-8") as f:
+            self.chunks = [Chunk(**json.loads(line)) for line in f]
+        self._map_vectors()
+        if hnswlib is not None and os.path.exists(self._path(HNSW_FILE)):
+            self.graph = hnswlib.Index(space="ip", dim=self.embedder.dim)
+            self.graph.load_index(self._path(HNSW_FILE), max_elements=max(len(self.chunks), 1))
+            self.graph.set_ef(HNSW_EF_SEARCH)
+            if self.graph.get_current_count() != len(self.chunks):
+                self.graph = None  # Stale; rebuilt from the vectors on the next build.
+
+    def _map_vectors(self) -> None:
+        rows = len(self.chunks)
+        self.vectors = (
+            np.memmap(self._path(VECTORS_FILE), dtype=np.float32, mode="r", shape=(rows, self.embedder.dim))
+            if rows
+            else np.zeros((0, self.embedder.dim), dtype=np.float32)
+        )
+
+    def build(self, kb_path: str = DEFAULT_KB_PATH) -> IndexStats:
+        """
+        Indexes the KB file incrementally.
+
+        Args:
+            kb_path (str): The consolidated KB markdown file.
+
+        Returns:
+            IndexStats: How many chunks were added, removed or reused.
+        """
+        started_at = time.perf_counter()
+        stats = IndexStats()
+        labels = {chunk.id: label for label, chunk in enumerate(self.chunks)}
+        current: Dict[str, Chunk] = {}
+        for chunk in iter_chunks(kb_path):
+            current.setdefault(chunk.id, chunk)
+
+        new_chunks = [chunk for chunk_id, chunk in current.items() if chunk_id not in labels]
+        # Chunks that come back (e.g. switching KB versions) reuse their old row.
+        revived = [labels[i] for i in current if i in labels and self.chunks[labels[i]].deleted]
+        removed = [label for chunk_id, label in labels.items() if chunk_id not in current and not self.chunks[label].deleted]
+        for label in revived:
+            self.chunks[label].deleted = False
+        for label in removed:
+            self.chunks[label].deleted = True
+        stats.reused = len(current) - len(new_chunks)
+        stats.removed = len(removed)
+
+        # Append the new vectors to the matrix file, a batch at a time.
+        if not self.chunks:
+            open(self._path(VECTORS_FILE), "wb").close()
+        first_label = len(self.chunks)
+        with open(self._path(VECTORS_FILE), "ab") as f:
+            for i in range(0, len(new_chunks), EMBED_BATCH_SIZE):
+                batch = new_chunks[i : i + EMBED_BATCH_SIZE]
+                f.write(self.embedder.embed([f"{c.heading}\n{c.text}" for c in batch]).tobytes())
+        self.chunks.extend(new_chunks)
+        stats.added = len(new_chunks)
+
+        self._map_vectors()
+        self._update_graph(first_label, revived, removed)
+        self._save()
+        stats.chunks = len(current)
+        stats.seconds = time.perf_counter() - started_at
+        return stats
+
+    def _update_graph(self, first_label: int, revived: List[int], removed: List[int]) -> None:
+        if hnswlib is None:
+            return
+        if self.graph is None or first_label == 0:
+            # No usable graph on disk: index every row, then re-apply deletions.
+            self.graph = hnswlib.Index(space="ip", dim=self.embedder.dim)
+            self.graph.init_index(
+                max_elements=max(len(self.chunks), 1), ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M
+            )
+            first_label, revived = 0, []
+            removed = [label for label, chunk in enumerate(self.chunks) if chunk.deleted]
+        else:
+            self.graph.resize_index(max(len(self.chunks), 1))
+        if len(self.chunks) > first_label:
+            self.graph.add_items(np.asarray(self.vectors[first_label:]), np.arange(first_label, len(self.chunks)))
+        for label in revived:
+            self.graph.unmark_deleted(label)
+        for label in removed:
+            self.graph.mark_deleted(label)
+        self.graph.set_ef(HNSW_EF_SEARCH)
+
+    def _save(self) -> None:
+        with open(self._path(CHUNKS_FILE), "w", encoding="utf-8") as f:
+            for chunk in self.chunks:
+                f.write(json.dumps(asdict(chunk)) + "\n")
+        if self.graph is not None:
+            self.graph.save_index(self._path(HNSW_FILE))
+        elif os.path.exists(self._path(HNSW_FILE)):
+            # Built without hnswlib: the saved graph no longer matches the chunks.
+            os.remove(self._path(HNSW_FILE))
+        with open(self._path(META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"embedder": self.embedder.name, "dim": self.embedder.dim, "rows": len(self.chunks)}, f)
+
+    def query(self, text: str, k: int = 5) -> QueryResult:
+        """
+        Returns the top-k chunks for a question, with latency in milliseconds.
+
+        Args:
+            text (str): The question.
+            k (int): The number of chunks to return.
+
+        Returns:
+            QueryResult: The hits, best first, and embedding/search latency.
+        """
+        started_at = time.perf_counter()
+        vector = self.embedder.embed([text])
+        embedded_at = time.perf_counter()
+        live = sum(not chunk.deleted for chunk in self.chunks)
+        k = min(k, live)
+        if not k:
+            labels, scores = [], []
+        elif self.graph is not None:
+            found, distances = self.graph.knn_query(vector, k=k)
+            labels, scores = found[0], 1.0 - distances[0]
+        else:
+            similarities = np.asarray(self.vectors @ vector[0])
+            similarities[[i for i, c in enumerate(self.chunks) if c.deleted]] = -np.inf
+            labels = np.argsort(-similarities)[:k]
+            scores = similarities[labels]
+        finished_at = time.perf_counter()
+
+        hits = [
+            Hit(float(score), self.chunks[label].url, self.chunks[label].heading, self.chunks[label].text)
+            for label, score in zip(labels, scores)
+        ]
+        result = QueryResult(hits, (embedded_at - started_at) * 1000, (finished_at - embedded_at) * 1000)
+        self.latencies_ms.append(result.total_ms)
+        return result
+
+    def latency_stats(self) -> Dict[str, float]:
+        """Returns p50/p95/max query latency in milliseconds over this session."""
+        if not self.latencies_ms:
+            return {}
+        ordered = sorted(self.latencies_ms)
+        return {
+            "queries": len(ordered),
+            "p50_ms": statistics.median(ordered),
+            "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "max_ms": ordered[-1],
+        }
+
+
+def main() -> None:
+    """
+    Builds (incrementally) or queries the local RAG index over the AE knowledge base.
+
+    Args:
+        None
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Local RAG index over the Asli Engineering KB.")
+    parser.add_argument("--kb", default=DEFAULT_KB_PATH)
+    parser.add_argument("--index", default=DEFAULT_INDEX_DIR)
+    parser.add_argument("--hashing", action="store_true", help="Skip Ollama and use the hashing embedder.")
+    parser.add_argument("--model", default=DEFAULT_OLLAMA_MODEL, help="Ollama embedding model.")
+    parser.add_argument("--rebuild", action="store_true", help="Drop the index (and deleted rows) first.")
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("query", nargs="*", help="Questions to ask; builds the index if none are given.")
+    args = parser.parse_args()
+
+    if args.rebuild and os.path.isdir(args.index):
+        shutil.rmtree(args.index)
+    index = RagIndex(args.index, get_embedder(not args.hashing, args.model))
+    if not args.query:
+        stats = index.build(args.kb)
+        print(
+            f"Indexed {stats.chunks} chunks ({stats.added} embedded, {stats.reused} reused, "
+            f"{stats.removed} removed) in {stats.seconds:.2f}s"
+        )
+        return
+
+    for question in args.query:
+        result = index.query(question, args.k)
+        print(f"\n{question}  [{result.embed_ms:.2f} ms embed + {result.search_ms:.2f} ms search]")
+        for hit in result.hits:
+            print(f"  {hit.score:.3f}  {hit.url}  {hit.heading[:60]}")
+    print(f"\nLatency: {index.latency_stats()}")
+
+
+if __name__ == "__main__":
+    main()
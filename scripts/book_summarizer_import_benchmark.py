@@ -0,0 +1,55 @@
+import os
+import statistics
+import subprocess
+import sys
+
+STREAMLIT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit")
+RUNS = 5
+
+IMPORT_SNIPPET = """
+import time
+started_at = time.perf_counter()
+import book_summarizer
+print(time.perf_counter() - started_at)
+"""
+
+
+def measure_import_time() -> float:
+    """
+    Imports book_summarizer in a fresh interpreter and returns the import time.
+
+    A new process is used for every run so nothing is served from an
+    already-populated module cache.
+
+    Returns:
+        float: The import time in seconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=STREAMLIT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    """
+    Benchmarks the cold import time of the book summarizer module.
+
+    Args:
+        None
+
+    Returns:
+        None
+    """
+    timings = [measure_import_time() for _ in range(RUNS)]
+    print(f"book_summarizer import time over {RUNS} cold runs:")
+    print(f"  median: {statistics.median(timings) * 1000:.1f} ms")
+    print(f"  min:    {min(timings) * 1000:.1f} ms")
+    print(f"  max:    {max(timings) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
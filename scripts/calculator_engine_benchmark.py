@@ -0,0 +1,62 @@
+import argparse
+import math
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit"))
+from calculator_engine import CalculatorEngine  # noqa: E402
+
+SCALAR_FUNCTIONS = {
+    "Sine": lambda a: math.sin(math.radians(a)),
+    "Logarithm": lambda a: math.log(a, 2) if a > 0 else "Error: Invalid input",
+    "Power": lambda a: math.pow(a, 1.5),
+}
+SECOND_OPERANDS = {"Logarithm": 2.0, "Power": 1.5}
+
+
+def throughput(func, count: int) -> float:
+    """Runs `func` once and returns values processed per second."""
+    started_at = time.perf_counter()
+    func()
+    return count / (time.perf_counter() - started_at)
+
+
+def main() -> None:
+    """
+    Compares the old one-pair-at-a-time calculation with the vectorized engine.
+
+    Args:
+        None
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Calculator engine micro-benchmark.")
+    parser.add_argument("--size", type=int, default=1_000_000, help="Values per operation.")
+    args = parser.parse_args()
+
+    values = np.random.default_rng(0).uniform(0.1, 1000, args.size)
+    scalar_values = values.tolist()
+
+    print(f"Throughput over {args.size:,} values (values/second):")
+    print(f"  {'operation':<10} {'scalar':>14} {'vectorized':>14} {'speedup':>9}")
+    for operation, scalar in SCALAR_FUNCTIONS.items():
+        # A fresh engine per run so the memo cache does not hide the work.
+        engine = CalculatorEngine()
+        second = SECOND_OPERANDS.get(operation)
+        scalar_rate = throughput(lambda: [scalar(a) for a in scalar_values], args.size)
+        vector_rate = throughput(lambda: engine.evaluate(operation, values, second), args.size)
+        print(
+            f"  {operation:<10} {scalar_rate:>14,.0f} {vector_rate:>14,.0f} {vector_rate / scalar_rate:>8.1f}x"
+        )
+
+    engine = CalculatorEngine()
+    engine.evaluate("Sine", values)
+    cached_rate = throughput(lambda: engine.evaluate("Sine", values), args.size)
+    print(f"  memoized Sine repeat: {cached_rate:,.0f} values/second (hashing the input only)")
+
+
+if __name__ == "__main__":
+    main()
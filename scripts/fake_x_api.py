@@ -0,0 +1,86 @@
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# A tiny stand-in for the X API v2 `POST /2/tweets` endpoint, for testing the
+# Tweet Stormer posting queue without real credentials:
+#
+#   python scripts/fake_x_api.py --limit 5 --window 60
+#   X_API_BASE_URL=http://127.0.0.1:8765 streamlit run streamlit/tweet_stormer.py
+#
+# Every response carries x-rate-limit-limit / -remaining / -reset headers and
+# the server answers 429 once the window's budget is spent.
+
+tweet_ids = itertools.count(1)
+state_lock = threading.Lock()
+window = {"limit": 5, "seconds": 60, "remaining": 5, "reset": time.time() + 60}
+
+
+class FakeXApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API.
+
+    def _send(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("x-rate-limit-limit", str(window["limit"]))
+        self.send_header("x-rate-limit-remaining", str(window["remaining"]))
+        self.send_header("x-rate-limit-reset", str(int(window["reset"])))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path != "/2/tweets":
+            self._send(404, {"title": "Not Found"})
+            return
+
+        with state_lock:
+            now = time.time()
+            if now >= window["reset"]:
+                window["remaining"] = window["limit"]
+                window["reset"] = now + window["seconds"]
+            if window["remaining"] <= 0:
+                self._send(429, {"title": "Too Many Requests"})
+                return
+            window["remaining"] -= 1
+            tweet_id = str(next(tweet_ids))
+
+        reply_to = body.get("reply", {}).get("in_reply_to_tweet_id")
+        print(f"Tweet {tweet_id} (reply to {reply_to}): {body.get('text', '')[:60]}")
+        self._send(201, {"data": {"id": tweet_id, "text": body.get("text", "")}})
+
+
+def main() -> None:
+    """
+    Runs the fake X API server.
+
+    Args:
+        None
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Fake X API for local testing.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--limit", type=int, default=5, help="Posts allowed per window.")
+    parser.add_argument("--window", type=int, default=60, help="Window length in seconds.")
+    args = parser.parse_args()
+
+    window.update(
+        limit=args.limit,
+        seconds=args.window,
+        remaining=args.limit,
+        reset=time.time() + args.window,
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), FakeXApiHandler)
+    print(f"Fake X API listening on http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
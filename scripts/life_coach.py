@@ -1,8 +1,11 @@
 import asyncio
-from openai import AsyncOpenAI
+import time
+from typing import List, Dict
+from openai import AsyncOpenAI, OpenAIError
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.theme import Theme
+from websockets.exceptions import ConnectionClosed
 
 load_dotenv(dotenv_path=".env", override=True)
 
@@ -13,11 +16,222 @@ custom_theme = Theme(
         "banner": "bold orange1",
         "assistant": "bold cyan",
         "user": "bold green",
+        "status": "italic grey50",
     }
 )
 
 console = Console(theme=custom_theme)
 
+## Constants
+DEFAULT_REALTIME_MODEL = "gpt-4o-realtime-preview"
+MAX_RECONNECT_ATTEMPTS = 6
+INITIAL_BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 16
+RECENT_TURNS_TO_REPLAY = 6
+OLDER_TURN_MAX_CHARS = 160
+RECONNECT_ERRORS = (ConnectionClosed, ConnectionError, OSError, OpenAIError)
+
+INSTRUCTIONS = """
+    You are Mato Nui, a Life Coach with decades of experience.
+    The client will chat with you about their life and ask for advice.
+    You will provide guidance and support to help them navigate their challenges.
+    You can also ask questions to learn more about the client's situation.
+    The goal is to help the client achieve their personal growth and well-being.
+    Remember to be empathetic, understanding, and encouraging in your responses.
+"""
+
+
+def compact_transcript(
+    transcript: List[Dict[str, str]],
+    recent_turns: int = RECENT_TURNS_TO_REPLAY,
+    older_turn_max_chars: int = OLDER_TURN_MAX_CHARS,
+) -> str:
+    """
+    Compacts the local transcript into a short conversation summary.
+
+    The most recent turns are kept verbatim, older turns are clipped so the
+    replayed context stays small no matter how long the session has been.
+
+    Args:
+        transcript (List[Dict[str, str]]): The turns as {"role", "text"} dicts.
+        recent_turns (int): The number of trailing turns kept verbatim.
+        older_turn_max_chars (int): The maximum length of each older turn.
+
+    Returns:
+        str: The compacted summary, or an empty string for an empty transcript.
+    """
+    if not transcript:
+        return ""
+
+    older = transcript[:-recent_turns] if recent_turns else transcript
+    recent = transcript[-recent_turns:] if recent_turns else []
+
+    lines = []
+    if older:
+        lines.append("Earlier in the session (condensed):")
+        for turn in older:
+            text = " ".join(turn["text"].split())
+            if len(text) > older_turn_max_chars:
+                text = text[: older_turn_max_chars - 3].rstrip() + "..."
+            lines.append(f"- {turn['role']}: {text}")
+    if recent:
+        lines.append("Most recent turns:")
+        for turn in recent:
+            lines.append(f"{turn['role']}: {turn['text'].strip()}")
+    return "\n".join(lines)
+
+
+class ResilientCoachSession:
+    """
+    Keeps a realtime coaching session alive across websocket drops.
+
+    The session keeps a local transcript, reconnects with exponential backoff
+    when the connection is lost and seeds the new connection with a compacted
+    summary of the conversation instead of replaying the full history.
+    """
+
+    def __init__(self, client: AsyncOpenAI, instructions: str = INSTRUCTIONS):
+        self.client = client
+        self.instructions = instructions
+        self.transcript: List[Dict[str, str]] = []
+        self.reconnect_latencies: List[float] = []
+        self._connection_manager = None
+        self._connection = None
+
+    def session_instructions(self) -> str:
+        """Returns the instructions with the conversation summary appended."""
+        summary = compact_transcript(self.transcript)
+        if not summary:
+            return self.instructions
+        return (
+            f"{self.instructions}\n"
+            "The connection to the client was briefly interrupted. "
+            "Continue the conversation naturally without mentioning it.\n"
+            f"{summary}"
+        )
+
+    async def connect(self) -> None:
+        """Opens a realtime connection and configures the session."""
+        self._connection_manager = self.client.beta.realtime.connect(
+            model=DEFAULT_REALTIME_MODEL,
+        )
+        self._connection = await self._connection_manager.enter()
+        await self._connection.session.update(
+            session={"modalities": ["text"], "instructions": self.session_instructions()}
+        )
+
+    async def close(self) -> None:
+        """Closes the current connection, ignoring errors from a dead socket."""
+        if self._connection is None:
+            return
+        try:
+            await self._connection.close()
+        except RECONNECT_ERRORS:
+            pass
+        finally:
+            self._connection = None
+            self._connection_manager = None
+
+    async def _connect_with_backoff(self) -> int:
+        """
+        Connects, retrying with exponential backoff.
+
+        Returns:
+            int: The number of attempts it took.
+
+        Raises:
+            ConnectionError: If every attempt fails.
+        """
+        backoff = INITIAL_BACKOFF_SECONDS
+        for attempt in range(1, MAX_RECONNECT_ATTEMPTS + 1):
+            try:
+                await self.connect()
+                return attempt
+            except RECONNECT_ERRORS as e:
+                # markup=False: rich would parse brackets in the error text as tags.
+                console.print(
+                    f"Connection attempt {attempt} failed: {e}; retrying in {backoff:.1f}s",
+                    style="status",
+                    markup=False,
+                )
+                await self.close()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+        raise ConnectionError("Could not connect to the realtime API.")
+
+    async def open(self) -> None:
+        """Opens the initial connection, retrying with backoff."""
+        await self._connect_with_backoff()
+
+    async def reconnect(self) -> None:
+        """
+        Re-establishes the connection with exponential backoff.
+
+        Raises:
+            ConnectionError: If every reconnect attempt fails.
+        """
+        await self.close()
+        started_at = time.perf_counter()
+        attempts = await self._connect_with_backoff()
+        latency = time.perf_counter() - started_at
+        self.reconnect_latencies.append(latency)
+        console.print(
+            f"Reconnected in {latency * 1000:.0f} ms after {attempts} attempt(s)",
+            style="status",
+            markup=False,
+        )
+
+    async def _ask(self, message: str) -> str:
+        """Sends one user message and streams the reply to the console."""
+        await self._connection.conversation.item.create(
+            item={
+                "type": "message",
+                "role": "user",
+                "content": [{"type": "input_text", "text": message}],
+            }
+        )
+        await self._connection.response.create()
+
+        reply = []
+        async for event in self._connection:
+            if event.type == "response.text.delta":
+                reply.append(event.delta)
+                console.print(event.delta, style="assistant", end="")
+
+            elif event.type == "response.text.done":
+                console.print()
+
+            elif event.type == "response.done":
+                return "".join(reply)
+
+        # The iterator ending without "response.done" means the socket closed.
+        raise ConnectionError("Realtime connection closed mid-response.")
+
+    async def send(self, message: str) -> str:
+        """
+        Sends a message, transparently reconnecting if the connection drops.
+
+        A reply that was cut off mid-stream is discarded and the message is
+        asked again on the fresh connection.
+
+        Args:
+            message (str): The user message.
+
+        Returns:
+            str: The assistant reply.
+        """
+        while True:
+            try:
+                reply = await self._ask(message)
+                break
+            except RECONNECT_ERRORS:
+                console.print()
+                await self.reconnect()
+
+        self.transcript.append({"role": "client", "text": message})
+        self.transcript.append({"role": "coach", "text": reply})
+        return reply
+
 
 async def main() -> None:
     """
@@ -38,48 +252,28 @@ async def main() -> None:
     console.print("Type 'exit' to stop the chatbot.", style="banner")
     console.print("=" * 30, style="banner")
 
-    instructions = f"""
-        You are Mato Nui, a Life Coach with decades of experience. 
-        The client will chat with you about their life and ask for advice.
-        You will provide guidance and support to help them navigate their challenges.
-        You can also ask questions to learn more about the client's situation.
-        The goal is to help the client achieve their personal growth and well-being.
-        Remember to be empathetic, understanding, and encouraging in your responses.
-    """
-
     message = "Introduce yourself to the user and get to know them."
 
-    async with client.beta.realtime.connect(
-        model="gpt-4o-realtime-preview",
-    ) as connection:
-        await connection.session.update(
-            session={"modalities": ["text"], "instructions": instructions}
-        )
-
+    session = ResilientCoachSession(client)
+    await session.open()
+    try:
         while True:
-            await connection.conversation.item.create(
-                item={
-                    "type": "message",
-                    "role": "user",
-                    "content": [{"type": "input_text", "text": message}],
-                }
-            )
-            await connection.response.create()
-
-            async for event in connection:
-                if event.type == "response.text.delta":
-                    console.print(event.delta, style="assistant", end="")
-
-                elif event.type == "response.text.done":
-                    console.print()
-
-                elif event.type == "response.done":
-                    break
+            await session.send(message)
 
             message = console.input("[user]You: [/user]")
 
             if message.lower() == "exit":
                 break
+    finally:
+        await session.close()
+        if session.reconnect_latencies:
+            average = sum(session.reconnect_latencies) / len(session.reconnect_latencies)
+            console.print(
+                f"Reconnects: {len(session.reconnect_latencies)}, "
+                f"average latency: {average * 1000:.0f} ms",
+                style="status",
+            )
 
 
-asyncio.run(main())
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,13 +4,72 @@ import os
 from streamlit_extras.app_logo import add_logo
 from streamlit_extras.metric_cards import style_metric_cards
 from streamlit_extras.stylable_container import stylable_container
-from book_summarizer import summarize_text, get_book_metadata, generate_markdown
+import hashlib
+from book_summarizer import get_book_metadata, generate_markdown, summarize_pdf_book, DEFAULT_MODEL, PROMPT_VERSION
+from summary_cache import SummaryCache
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Page Configuration
 st.set_page_config(page_title="AI Book Summarizer", page_icon="📚", layout="wide")
 
+
+@st.cache_resource
+def get_summary_cache():
+    return SummaryCache()
+
+
+def summarize_book(book_name, cache, book_pdf=None):
+    """
+    Returns the summary markdown and whether it was served from the cache.
+
+    When a PDF of the book is uploaded, the summary is built from its full
+    text with the chunked map-reduce pipeline instead of the model's memory.
+    """
+    markdown_kind = "markdown"
+    if book_pdf is not None:
+        markdown_kind = f"markdown:pdf:{hashlib.sha256(book_pdf.getvalue()).hexdigest()}"
+
+    markdown = cache.get(markdown_kind, book_name, DEFAULT_MODEL, PROMPT_VERSION)
+    if markdown is not None:
+        return markdown, True
+
+    metadata = cache.get("metadata", book_name, DEFAULT_MODEL, PROMPT_VERSION)
+    metadata_cached = metadata is not None
+    if metadata is None:
+        metadata = get_book_metadata(book_name)
+
+    if book_pdf is not None:
+        pdf_summary = summarize_pdf_book(book_pdf)
+        markdown, failed = generate_markdown(book_name, metadata, summary=pdf_summary.summary, cache=cache)
+        if pdf_summary.failed_chunks:
+            st.warning(
+                f"⚠️ {pdf_summary.failed_chunks} of {pdf_summary.chunks} parts of the book could not be "
+                "summarized and are missing from the summary."
+            )
+            failed.append("book chunks")
+        if pdf_summary.failed_merges:
+            st.warning(
+                f"⚠️ {pdf_summary.failed_merges} merge step(s) of the book summary failed, so parts of it "
+                "are missing."
+            )
+            failed.append("book summary")
+    else:
+        # The summary is generated concurrently with the other sections.
+        markdown, failed = generate_markdown(book_name, metadata, cache=cache)
+
+    # A failed LLM call or lookup, or a guessed catalog match, must not be served from the cache for the whole TTL.
+    if metadata.get("Guess") == "Yes":
+        st.warning(f"⚠️ No exact match was found; showing the closest catalogued book, \"{metadata['Title']}\".")
+    if failed:
+        st.warning(f"⚠️ Some sections could not be generated ({', '.join(failed)}). Try again later.")
+    elif metadata.get("Guess") != "Yes":
+        cache.set(markdown_kind, book_name, DEFAULT_MODEL, PROMPT_VERSION, markdown)
+        if not metadata_cached and metadata.get("Title") != "Not Found":
+            cache.set("metadata", book_name, DEFAULT_MODEL, PROMPT_VERSION, metadata)
+    return markdown, False
+
+
 # Add Custom App Logo
 add_logo("https://cdn-icons-png.flaticon.com/512/2232/2232688.png", height=120)
 
@@ -19,16 +78,24 @@ st.title("📚 AI-Powered Book Summarizer")
 # Sidebar Design
 with stylable_container("sidebar-container", css_styles="background-color: #F7F7F7; padding: 20px; border-radius: 10px;"):
     book_name = st.text_input("Enter Book Name", placeholder="e.g. Atomic Habits")
+    book_pdf = st.file_uploader("Upload the Book PDF (Optional)", type=["pdf"])
     generate = st.button("Generate Summary")
 
 if generate:
     if book_name:
         with st.spinner("Fetching Book Metadata and Generating Summary..."):
-            metadata = get_book_metadata(book_name)
-            summary = summarize_text(f"Summarize the book: {book_name}")
-            markdown = generate_markdown(book_name, metadata, summary)
+            summary_cache = get_summary_cache()
+            try:
+                markdown, cache_hit = summarize_book(book_name, summary_cache, book_pdf)
+            except RuntimeError as e:
+                st.error(f"❌ {e}")
+                st.stop()
 
             st.success("✅ Summary Generated Successfully!")
+            st.caption(
+                f"{'⚡ Served from cache' if cache_hit else '🐢 Freshly generated'} · "
+                f"server-wide cache hits: {summary_cache.hits}, misses: {summary_cache.misses}"
+            )
             st.download_button("📥 Download Markdown Summary", markdown, f"{book_name}.md")
 
             # Display Book Info
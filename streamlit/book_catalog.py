@@ -0,0 +1,174 @@
+import csv
+import os
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from summary_cache import normalize_title
+
+
+## Constants
+DEFAULT_CATALOG_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "data", "books", "books.csv"
+)
+# Fuzzy matches are only a guess: they need a high trigram score, a similar
+# length and at most one query word missing from the catalog title.
+FUZZY_MATCH_THRESHOLD = 0.85
+FUZZY_MIN_LENGTH_RATIO = 0.8
+FUZZY_MAX_MISSING_WORDS = 1
+NOT_AVAILABLE = "Not Available"
+
+
+def trigrams(text: str) -> set:
+    """Returns the set of character trigrams of a normalized, padded string."""
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _normalize_isbn(value: str) -> str:
+    return "".join(ch for ch in value if ch.isdigit() or ch in "xX").upper()
+
+
+class BookCatalog:
+    """
+    An in-memory index over the bundled books.csv catalog.
+
+    Columns are stored as parallel lists (row i of every column is one book).
+    Lookups go through a normalized-title hash map and an ISBN map; only
+    those hits are authoritative. A trigram index gives fuzzy title matches,
+    which callers must treat as a guess.
+    """
+
+    def __init__(self, path: str = DEFAULT_CATALOG_PATH):
+        self.columns: Dict[str, List[str]] = defaultdict(list)
+        self.title_index: Dict[str, int] = {}
+        self.isbn_index: Dict[str, int] = {}
+        self.trigram_index: Dict[str, List[int]] = defaultdict(list)
+        self.trigram_counts: List[int] = []
+
+        with open(path, newline="", encoding="utf-8") as f:
+            for row_id, row in enumerate(csv.DictReader(f)):
+                for column, value in row.items():
+                    self.columns[column].append(value)
+                self._index_row(row_id, row)
+
+        self.columns = dict(self.columns)
+        self.trigram_index = dict(self.trigram_index)
+
+    def __len__(self) -> int:
+        return len(self.trigram_counts)
+
+    def _index_row(self, row_id: int, row: Dict[str, str]) -> None:
+        title = normalize_title(row["title"])
+        full_title = normalize_title(f"{row['title']} {row['subtitle']}")
+        for key in (title, full_title):
+            # Keep the most rated edition when titles collide.
+            current = self.title_index.get(key)
+            if current is None or self._ratings_count(row_id, row) > self._ratings_count(current):
+                self.title_index[key] = row_id
+
+        for column in ("isbn13", "isbn10"):
+            if row[column]:
+                self.isbn_index[_normalize_isbn(row[column])] = row_id
+
+        grams = trigrams(title)
+        self.trigram_counts.append(len(grams))
+        for gram in grams:
+            self.trigram_index[gram].append(row_id)
+
+    def _ratings_count(self, row_id: int, row: Optional[Dict[str, str]] = None) -> float:
+        value = row["ratings_count"] if row is not None else self.columns["ratings_count"][row_id]
+        try:
+            return float(value)
+        except ValueError:
+            return 0.0
+
+    def find_row(self, query: str, fuzzy: bool = False) -> Optional[Tuple[int, bool]]:
+        """
+        Resolves a title or ISBN to a row id.
+
+        Args:
+            query (str): A book title (any casing/punctuation) or an ISBN-10/13.
+            fuzzy (bool): Fall back to a fuzzy title match when nothing matches exactly.
+
+        Returns:
+            Optional[Tuple[int, bool]]: The row id and whether the match is exact,
+                or None if nothing matches closely enough.
+        """
+        isbn = _normalize_isbn(query)
+        if len(isbn) in (10, 13) and isbn in self.isbn_index:
+            return self.isbn_index[isbn], True
+
+        title = normalize_title(query)
+        if not title:
+            return None
+        if title in self.title_index:
+            return self.title_index[title], True
+        if not fuzzy:
+            return None
+        row_id = self._fuzzy_find(title)
+        return (row_id, False) if row_id is not None else None
+
+    def _fuzzy_find(self, title: str) -> Optional[int]:
+        query_grams = trigrams(title)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.trigram_index.get(gram, ()))
+        best_row, best_score = None, 0.0
+        for row_id, count in shared.items():
+            # Dice coefficient over trigram sets.
+            score = 2 * count / (len(query_grams) + self.trigram_counts[row_id])
+            if score > best_score:
+                best_row, best_score = row_id, score
+        if best_row is None or best_score < FUZZY_MATCH_THRESHOLD:
+            return None
+        candidate = normalize_title(self.get(best_row, "title"))
+        if min(len(title), len(candidate)) / max(len(title), len(candidate)) < FUZZY_MIN_LENGTH_RATIO:
+            return None
+        missing_words = set(title.split()) - set(candidate.split())
+        return best_row if len(missing_words) <= FUZZY_MAX_MISSING_WORDS else None
+
+    def get(self, row_id: int, column: str) -> str:
+        return self.columns[column][row_id]
+
+    def metadata(self, query: str, fuzzy: bool = False) -> Optional[Dict[str, str]]:
+        """
+        Returns book metadata in the same shape as `get_book_metadata`.
+
+        Args:
+            query (str): A book title or ISBN.
+            fuzzy (bool): Allow a fuzzy title match; the result is then
+                marked with "Guess": "Yes" and its Source says so.
+
+        Returns:
+            Optional[Dict[str, str]]: The metadata, or None if the book is not catalogued.
+        """
+        match = self.find_row(query, fuzzy)
+        if match is None:
+            return None
+        row_id, exact = match
+        column = lambda name: self.get(row_id, name) or NOT_AVAILABLE
+        return {
+            "Title": column("title"),
+            "Author": ", ".join(column("authors").split(";")),
+            "Pages": column("num_pages"),
+            "Market Value": NOT_AVAILABLE,
+            "Currency": "",
+            "Platform": "Google Books",
+            "Published Date": column("published_year"),
+            "Ratings": column("average_rating"),
+            "Book Continuation": NOT_AVAILABLE,
+            "Preview Link": NOT_AVAILABLE,
+            "Publisher": NOT_AVAILABLE,
+            "Categories": column("categories"),
+            "Language": NOT_AVAILABLE,
+            "Thumbnail": column("thumbnail"),
+            "ISBN": column("isbn13"),
+            "Source": "Local Catalog" if exact else "Local Catalog (closest match)",
+            "Guess": "No" if exact else "Yes",
+        }
+
+
+@lru_cache(maxsize=1)
+def get_catalog(path: str = DEFAULT_CATALOG_PATH) -> BookCatalog:
+    """Loads the catalog once per process."""
+    return BookCatalog(path)
@@ -1,83 +1,58 @@
-#!/usr/bin/env python
-# coding: utf-8
-
-# In[1]:
+"""
+Book summarizer library used by the Streamlit app (streamlit/app.py).
 
+Importing this module has no side effects: heavy dependencies (`openai`,
+`pdfplumber`, `requests`) are imported on first use and the environment is
+loaded lazily the first time the OpenAI client is needed.
 
-# Boilerplate: This block goes into every notebook.
-# It sets up the environment, installs the requirements, and checks for the required environment variables.
+This file is the source of truth; book_summarizer.ipynb imports it.
+A missing OPENAI_API_KEY raises RuntimeError from every entry point, while
+failed API calls are reported as `NOT_AVAILABLE` sections.
+"""
 
-from IPython.display import clear_output
+import asyncio
 import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from book_catalog import get_catalog
 
-requirements_installed = False
-max_retries = 3
-retries = 0
 REQUIRED_ENV_VARS = ["OPENAI_API_KEY"]
+DEFAULT_MODEL = "gpt-4-turbo"
+# Bump whenever SYSTEM_PROMPT or the section prompts change, so cached output is not reused.
+PROMPT_VERSION = "1"
+NOT_AVAILABLE = "Not Available"
 
+_openai = None
 
-def install_requirements():
-    """Installs the requirements from requirements.txt file"""
-    global requirements_installed, retries
-    if requirements_installed:
-        print("Requirements already installed.")
-        return
-
-    print("Installing requirements...")
-    install_status = os.system("pip install -r requirements.txt")
-    if install_status == 0:
-        print("Requirements installed successfully.")
-        requirements_installed = True
-    else:
-        print("Failed to install requirements.")
-        if retries < max_retries:
-            print("Retrying...")
-            retries += 1
-            return install_requirements()
-        exit(1)
-    return
-
-
-install_requirements()
-clear_output()
-print("🚀 Setup complete. Continue to the next cell.")
-
-
-# In[2]:
-
-
-from dotenv import load_dotenv
 
 def setup_env():
-    """Sets up the environment variables"""
-
-    def check_env(env_var):
-        value = os.getenv(env_var)
-        if value is None:
-            print(f"Please set the {env_var} environment variable.")
-            exit(1)
-        else:
-            print(f"{env_var} is set.")
+    """Loads the .env file and checks the required environment variables."""
+    from dotenv import load_dotenv
 
     load_dotenv(override=True, dotenv_path="../.env")
+    load_dotenv(override=False, dotenv_path=".env")
 
-    variables_to_check = REQUIRED_ENV_VARS
-
-    for var in variables_to_check:
-        check_env(var)
-
-    print("Environment variables are set.")
+    missing = [var for var in REQUIRED_ENV_VARS if os.getenv(var) is None]
+    if missing:
+        raise RuntimeError(f"Please set the {', '.join(missing)} environment variable(s).")
 
 
-setup_env()
+def get_openai():
+    """Imports and configures the `openai` module on first use."""
+    global _openai
+    if _openai is None:
+        setup_env()
+        import openai
 
+        _openai = openai
+    return _openai
 
-# In[3]:
-
-
-import requests
 
 def downloader(book_name):
+    import requests
+
     query = book_name.replace(" ", "+")
     url = f"https://www.googleapis.com/books/v1/volumes?q={query}"
     response = requests.get(url).json()
@@ -96,25 +71,25 @@ def downloader(book_name):
             print("Error: Failed to download the PDF file.")
 
 
-# In[4]:
-
+def iter_pages(pdf_file):
+    """
+    Lazily yields (page_number, text) for every page of the PDF.
 
-import pdfplumber
+    Each page's parsed objects are released as soon as its text is extracted,
+    so memory stays flat however long the book is.
+    """
+    import pdfplumber
 
-def extract_text(pdf_file):
-    text = ""
     with pdfplumber.open(pdf_file) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-        return text
-
-
-# In[5]:
+        for page_number, page in enumerate(pdf.pages, start=1):
+            text = page.extract_text() or ""
+            page.close()
+            yield page_number, text
 
 
-import openai
+def extract_text(pdf_file):
+    return "\n".join(text for _, text in iter_pages(pdf_file))
 
-DEFAULT_MODEL = "gpt-4-turbo"
 
 SYSTEM_PROMPT = """
 You are an advanced AI book summarizer designed to generate highly detailed, structured, and professional book summaries in Markdown format.
@@ -139,6 +114,8 @@ Your task is to produce comprehensive book summaries that capture the **key idea
 """
 
 def summarize_text(prompt):
+    # Resolved outside the try: a missing API key is a setup error, not a failed section.
+    openai = get_openai()
     try:
         response = openai.chat.completions.create(
         model = DEFAULT_MODEL,
@@ -152,14 +129,227 @@ def summarize_text(prompt):
          return "Not Available"
 
 
-# In[23]:
+CHUNK_MAX_TOKENS = 6000
+REDUCE_MAX_TOKENS = 12000
+SUMMARY_WORKERS = 4
+NUMBER_WORDS = (
+    "One|Two|Three|Four|Five|Six|Seven|Eight|Nine|Ten|Eleven|Twelve|Thirteen|Fourteen|Fifteen|"
+    "Sixteen|Seventeen|Eighteen|Nineteen|Twenty|Thirty|Forty|Fifty"
+)
+# A short standalone line such as "Chapter 3", "PART IV: Habits" or "Chapter Twelve".
+# Capitalization is required so prose like "part of the problem" never splits a chapter.
+CHAPTER_HEADING = re.compile(
+    rf"^[ \t]*(?:Chapter|CHAPTER|Part|PART|Book|BOOK)[ \t]+(?:\d+|[IVXLCDM]+|(?:{NUMBER_WORDS})(?:-\w+)?|"
+    rf"(?:{NUMBER_WORDS.upper()})(?:-\w+)?)\b[^\n]{{0,80}}$",
+    re.MULTILINE,
+)
+# Headings are only looked for near the top of a page, where a chapter starts.
+HEADING_SEARCH_LINES = 5
+
+CHUNK_SYSTEM_PROMPT = """
+You are summarizing one excerpt of a longer book.
+Write a dense Markdown summary of the excerpt: the main idea in bold, key points as bullets,
+notable direct quotes with their page reference (e.g. "Quote text" — Page 34).
+Do not add an introduction or conclusion about the whole book.
+"""
+
+REDUCE_SYSTEM_PROMPT = """
+You are merging partial summaries of consecutive parts of the same book.
+Combine them into one coherent Markdown summary, keeping chapter headings, page references and quotes.
+Remove repetition but do not drop distinct ideas.
+"""
+
+
+@dataclass
+class PdfSummary:
+    summary: str
+    chunks: int
+    failed_chunks: int
+    failed_merges: int = 0
+
+
+@dataclass
+class BookChunk:
+    chapter: str
+    first_page: int
+    last_page: int
+    text: str
+
+
+def estimate_tokens(text):
+    """Rough token estimate (about four characters per token for English text)."""
+    return len(text) // 4 + 1
+
 
+def find_chapter_heading(text):
+    """Returns the chapter heading in the first lines of a page, or None."""
+    heading = CHAPTER_HEADING.search("\n".join(text.splitlines()[:HEADING_SEARCH_LINES]))
+    return heading.group(0).strip() if heading else None
 
-def generate_markdown(title, metadata, summary):
+
+def _chapter_key(heading):
+    # "Chapter 3" of "Chapter 3 · The Habit Loop", so running headers match the chapter they repeat.
+    return " ".join(heading.split()[:2]).lower()
+
+
+def chunk_pages(pages, max_tokens=CHUNK_MAX_TOKENS):
     """
-    Generate a detailed book summary in Markdown format.
+    Groups (page_number, text) pairs into token-bounded chunks.
+
+    A new chunk is started when a page opens a new chapter, and whenever the
+    current chunk would exceed `max_tokens`. A heading that repeats the
+    current chapter (a running header) does not split it. Chunks are yielded
+    as soon as they are complete, so only one chunk is held in memory at a time.
     """
-    missing_info = summarize_text(f"""
+    chapter = "Front Matter"
+    parts, first_page, tokens = [], None, 0
+
+    def flush(last_page):
+        return BookChunk(chapter, first_page, last_page, "\n".join(parts))
+
+    last_page = 0
+    for page_number, text in pages:
+        heading = find_chapter_heading(text)
+        if heading and _chapter_key(heading) == _chapter_key(chapter):
+            heading = None
+        page_tokens = estimate_tokens(text)
+        if parts and (heading or tokens + page_tokens > max_tokens):
+            yield flush(last_page)
+            parts, first_page, tokens = [], None, 0
+        if heading:
+            chapter = heading
+        if first_page is None:
+            first_page = page_number
+        parts.append(f"[Page {page_number}]\n{text}")
+        tokens += page_tokens
+        last_page = page_number
+
+    if parts:
+        yield flush(last_page)
+
+
+def _complete(system_prompt, user_prompt):
+    openai = get_openai()
+    try:
+        response = openai.chat.completions.create(
+            model=DEFAULT_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+        )
+        return response.choices[0].message.content
+    except Exception as e:
+        print(f"Error: {e}")
+        return NOT_AVAILABLE
+
+
+def summarize_chunk(chunk):
+    summary = _complete(
+        CHUNK_SYSTEM_PROMPT,
+        f"Chapter: {chunk.chapter} (pages {chunk.first_page}-{chunk.last_page})\n\n{chunk.text}",
+    )
+    return chunk.chapter, summary
+
+
+def map_chunks(chunks, workers=SUMMARY_WORKERS):
+    """
+    Summarizes chunks with a worker pool, preserving book order.
+
+    At most `2 * workers` chunks are in flight, so pages are only read from
+    the PDF as fast as the workers consume them.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(executor.submit(summarize_chunk, chunk))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def reduce_summaries(summaries, workers=SUMMARY_WORKERS, max_tokens=REDUCE_MAX_TOKENS):
+    """
+    Hierarchically merges summaries until they fit a single prompt.
+
+    Consecutive summaries are packed into token-bounded groups and each group
+    is merged with one call; groups are merged concurrently, level by level.
+    A group whose merge call fails is left out.
+
+    Returns:
+        Tuple[List[str], int]: The merged summaries and the number of failed merges.
+    """
+    failed = 0
+    while sum(estimate_tokens(s) for s in summaries) > max_tokens and len(summaries) > 1:
+        groups, current, tokens = [], [], 0
+        for summary in summaries:
+            summary_tokens = estimate_tokens(summary)
+            if current and tokens + summary_tokens > max_tokens:
+                groups.append(current)
+                current, tokens = [], 0
+            current.append(summary)
+            tokens += summary_tokens
+        groups.append(current)
+        if len(groups) == len(summaries):
+            break  # Every summary is already too large to pair up.
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            merged = list(
+                executor.map(
+                    lambda group: group[0] if len(group) == 1 else _complete(REDUCE_SYSTEM_PROMPT, "\n\n---\n\n".join(group)),
+                    groups,
+                )
+            )
+        failed += merged.count(NOT_AVAILABLE)
+        summaries = [summary for summary in merged if summary != NOT_AVAILABLE]
+    return summaries, failed
+
+
+def summarize_pdf_book(pdf_file, workers=SUMMARY_WORKERS):
+    """
+    Summarizes a whole PDF book chapter-wise with a map-reduce pipeline.
+
+    1. Pages are extracted lazily and packed into chapter-aligned chunks.
+    2. Chunks are summarized concurrently by a pool of `workers`.
+    3. Chunk summaries of the same chapter are merged, then all chapter
+       summaries are reduced hierarchically into the final `SYSTEM_PROMPT`
+       chapter-wise summary.
+
+    Chunks whose summary failed are left out of the merge and counted in
+    `PdfSummary.failed_chunks`; failed merge calls, including the final
+    summary, are counted in `PdfSummary.failed_merges`, so the caller can
+    tell the user and skip caching.
+    """
+    chapters, chunks, failed_chunks = [], 0, 0
+    for chapter, summary in map_chunks(chunk_pages(iter_pages(pdf_file)), workers):
+        chunks += 1
+        if summary == NOT_AVAILABLE:
+            failed_chunks += 1
+            continue
+        if chapters and chapters[-1][0] == chapter:
+            chapters[-1][1].append(summary)
+        else:
+            chapters.append((chapter, [summary]))
+
+    chapter_summaries, failed_merges = [], 0
+    for chapter, parts in chapters:
+        merged, failed = reduce_summaries(parts, workers)
+        failed_merges += failed
+        if merged:
+            chapter_summaries.append(f"## {chapter}\n" + "\n\n".join(merged))
+    if not chapter_summaries:
+        return PdfSummary(NOT_AVAILABLE, chunks, failed_chunks, failed_merges)
+    condensed, failed = reduce_summaries(chapter_summaries, workers)
+    failed_merges += failed
+    summary = summarize_text("\n\n".join(condensed))
+    if summary == NOT_AVAILABLE:
+        failed_merges += 1
+    return PdfSummary(summary, chunks, failed_chunks, failed_merges)
+
+
+MAX_CONCURRENT_REQUESTS = 4
+
+MISSING_INFO_PROMPT = """
 Book: {title}
 Generate the following details:
 - Author
@@ -170,7 +360,103 @@ Generate the following details:
 - Best Quotes
 - Who Should Read This Book
 - Market Value
-""")
+"""
+
+PLATFORM_PRICE_PROMPT = "What is the market value of the book {title} on {platform}?"
+
+
+async def summarize_text_async(client, semaphore, prompt):
+    """Async version of `summarize_text`, bounded by the shared semaphore."""
+    async with semaphore:
+        try:
+            response = await client.chat.completions.create(
+                model=DEFAULT_MODEL,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": f"Summarize this book chapter-wise:\n{prompt}"},
+                ],
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            return NOT_AVAILABLE
+
+
+def plan_markdown_requests(title, metadata, summary=None):
+    """
+    Returns only the LLM prompts needed to fill the gaps in the metadata.
+
+    `missing_info` is always needed for the recap sections. The summary is only
+    requested when the caller did not pass one, and a platform price only when
+    the metadata does not already carry it.
+    """
+    requests_needed = {"missing_info": MISSING_INFO_PROMPT.format(title=title)}
+    if summary is None:
+        requests_needed["summary"] = f"Summarize the book: {title}"
+    for key, platform in (("amazon", "Amazon"), ("google_books", "Google Books"), ("audible", "Audible")):
+        if metadata.get(key, NOT_AVAILABLE) == NOT_AVAILABLE:
+            requests_needed[key] = PLATFORM_PRICE_PROMPT.format(title=title, platform=platform)
+    return requests_needed
+
+
+async def run_markdown_requests(requests_needed, max_concurrency=MAX_CONCURRENT_REQUESTS):
+    """Runs the planned prompts concurrently and returns the answers by key."""
+    client = get_openai().AsyncOpenAI()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    try:
+        answers = await asyncio.gather(
+            *(summarize_text_async(client, semaphore, prompt) for prompt in requests_needed.values())
+        )
+    finally:
+        await client.close()
+    return dict(zip(requests_needed.keys(), answers))
+
+
+def fetch_markdown_sections(title, requests_needed, cache=None):
+    """
+    Returns the answers for the planned prompts, reusing cached sections.
+
+    Only sections missing from the cache are sent to the LLM. Successful
+    answers are written back so the next run for the same book is instant.
+    """
+    answers = {}
+    if cache is not None:
+        for key in list(requests_needed):
+            cached = cache.get(f"section:{key}", title, DEFAULT_MODEL, PROMPT_VERSION)
+            if cached is not None:
+                answers[key] = cached
+                del requests_needed[key]
+
+    if requests_needed:
+        fresh = asyncio.run(run_markdown_requests(requests_needed))
+        answers.update(fresh)
+        if cache is not None:
+            for key, answer in fresh.items():
+                if answer != NOT_AVAILABLE:
+                    cache.set(f"section:{key}", title, DEFAULT_MODEL, PROMPT_VERSION, answer)
+    return answers
+
+
+def generate_markdown(title, metadata, summary=None, cache=None):
+    """
+    Generate a detailed book summary in Markdown format.
+
+    All missing details (and the summary itself when `summary` is None) are
+    fetched with concurrent LLM calls, so the total wait is close to the
+    slowest single call. Sections found in `cache` are not requested again.
+
+    Returns the markdown and the names of the sections that could not be
+    generated, so callers can avoid caching an incomplete summary.
+    """
+    metadata = dict(metadata)
+    if metadata.get("Market Value", NOT_AVAILABLE) != NOT_AVAILABLE:
+        metadata.setdefault("google_books", metadata["Market Value"])
+
+    answers = fetch_markdown_sections(title, plan_markdown_requests(title, metadata, summary), cache)
+    missing_info = answers["missing_info"]
+    summary = answers.get("summary", summary)
+    failed = [key for key, answer in answers.items() if answer == NOT_AVAILABLE]
+    if summary == NOT_AVAILABLE and "summary" not in failed:
+        failed.append("summary")
 
     def extract_info(section, fallback):
         try:
@@ -178,52 +464,73 @@ Generate the following details:
         except (IndexError, AttributeError):
             return fallback
 
+    def from_metadata(key, section, fallback):
+        value = metadata.get(key, NOT_AVAILABLE)
+        return value if value not in (NOT_AVAILABLE, "Not Found") else extract_info(section, fallback)
+
     md = f"""
 # {title}
-**Author:** {metadata.get('authors', extract_info('Author', 'Unknown Author'))}  
-**Published Year:** {metadata.get('publishedDate', extract_info('Published Year', 'Unknown Year'))}  
-**Genre:** {metadata.get('Categories', extract_info('Genre', 'Unknown Genre'))}  
-**Market Value:** {metadata.get('Market Value', extract_info('Market Value', 'Not Available'))}  
+**Author:** {from_metadata('Author', 'Author', 'Unknown Author')}  
+**Published Year:** {from_metadata('Published Date', 'Published Year', 'Unknown Year')}  
+**Genre:** {from_metadata('Categories', 'Genre', 'Unknown Genre')}  
+**Market Value:** {from_metadata('Market Value', 'Market Value', NOT_AVAILABLE)}  
 
 ## Summary
 {summary}
 
 ## Final Summary
 ### Key Ideas Recap
-{extract_info('Key Ideas Recap', 'Not Available')}
+{extract_info('Key Ideas Recap', NOT_AVAILABLE)}
 
 ### Pros and Cons
 **Pros:**
-{extract_info('Pros and Cons', 'Not Available').split('Cons:')[0]}  
+{extract_info('Pros and Cons', NOT_AVAILABLE).split('Cons:')[0]}  
 
 **Cons:**
-{extract_info('Cons', 'Not Available')}
+{extract_info('Cons', NOT_AVAILABLE)}
 
 ### Best Quotes
-{extract_info('Best Quotes', 'Not Available')}
+{extract_info('Best Quotes', NOT_AVAILABLE)}
 
 ### Who Should Read This Book?
-{extract_info('Who Should Read This Book', 'Not Available')}
+{extract_info('Who Should Read This Book', NOT_AVAILABLE)}
 
 ### Market Value
-- Amazon: {metadata.get('amazon', summarize_text(f"What is the market value of the book {title} on Amazon?"))}
-- Google Books: {metadata.get('Platform', summarize_text(f"What is the market value of the book {title} on Google Books?"))}
-- Audible: {metadata.get('audible', summarize_text(f"What is the market value of the book {title} on Audible?"))}
+- Amazon: {answers.get('amazon', metadata.get('amazon'))}
+- Google Books: {answers.get('google_books', metadata.get('google_books'))}
+- Audible: {answers.get('audible', metadata.get('audible'))}
 """
-    return md
+    return md, failed
 
 
-# In[24]:
+def get_book_metadata(book_name):
+    """
+    Returns book metadata, resolved from the bundled catalog when possible.
+
+    The Google Books API is only queried for books without an exact title or
+    ISBN match in data/books/books.csv, so catalogued books work without
+    network access. If Google Books has nothing either, the closest catalog
+    title is returned, marked with "Guess": "Yes" so it is never cached.
+    """
+    catalog_metadata = get_catalog().metadata(book_name)
+    if catalog_metadata is not None:
+        return catalog_metadata
 
+    metadata = fetch_google_books_metadata(book_name)
+    if metadata["Title"] == "Not Found":
+        return get_catalog().metadata(book_name, fuzzy=True) or metadata
+    return metadata
 
-import requests
 
-def get_book_metadata(book_name):
+def fetch_google_books_metadata(book_name):
+    """Looks the book up on the Google Books API; Title is "Not Found" on a miss or an error."""
+    import requests
+
     query = book_name.replace(" ", "+")
     url = f"https://www.googleapis.com/books/v1/volumes?q={query}"
-    response = requests.get(url).json()
 
     try:
+        response = requests.get(url).json()
         if response["totalItems"] > 0:
             book = response['items'][0]['volumeInfo']
             sale_info = response['items'][0].get("saleInfo", {})
@@ -285,14 +592,5 @@ def get_book_metadata(book_name):
         }
 
 
-# In[ ]:
-
-
 if __name__ == "__main__":
-    os.system("jupyter nbconvert --to script book_summarizer.ipynb && move book_summarizer.py streamlit/")
-    print("Conversion Complete ✅")
-    print("Launching Streamlit App...")
-
     os.system("streamlit run streamlit/app.py")
-    exit()  # Stop recursion
-
@@ -1,65 +1,35 @@
 import streamlit as st
-import math
+import numpy as np
+import pandas as pd
+from calculator_engine import OPERATIONS, CalculatorEngine
+from history_store import get_user_history, render_history
+
+BATCH_PREVIEW_ROWS = 100
 
 st.set_page_config(page_title="Profesional Calculator", layout="centered", page_icon="🧮")
 
+@st.cache_resource
+def get_engine():
+     return CalculatorEngine()
+
+def get_history():
+     return get_user_history("calculator")
+
 def calculate(operation, num1 ,num2=None):
-    try:
-        if operation == 'Addition':
-            sign = '+'
-            return num1+ num2, sign
-        elif operation == 'Subtraction':
-            sign = '-'
-            return num1 - num2, sign
-        elif operation == 'Multiplication':
-            sign= '*'
-            return num1 * num2, sign
-        elif operation == 'Division':
-            sign = "/"
-            return num1 / num2 if num2 !=0 else 'Error: Division by zero', sign
-        elif operation == 'Square Root':
-            sign = '√'
-            return math.sqrt(num1),sign
-        elif operation == 'Power':
-             sign = '^'
-             return math.pow(num1, num2), sign
-        elif operation == 'Logarithm':
-             sign = 'log'
-             return math.log(num1, num2) if num1 > 0 and num2 > 0 else 'Error: Invalid input', sign
-        elif operation == 'Sine':
-             sign = 'sin'
-             return math.sin(math.radians(num1)), sign
-        elif operation == 'Cosine':
-             sign = 'cos'
-             return math.cos(math.radians(num1)), sign
-        elif operation == 'Tangent':
-             sign = 'tan'
-             return math.tan(math.radians(num1)), sign
-        elif operation == 'Factorial':
-             sign = '!'
-             return math.factorial(num1) if num1 >= 0 and num1 == int(num1) else 'Error: Invalid input', sign
-    except Exception as e:
-            return f'Error: {e}'
-    
-    st.title("Professional Calculator")
-    st.markdown("A sleek, user-friendly calculator app designed to perform everyday mathematical operations with precision and ease.")
+     return get_engine().calculate(operation, num1, num2), OPERATIONS[operation].sign
 
-tab1, tab2 = st.tabs(["Calculator", "History"])
+st.title("Professional Calculator")
+st.markdown("A sleek, user-friendly calculator app designed to perform everyday mathematical operations with precision and ease.")
 
-if 'history' not in st.session_state:
-         st.session_state.history = []
-         
+tab1, tab2, tab3 = st.tabs(["Calculator", "Batch", "History"])
 
 with tab1:
      st.header("Calculator")
      operation = st.selectbox(
         "Select Operation",
-        [
-            "Addition", "Subtraction", "Multiplication", "Division",
-            "Square Root", "Power", "Factorial", "Logarithm", "Sine", "Cosine", "Tangent"
-        ]
+        list(OPERATIONS)
     )
-     if operation in ['Square Root', 'Sine', 'Cosine', 'Tangent', 'Factorial']:
+     if OPERATIONS[operation].arity == 1:
           num1 = st.number_input("Enter the number", value=0, key="single_num")
           num2 = None
      else:
@@ -72,22 +42,53 @@ with tab1:
           else:
             if num2 is not None:
                 st.success(f"Result: {result}")
-                st.session_state.history.append(f"{operation} : {num1} {sign} {num2} = {result}")
+                get_history().append(f"{operation} : {num1} {sign} {num2} = {result}")
             else:
                 st.success(f"Result: {result}")
-                st.session_state.history.append(f"{operation} : {sign}({num1}) = {result}")
+                get_history().append(f"{operation} : {sign}({num1}) = {result}")
                  
 
 with tab2:
+     st.header("Batch")
+     st.markdown("Run an operation or an expression in `x` (e.g. `sin(x) ** 2 + log(x, 10)`) over a whole CSV column.")
+     uploaded_csv = st.file_uploader("Upload a CSV file", type=["csv"])
+     if uploaded_csv is not None:
+          data = pd.read_csv(uploaded_csv)
+          column = st.selectbox("Column (x)", list(data.columns))
+          x = pd.to_numeric(data[column], errors="coerce").to_numpy(dtype=np.float64)
+          mode = st.radio("Evaluate", ["Operation", "Expression"], horizontal=True)
+          try:
+               if mode == "Operation":
+                    batch_operation = st.selectbox("Operation", list(OPERATIONS), key="batch_op")
+                    operand = None
+                    if OPERATIONS[batch_operation].arity == 2:
+                         operand = st.number_input("Second number", value=0.0, key="batch_num")
+                    batch = get_engine().evaluate(batch_operation, x, operand)
+               else:
+                    expression = st.text_input("Expression", value="x", key="batch_expr")
+                    batch = get_engine().evaluate_expression(expression, x)
+          except ValueError as e:
+               st.error(f"Error: {e}")
+          else:
+               st.success(f"Evaluated {len(x):,} values · {batch.error_count:,} error(s)")
+               for index, message in batch.error_messages():
+                    st.warning(f"Row {index}: {message}")
+               preview = pd.DataFrame({"x": x, "result": batch.values})
+               st.dataframe(preview.head(BATCH_PREVIEW_ROWS))
+               st.download_button(
+                    "Download results",
+                    preview.to_csv(index=False),
+                    file_name="calculator_results.csv",
+                    mime="text/csv",
+               )
+
+with tab3:
      st.header("History")
-     if st.session_state.history:
-          for entry in st.session_state.history:
-               st.write(entry)
-          if (st.button("Delete History", key="del_btn")):
-               st.session_state.history = []
-               st.success("History deleted")
-     else:
-          st.info("No calculations performed yet")
+     render_history(get_history(), key="calculator_history")
+     if get_history().count() and st.button("Delete History", key="del_btn"):
+          get_history().clear()
+          st.success("History deleted")
+
 st.markdown(
         """
         <style>
@@ -0,0 +1,330 @@
+import ast
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import numpy as np
+
+
+## Constants
+MAX_CACHE_ENTRIES = 128
+MAX_COMPILED_EXPRESSIONS = 64
+MAX_FACTORIAL = 170  # 171! overflows float64.
+# Scalar factorials are exact Python ints; 1000! has 2568 digits.
+MAX_EXACT_FACTORIAL = 1000
+
+## Per-element error codes
+OK = 0
+NOT_A_NUMBER = 1
+INVALID_INPUT = 2
+DIVISION_BY_ZERO = 3
+TOO_LARGE = 4
+ERROR_MESSAGES = {
+    NOT_A_NUMBER: "Error: Not a number",
+    INVALID_INPUT: "Error: Invalid input",
+    DIVISION_BY_ZERO: "Error: Division by zero",
+    TOO_LARGE: "Error: Result too large",
+}
+
+Number = Union[int, float]
+ArrayLike = Union[Number, np.ndarray]
+
+_FACTORIALS = np.array([float(math.factorial(n)) for n in range(MAX_FACTORIAL + 1)])
+
+
+@dataclass
+class BatchResult:
+    """
+    The values of one vectorized evaluation.
+
+    `errors` holds an error code per element (OK where the value is valid);
+    invalid elements are NaN in `values`.
+    """
+
+    values: np.ndarray
+    errors: np.ndarray
+
+    @property
+    def error_count(self) -> int:
+        return int(np.count_nonzero(self.errors))
+
+    def error_messages(self, limit: int = 10) -> List[Tuple[int, str]]:
+        """Returns (index, message) for the first `limit` failed elements."""
+        indexes = np.flatnonzero(self.errors)[:limit]
+        return [(int(i), ERROR_MESSAGES[int(self.errors.flat[i])]) for i in indexes]
+
+
+@dataclass(frozen=True)
+class Operation:
+    sign: str
+    arity: int
+    func: Callable[..., np.ndarray]
+    # Returns an error-code array (OK where the inputs are valid), or None.
+    check: Optional[Callable[..., np.ndarray]] = None
+
+
+def _codes(shape, *conditions: Tuple[np.ndarray, int]) -> np.ndarray:
+    """Builds an error-code array from (mask, code) pairs; the first match wins."""
+    codes = np.zeros(shape, dtype=np.uint8)
+    for mask, code in conditions:
+        codes[np.broadcast_to(mask, shape) & (codes == OK)] = code
+    return codes
+
+
+def _factorial(a: np.ndarray) -> np.ndarray:
+    valid = (a >= 0) & (a == np.floor(a)) & (a <= MAX_FACTORIAL)
+    return np.where(valid, _FACTORIALS[np.where(valid, a, 0).astype(np.int64)], np.nan)
+
+
+OPERATIONS: Dict[str, Operation] = {
+    "Addition": Operation("+", 2, np.add),
+    "Subtraction": Operation("-", 2, np.subtract),
+    "Multiplication": Operation("*", 2, np.multiply),
+    "Division": Operation(
+        "/", 2, np.divide, lambda a, b: _codes(np.broadcast(a, b).shape, (b == 0, DIVISION_BY_ZERO))
+    ),
+    "Square Root": Operation("√", 1, np.sqrt, lambda a: _codes(a.shape, (a < 0, INVALID_INPUT))),
+    "Power": Operation("^", 2, np.power),
+    "Factorial": Operation(
+        "!",
+        1,
+        _factorial,
+        lambda a: _codes(
+            a.shape,
+            ((a < 0) | (a != np.floor(a)), INVALID_INPUT),
+            (a > MAX_FACTORIAL, TOO_LARGE),
+        ),
+    ),
+    "Logarithm": Operation(
+        "log",
+        2,
+        lambda a, b: np.log(a) / np.log(b),
+        lambda a, b: _codes(np.broadcast(a, b).shape, ((a <= 0) | (b <= 0) | (b == 1), INVALID_INPUT)),
+    ),
+    "Sine": Operation("sin", 1, lambda a: np.sin(np.radians(a))),
+    "Cosine": Operation("cos", 1, lambda a: np.cos(np.radians(a))),
+    "Tangent": Operation("tan", 1, lambda a: np.tan(np.radians(a))),
+}
+
+
+## Safe expressions
+EXPRESSION_FUNCTIONS: Dict[str, Callable[..., np.ndarray]] = {
+    "sqrt": np.sqrt,
+    "exp": np.exp,
+    "abs": np.abs,
+    "log": lambda a, base=None: np.log(a) if base is None else np.log(a) / np.log(base),
+    "log10": np.log10,
+    "sin": OPERATIONS["Sine"].func,
+    "cos": OPERATIONS["Cosine"].func,
+    "tan": OPERATIONS["Tangent"].func,
+    "factorial": _factorial,
+}
+EXPRESSION_CONSTANTS = {"pi": math.pi, "e": math.e}
+EXPRESSION_OPERATORS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide,
+    ast.Pow: np.power,
+    ast.Mod: np.mod,
+    ast.USub: np.negative,
+    ast.UAdd: np.positive,
+}
+
+
+@lru_cache(maxsize=MAX_COMPILED_EXPRESSIONS)
+def compile_expression(expression: str) -> Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]]:
+    """
+    Compiles an arithmetic expression in `x` into a vectorized function.
+
+    Only numbers, `x`, `pi`, `e`, the operators + - * / ** % and the functions
+    in EXPRESSION_FUNCTIONS are allowed; trigonometric functions take degrees,
+    like the calculator buttons. All arithmetic is float64, so `2 ** -1` is 0.5.
+
+    Args:
+        expression (str): The expression, e.g. "sin(x) ** 2 + log(x, 10)".
+
+    Returns:
+        Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]]: A function
+            evaluating the expression over a float64 array, returning the
+            values and per-element codes (DIVISION_BY_ZERO where a `/` or `%`
+            divisor was zero).
+
+    Raises:
+        ValueError: If the expression is not valid or uses anything not allowed.
+    """
+    try:
+        tree = ast.parse(expression, mode="eval").body
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {e.msg}") from e
+
+    # Each node becomes f(x, zero_divisors); `/` and `%` record where their divisor is zero.
+    def build(node: ast.AST) -> Callable[[np.ndarray, List[np.ndarray]], ArrayLike]:
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            value = np.float64(node.value)
+            return lambda x, zero_divisors: value
+        if isinstance(node, ast.Name):
+            if node.id == "x":
+                return lambda x, zero_divisors: x
+            if node.id in EXPRESSION_CONSTANTS:
+                value = np.float64(EXPRESSION_CONSTANTS[node.id])
+                return lambda x, zero_divisors: value
+            raise ValueError(f"Unknown name: {node.id}")
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Div, ast.Mod)):
+            op, left, right = EXPRESSION_OPERATORS[type(node.op)], build(node.left), build(node.right)
+
+            def divide(x, zero_divisors):
+                divisor = right(x, zero_divisors)
+                zero_divisors.append(np.asarray(divisor) == 0)
+                return op(left(x, zero_divisors), divisor)
+
+            return divide
+        if isinstance(node, ast.BinOp) and type(node.op) in EXPRESSION_OPERATORS:
+            op, left, right = EXPRESSION_OPERATORS[type(node.op)], build(node.left), build(node.right)
+            return lambda x, zero_divisors: op(left(x, zero_divisors), right(x, zero_divisors))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in EXPRESSION_OPERATORS:
+            op, operand = EXPRESSION_OPERATORS[type(node.op)], build(node.operand)
+            return lambda x, zero_divisors: op(operand(x, zero_divisors))
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and node.func.id in EXPRESSION_FUNCTIONS
+            and not node.keywords
+        ):
+            func, args = EXPRESSION_FUNCTIONS[node.func.id], [build(arg) for arg in node.args]
+            return lambda x, zero_divisors: func(*(arg(x, zero_divisors) for arg in args))
+        raise ValueError(f"Not allowed in an expression: {ast.dump(node)[:40]}")
+
+    evaluate = build(tree)
+
+    def run(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        zero_divisors: List[np.ndarray] = []
+        values = np.broadcast_to(np.asarray(evaluate(x, zero_divisors), dtype=np.float64), x.shape)
+        return values, _codes(x.shape, *((mask, DIVISION_BY_ZERO) for mask in zero_divisors))
+
+    return run
+
+
+def _digest(values: ArrayLike) -> str:
+    array = np.ascontiguousarray(values, dtype=np.float64)
+    return hashlib.blake2b(array.tobytes() + str(array.shape).encode(), digest_size=16).hexdigest()
+
+
+class CalculatorEngine:
+    """
+    Evaluates calculator operations and expressions over NumPy arrays.
+
+    Operations come from the OPERATIONS dispatch table and run in one
+    vectorized pass; invalid elements are reported per element instead of
+    failing the whole batch. Results are memoized by (operation, inputs).
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[tuple, BatchResult]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # The engine is shared across Streamlit sessions.
+        self._lock = threading.Lock()
+
+    def _memoized(self, key: tuple, compute: Callable[[], BatchResult]) -> BatchResult:
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            self.misses += 1
+        result = compute()
+        with self._lock:
+            self._cache[key] = result
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return result
+
+    def evaluate(self, operation: str, a: ArrayLike, b: Optional[ArrayLike] = None) -> BatchResult:
+        """
+        Applies an operation element-wise.
+
+        Args:
+            operation (str): A key of OPERATIONS, e.g. "Power".
+            a (ArrayLike): The first operand (scalar or array).
+            b (Optional[ArrayLike]): The second operand, for binary operations.
+
+        Returns:
+            BatchResult: The values and per-element error codes.
+        """
+        op = OPERATIONS[operation]
+        key = (operation, _digest(a), _digest(b) if op.arity == 2 else None)
+        return self._memoized(key, lambda: self._apply(op, a, b))
+
+    def calculate(self, operation: str, a: Number, b: Optional[Number] = None) -> str:
+        """
+        Applies an operation to scalars and returns the formatted result or error.
+
+        Factorials of whole numbers are computed exactly (up to
+        MAX_EXACT_FACTORIAL), so 25! prints all 26 digits.
+        """
+        if operation == "Factorial" and a is not None and a == int(a) and 0 <= a <= MAX_EXACT_FACTORIAL:
+            return str(math.factorial(int(a)))
+        result = self.evaluate(operation, a, b)
+        if result.error_count:
+            return result.error_messages(limit=1)[0][1]
+        return format_value(float(result.values))
+
+    def evaluate_expression(self, expression: str, x: ArrayLike) -> BatchResult:
+        """Evaluates a safe arithmetic expression (see `compile_expression`) over `x`."""
+        func = compile_expression(expression)
+
+        def compute() -> BatchResult:
+            x_values = np.asarray(x, dtype=np.float64)
+            with np.errstate(all="ignore"):
+                values, codes = func(x_values)
+            result = self._run(lambda _: values, x_values)
+            self._flag(result, codes)
+            return result
+
+        return self._memoized(("expr", expression, _digest(x)), compute)
+
+    @staticmethod
+    def _apply(op: Operation, a: ArrayLike, b: Optional[ArrayLike]) -> BatchResult:
+        args = [np.asarray(a, dtype=np.float64)]
+        if op.arity == 2:
+            args.append(np.asarray(b, dtype=np.float64))
+        result = CalculatorEngine._run(op.func, *args)
+        if op.check is not None:
+            with np.errstate(all="ignore"):
+                CalculatorEngine._flag(result, op.check(*args))
+        return result
+
+    @staticmethod
+    def _flag(result: BatchResult, codes: np.ndarray) -> None:
+        # Domain errors are more specific than the generic non-finite check.
+        flagged = (codes != OK) & (result.errors != NOT_A_NUMBER)
+        result.errors[flagged] = codes[flagged]
+        result.values[flagged] = np.nan
+
+    @staticmethod
+    def _run(func: Callable[..., np.ndarray], *args: np.ndarray) -> BatchResult:
+        args = [np.asarray(arg, dtype=np.float64) for arg in args]
+        with np.errstate(all="ignore"):
+            values = np.array(func(*args), dtype=np.float64)
+        shape = values.shape
+        errors = np.zeros(shape, dtype=np.uint8)
+        missing = np.zeros(shape, dtype=bool)
+        for arg in args:
+            missing |= np.broadcast_to(np.isnan(arg), shape)
+        errors[~np.isfinite(values)] = INVALID_INPUT
+        errors[np.isinf(values) & ~missing] = TOO_LARGE
+        errors[missing] = NOT_A_NUMBER
+        values[errors != OK] = np.nan
+        return BatchResult(values, errors)
+
+
+def format_value(value: float) -> str:
+    """Formats a result, dropping the fraction of whole numbers (120.0 -> 120)."""
+    if math.isfinite(value) and value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return f"{value:.10g}"
@@ -1,7 +1,9 @@
 import streamlit as st
 import os
-import openai
+from concurrent.futures import ThreadPoolExecutor
+from openai import OpenAI
 from dotenv import load_dotenv
+from conversation import Conversation, DEFAULT_SYSTEM_PROMPT, format_message
 
 # Load environment variables
 load_dotenv()
@@ -9,8 +11,21 @@ load_dotenv()
 # Set page configuration for Streamlit
 st.set_page_config(page_title="Chatbot with OpenAI", layout="wide", page_icon="🤖")
 
-# Fetch OpenAI API key from environment variable
-openai.api_key = os.getenv("OPENAI_API_KEY")
+
+# OpenAI client, created once from the API key in the environment
+@st.cache_resource
+def get_openai_client():
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+# Background workers that fold old turns into the rolling summary
+@st.cache_resource
+def get_summary_executor():
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="chat-summary")
+
+
+def new_conversation(model):
+    return Conversation(get_openai_client(), get_summary_executor(), model, DEFAULT_SYSTEM_PROMPT)
 
 
 # Page title and description
@@ -25,39 +40,37 @@ model = st.sidebar.selectbox("Choose a model", ["gpt-4", "gpt-3.5-turbo"])
 user_input = st.text_input("You:", placeholder="Type your message here...")
 
 # Initialize chat session if not already
-if 'messages' not in st.session_state:
-    st.session_state['messages'] = [{"role": "system", "content": "You are a helpful assistant."}]
+if 'conversation' not in st.session_state:
+    st.session_state['conversation'] = new_conversation(model)
+conversation = st.session_state['conversation']
+conversation.model = model
 
-# Handle sending the message
-if st.button('Send'):
-    st.session_state['messages'].append({'role': 'user', 'content': user_input})
+# Display chat messages (one markdown element, built incrementally)
+if conversation.transcript:
+    st.markdown(conversation.transcript)
 
+# Handle sending the message
+if st.button('Send') and user_input.strip():
+    st.markdown(format_message({"role": "user", "content": user_input}))
     try:
-        # Fetch response from OpenAI API
-        response = openai.ChatCompletion.create(
-            model=model,
-            messages=st.session_state['messages']
-        )
-        
-        # Extract assistant's reply
-        reply = response['choices'][0]['message']['content']
-        
-        # Append the assistant's reply to the conversation history
-        st.session_state['messages'].append({'role': 'assistant', 'content': reply})
+        # Stream the assistant's reply into the page as it is generated
+        with st.container():
+            st.markdown("###### **Bot**:")
+            st.write_stream(conversation.stream_reply(user_input))
     except Exception as e:
         st.error(f"Error {e}")
 
-# Display chat messages
-for message in st.session_state['messages']:
-    if message['role'] == 'user':
-        st.markdown(f'###### **You**: {message["content"]}')
-    elif message['role'] == 'assistant':
-        st.markdown(f'###### **Bot**: {message["content"]}')
+# Context window stats
+st.sidebar.caption(
+    f"{len(conversation.messages)} messages · ~{conversation.context_tokens()} context tokens"
+    + (f" · {conversation.summarized_upto} summarized" if conversation.summarized_upto else "")
+)
 
 # Clear chat button
-if len(st.session_state['messages']) > 1:
+if conversation.messages:
     if st.button('Clear Chat'):
-        st.session_state['messages'] = [{"role": "system", "content": "You are a helpful assistant."}]
+        st.session_state['conversation'] = new_conversation(model)
+        st.rerun()
 
 # Footer 
 st.markdown(
@@ -0,0 +1,174 @@
+import threading
+import traceback
+from concurrent.futures import Executor, Future
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional
+from openai import OpenAI
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to a character estimate.
+    tiktoken = None
+
+
+## Constants
+DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant."
+DEFAULT_CONTEXT_TOKENS = 3000
+# Fold old turns into the summary once the unsummarized tail grows past this.
+SUMMARY_TRIGGER_TOKENS = 2000
+# Recent turns that are always sent verbatim, never summarized.
+KEEP_RECENT_MESSAGES = 6
+SUMMARY_MODEL = "gpt-3.5-turbo"
+SUMMARY_PROMPT = (
+    "Update the running summary of a conversation between a user and an assistant. "
+    "Keep every fact, name, decision and open question that later turns may rely on. "
+    "Answer with the updated summary only, in at most 200 words."
+)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = SUMMARY_MODEL) -> int:
+    """Counts tokens with tiktoken when installed, otherwise estimates ~4 chars per token."""
+    if tiktoken is None:
+        return len(text) // 4 + 1
+    return len(_encoding(model).encode(text))
+
+
+def format_message(message: Dict[str, str]) -> str:
+    speaker = "You" if message["role"] == "user" else "Bot"
+    return f'###### **{speaker}**: {message["content"]}'
+
+
+class Conversation:
+    """
+    A chat transcript with a bounded, token-counted context window.
+
+    The full transcript is kept for display, but each request only carries
+    the system prompt, a rolling summary of older turns and the most recent
+    messages that fit in `max_context_tokens`. When the unsummarized tail
+    grows too large, older turns are folded into the summary on a background
+    executor, so the user never waits for it.
+    """
+
+    def __init__(
+        self,
+        client: OpenAI,
+        executor: Executor,
+        model: str,
+        system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+        max_context_tokens: int = DEFAULT_CONTEXT_TOKENS,
+    ):
+        self.client = client
+        self.executor = executor
+        self.model = model
+        self.system_prompt = system_prompt
+        self.max_context_tokens = max_context_tokens
+        self.messages: List[Dict[str, str]] = []
+        self.token_counts: List[int] = []
+        self.summary = ""
+        # Messages before this index are covered by the summary.
+        self.summarized_upto = 0
+        self._summary_job: Optional[Future] = None
+        self._transcript = ""
+        self._lock = threading.Lock()
+
+    def add(self, role: str, content: str) -> None:
+        self.messages.append({"role": role, "content": content})
+        self.token_counts.append(count_tokens(content, self.model) + MESSAGE_OVERHEAD_TOKENS)
+        rendered = format_message(self.messages[-1])
+        self._transcript = f"{self._transcript}\n\n{rendered}" if self._transcript else rendered
+
+    @property
+    def transcript(self) -> str:
+        """The whole conversation as markdown, built incrementally as messages arrive."""
+        return self._transcript
+
+    def context(self) -> List[Dict[str, str]]:
+        """
+        Builds the messages to send: system prompt, summary and a recent window.
+
+        Returns:
+            List[Dict[str, str]]: Messages whose token total stays within
+                `max_context_tokens` (the newest message is always included).
+        """
+        with self._lock:
+            summary, start = self.summary, self.summarized_upto
+        system = [{"role": "system", "content": self.system_prompt}]
+        if summary:
+            system.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"})
+        budget = self.max_context_tokens - sum(count_tokens(m["content"], self.model) for m in system)
+
+        window_start = len(self.messages) - 1
+        used = self.token_counts[-1] if self.messages else 0
+        while window_start > start and used + self.token_counts[window_start - 1] <= budget:
+            window_start -= 1
+            used += self.token_counts[window_start]
+        return system + self.messages[window_start:]
+
+    def context_tokens(self) -> int:
+        return sum(count_tokens(m["content"], self.model) + MESSAGE_OVERHEAD_TOKENS for m in self.context())
+
+    def stream_reply(self, user_input: str) -> Iterator[str]:
+        """
+        Sends a user message and yields the assistant reply as it streams in.
+
+        The reply is added to the transcript once the stream finishes.
+
+        Args:
+            user_input (str): The user's message.
+
+        Yields:
+            str: Pieces of the assistant's reply.
+        """
+        self.add("user", user_input)
+        stream = self.client.chat.completions.create(
+            model=self.model, messages=self.context(), stream=True
+        )
+        parts = []
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                yield parts[-1]
+        self.add("assistant", "".join(parts))
+        self.maybe_summarize()
+
+    def maybe_summarize(self) -> None:
+        """Starts a background summary when the unsummarized tail is too long."""
+        if self._summary_job is not None and not self._summary_job.done():
+            return
+        with self._lock:
+            end = len(self.messages) - KEEP_RECENT_MESSAGES
+            if end <= self.summarized_upto:
+                return
+            if sum(self.token_counts[self.summarized_upto :]) < SUMMARY_TRIGGER_TOKENS:
+                return
+            summary, turns = self.summary, self.messages[self.summarized_upto : end]
+        self._summary_job = self.executor.submit(self._summarize, summary, turns, end)
+
+    def _summarize(self, summary: str, turns: List[Dict[str, str]], end: int) -> None:
+        conversation = "\n".join(f'{m["role"]}: {m["content"]}' for m in turns)
+        try:
+            response = self.client.chat.completions.create(
+                model=SUMMARY_MODEL,
+                messages=[
+                    {"role": "system", "content": SUMMARY_PROMPT},
+                    {
+                        "role": "user",
+                        "content": f"Current summary:\n{summary or '(empty)'}\n\nNew turns:\n{conversation}",
+                    },
+                ],
+            )
+        except Exception:
+            traceback.print_exc()
+            return
+        with self._lock:
+            self.summary = response.choices[0].message.content.strip()
+            self.summarized_upto = end
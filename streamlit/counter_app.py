@@ -1,18 +1,18 @@
 import streamlit as st  # Importing Streamlit library for creating UI
+from history_store import get_user_history, render_history  # Persistent, paginated action history
 st.set_page_config(page_title= "Counter App", layout="centered",page_icon="⏱️")  # Setting the page title and layout
 
 # Title of the app
 st.title("Professional Counter App")
 st.markdown("A simple and elegant counter application.")
 
-# Initialize the counter & History 
+# Per-user history log, persisted across refreshes and restarts
+def get_history():
+    return get_user_history("counter_app")
+
+# Initialize the counter
 if 'counter' not in st.session_state:
     st.session_state.counter = 0
-    st.session_state.history = {
-        "Increment" : [],
-        "Decrement" : [],
-        "Reset" : []
-    }
 
 st.write("### Current Count")
 # Display the current counter value
@@ -20,7 +20,7 @@ st.metric(label="Counter", value=st.session_state.counter)
 
 # Update the history
 def update_history(action):
-    st.session_state.history[action].append(f"{action}: {st.session_state.counter}")
+    get_history().append(f"{action}: {st.session_state.counter}", category=action)
 
 # Columns for buttons
 st.write("### Actions")
@@ -51,20 +51,17 @@ col1, col2, col3 = st.columns([1, 1, 1])
 with col1:
     #Increment History
     st.write("Increment")
-    for action in st.session_state.history["Increment"]:
-        st.write(action)
+    render_history(get_history(), key="increment_history", category="Increment", page_size=10)
 
 with col2:
     #Decrement History
     st.write("Decrement")
-    for action in st.session_state.history["Decrement"]:
-        st.write(action)
+    render_history(get_history(), key="decrement_history", category="Decrement", page_size=10)
 
 with col3:
     #Reset History
     st.write("Reset")
-    for action in st.session_state.history["Reset"]:
-        st.write(action)
+    render_history(get_history(), key="reset_history", category="Reset", page_size=10)
 
 #Footer
 st.markdown(
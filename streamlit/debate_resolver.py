@@ -1,48 +1,85 @@
 import streamlit as st
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import Optional
+from uuid import uuid4
 from openai import OpenAI
 from dotenv import load_dotenv
 import traceback
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 import os
 
 load_dotenv(override=True, dotenv_path=".env")
 
 openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+## Constants
+DEFAULT_OPENAI_MODEL = "gpt-3.5-turbo"
+MAX_BRIEF_WORKERS = 8
+
+
+def new_id() -> str:
+    return uuid4().hex[:12]
+
 
 class Participant(BaseModel):
+    id: str = Field(default_factory=new_id)
     name: str
     description: str
     opener: str
-    opinions: list[str]
+    opinions: dict[str, str] = Field(default_factory=dict)
+
+    def details(self) -> str:
+        lines = [
+            f"Name: {self.name} || Description: {self.description}\n || Opening Statement: {self.opener}"
+        ]
+        lines.extend(f"Opinion: {opinion}" for opinion in self.opinions.values())
+        return "\n".join(lines) + "\n"
 
 
 class State:
+    """
+    Debate state with participants indexed by ID and by name.
+
+    Every lookup, rename and opinion edit is O(1). Each participant's
+    serialized details are cached and only rebuilt after that participant
+    changes; the brief cache is keyed on them.
+    """
+
     def __init__(self):
-        self.participants: list[Participant] = []
+        self.participants: dict[str, Participant] = {}
+        self.name_index: dict[str, str] = {}
         self.debate_context = ""
+        self.brief_cache: dict[str, str] = {}
+        self._details: dict[str, str] = {}
+
+    def _invalidate(self, participant_id: str) -> None:
+        self._details.pop(participant_id, None)
 
     def add_participant(self, participant: Participant) -> None:
         existing_participant = self.get_participant_by_name(participant.name)
         if existing_participant:
             st.warning(f"Participant {participant.name} already exists!")
             return
-        self.participants.append(participant)
+        self.participants[participant.id] = participant
+        self.name_index[participant.name] = participant.id
+        self._invalidate(participant.id)
 
-    def add_participant_opinion(self, name: str, opinion: str) -> None:
+    def add_participant_opinion(self, name: str, opinion: str) -> Optional[str]:
         participant = self.get_participant_by_name(name)
-        if participant:
-            participant.opinions.append(opinion)
-
-    def get_participant_by_name(self, name: str) -> Participant:
-        return next(
-            (
-                participant
-                for participant in self.participants
-                if participant.name == name
-            ),
-            None,
-        )
+        if not participant:
+            return None
+        opinion_id = new_id()
+        participant.opinions[opinion_id] = opinion
+        self._invalidate(participant.id)
+        return opinion_id
+
+    def get_participant(self, participant_id: str) -> Optional[Participant]:
+        return self.participants.get(participant_id)
+
+    def get_participant_by_name(self, name: str) -> Optional[Participant]:
+        participant_id = self.name_index.get(name)
+        return self.participants.get(participant_id) if participant_id else None
 
     def add_debate_context(self, context: str) -> None:
         self.debate_context = context
@@ -51,23 +88,46 @@ class State:
         return self.debate_context
 
     def get_participants(self) -> list[Participant]:
-        return self.participants
-
-    def update_participant(self, participant: Participant) -> None:
-        existing_participant = self.get_participant_by_name(participant.name)
-        if existing_participant:
-            existing_participant = participant
+        return list(self.participants.values())
+
+    def update_participant(
+        self, participant_id: str, name: str, description: str, opener: str
+    ) -> bool:
+        participant = self.get_participant(participant_id)
+        if not participant:
+            return False
+        if name != participant.name:
+            if name in self.name_index:
+                st.warning(f"Participant {name} already exists!")
+                return False
+            del self.name_index[participant.name]
+            self.name_index[name] = participant_id
+        participant.name = name
+        participant.description = description
+        participant.opener = opener
+        self._invalidate(participant_id)
+        return True
 
     def update_participant_opinion(
-        self, name: str, old_opinion: str, opinion: str
+        self, name: str, opinion_id: str, opinion: str
     ) -> None:
         participant = self.get_participant_by_name(name)
-        try:
-            participant.opinions.remove(old_opinion)
-        except ValueError:
-            print(f"Opinion {old_opinion} not found for participant {name}")
-        if participant:
-            participant.opinions.append(opinion)
+        if not participant or opinion_id not in participant.opinions:
+            print(f"Opinion {opinion_id} not found for participant {name}")
+            return
+        participant.opinions[opinion_id] = opinion
+        self._invalidate(participant.id)
+
+    def delete_participant_opinion(self, name: str, opinion_id: str) -> None:
+        participant = self.get_participant_by_name(name)
+        if participant and participant.opinions.pop(opinion_id, None) is not None:
+            self._invalidate(participant.id)
+
+    def get_participant_details(self, participant: Participant) -> str:
+        details = self._details.get(participant.id)
+        if details is None:
+            details = self._details[participant.id] = participant.details()
+        return details
 
 
 @st.dialog("🙋🏽‍♂️ Add Participant")
@@ -78,7 +138,7 @@ def add_participant_dialog(state: State):
     add_participant_button = st.button("Add Participant")
     if add_participant_button:
         participant = Participant(
-            name=participant_name, description=participant_description, opener=participant_opener, opinions=[]
+            name=participant_name, description=participant_description, opener=participant_opener
         )
         state.add_participant(participant)
         st.rerun()
@@ -94,22 +154,21 @@ def add_opinion_dialog(state: State, participant_name: str):
 
 
 @st.dialog("🦉 Edit Opinion")
-def edit_opinion_dialog(state: State, participant_name: str, opinion: str):
-    old_opinion = opinion
+def edit_opinion_dialog(state: State, participant_name: str, opinion_id: str, opinion: str):
     new_opinion = st.text_area("Opinion", value=opinion)
     submit_opinion_button = st.button(
-        "Submit", key=f"submit_opinion_{participant_name}"
+        "Submit", key=f"submit_opinion_{opinion_id}"
     )
     if submit_opinion_button:
         state.update_participant_opinion(
-            name=participant_name, old_opinion=old_opinion, opinion=new_opinion
+            name=participant_name, opinion_id=opinion_id, opinion=new_opinion
         )
         st.rerun()
 
 
 @st.dialog("🦉 Edit Participant")
-def edit_participant_dialog(state: State, participant_name: str, participant_description: str, participant_opener: str):
-    participant = state.get_participant_by_name(participant_name)
+def edit_participant_dialog(state: State, participant_id: str):
+    participant = state.get_participant(participant_id)
     participant_name = st.text_input("Participant Name", value=participant.name)
     participant_description = st.text_area(
         "Participant Description", value=participant.description
@@ -118,26 +177,18 @@ def edit_participant_dialog(state: State, participant_name: str, participant_des
         "Participant Opening Statement", value=participant.opener
     )
     submit_participant_button = st.button(
-        "Submit", key=f"submit_participant_{participant_name}"
+        "Submit", key=f"submit_participant_{participant_id}"
     )
     if submit_participant_button:
-        participant.name = participant_name
-        participant.description = participant_description
-        participant.opener = participant_opener
-        state.update_participant(participant)
-        st.rerun()
+        updated = state.update_participant(
+            participant_id, participant_name, participant_description, participant_opener
+        )
+        if updated:
+            st.rerun()
 
 
-def generate_debate_resolution(participants: list[Participant], debate_context: str):
+def generate_debate_resolution(participants_details: str, debate_context: str):
     try:
-        participants_details = ""
-        for participant in participants:
-            participants_details += (
-                f"Name: {participant.name} || Description: {participant.description}\n || Opening Statement: {participant.opener}\n"
-            )
-            for opinion in participant.opinions:
-                participants_details += f"Opinion: {opinion}\n"
-
         system_prompt = f""""
             You are an advanced AI Debate Resolver built to act as an impartial mediator between two opposing arguments on any given topic. Your core purpose is to deliver a fair, unbiased, and evidence-based resolution by deeply analyzing both sides without any favoritism or emotional influence.
             Generate a resolution (output) for the debate in a proper markdown format. Also provide a detailed analysis of each side, fact verification report, strength & weakness breakdown, persuasion & bias score table, and a final conclusion.
@@ -195,7 +246,7 @@ def generate_debate_resolution(participants: list[Participant], debate_context:
             """
 
         response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
+            model=DEFAULT_OPENAI_MODEL,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {
@@ -213,6 +264,95 @@ def generate_debate_resolution(participants: list[Participant], debate_context:
         return "Failed to generate resolution. Please try again later."
 
 
+BRIEF_SYSTEM_PROMPT = """
+    You are preparing a debate brief for an impartial adjudicator.
+    Condense the participant's opening statement and opinions into a short markdown brief:
+    - List each core claim in one line.
+    - Tag every claim as ✅ Factually Accurate, ❌ False/Misleading or ⚠ Unverified/Opinion-Based.
+    - Note any logical fallacies or emotional appeals.
+    Keep the participant's name as the heading. Do not judge the debate itself.
+"""
+
+
+def brief_cache_key(participant_details: str, debate_context: str) -> str:
+    return hashlib.sha256(f"{debate_context}\0{participant_details}".encode("utf-8")).hexdigest()
+
+
+def generate_participant_brief(participant_details: str, debate_context: str) -> Optional[str]:
+    """
+    Summarizes and fact-tags one participant's arguments.
+
+    Returns None if the call fails.
+    """
+    try:
+        response = openai_client.chat.completions.create(
+            model=DEFAULT_OPENAI_MODEL,
+            messages=[
+                {"role": "system", "content": BRIEF_SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": f"Debate Context: {debate_context}\nParticipant: {participant_details}",
+                },
+            ],
+        )
+        return response.choices[0].message.content
+    except Exception as e:
+        print(f"Failed to generate participant brief. Error: {str(e)}")
+        traceback.print_exc()
+        return None
+
+
+def get_participant_briefs(state: State, debate_context: str) -> list[str]:
+    """
+    Returns one brief per participant, generating only the stale ones.
+
+    Briefs are cached on the state by a hash of the participant's details and
+    the debate context, so after a small edit only that participant is
+    re-briefed. Missing briefs are generated concurrently. A failed brief
+    falls back to the raw details for this run only and is retried next time.
+    """
+    details = [state.get_participant_details(participant) for participant in state.get_participants()]
+    keys = [brief_cache_key(participant_details, debate_context) for participant_details in details]
+    stale = {
+        key: participant_details
+        for key, participant_details in zip(keys, details)
+        if key not in state.brief_cache
+    }
+    fresh = {}
+    if stale:
+        with ThreadPoolExecutor(max_workers=MAX_BRIEF_WORKERS) as executor:
+            briefs = executor.map(
+                lambda participant_details: generate_participant_brief(participant_details, debate_context),
+                stale.values(),
+            )
+            fresh = dict(zip(stale.keys(), briefs))
+
+    # Drop briefs of edited or removed participants, and never cache fallbacks.
+    state.brief_cache = {
+        key: state.brief_cache.get(key) or fresh[key]
+        for key in keys
+        if key in state.brief_cache or fresh.get(key) is not None
+    }
+    return [state.brief_cache.get(key) or stale[key] for key in keys]
+
+
+def resolve_debate(state: State) -> str:
+    """
+    Resolves the debate in two stages: per-participant briefs, then adjudication.
+
+    Args:
+        state (State): The debate state.
+
+    Returns:
+        str: The markdown resolution.
+    """
+    debate_context = state.get_debate_context()
+    briefs = get_participant_briefs(state, debate_context)
+    return generate_debate_resolution(
+        participants_details="\n\n".join(briefs), debate_context=debate_context
+    )
+
+
 def main():
     app_state = None
     if "app_state" not in st.session_state:
@@ -250,41 +390,38 @@ def main():
     st.markdown("## Participants")
     for participant in participants:
         st.write(f"**{participant.name}**: {participant.description} \n\n **Opening Statement:** {participant.opener}")
-        if len(participant.opinions) > 0:
+        if participant.opinions:
             st.markdown("### Opinions")
-            opinion_count = 0
-            for opinion in participant.opinions:
+            for opinion_id, opinion in list(participant.opinions.items()):
                 st.write(f"- {opinion}")
                 edit_opinion_button = st.button(
                     "Edit Opinion",
-                    key=f"edit_opinion_main_{participant.name}_{str(opinion_count)}",
+                    key=f"edit_opinion_main_{opinion_id}",
                 )
                 if edit_opinion_button:
                     edit_opinion_dialog(
                         state=app_state,
                         participant_name=participant.name,
+                        opinion_id=opinion_id,
                         opinion=opinion,
                     )
                 delete_opinion = st.button(
-                    "Delete Opinion", key=f"delete_opinion_main_{str(opinion_count)}"
+                    "Delete Opinion", key=f"delete_opinion_main_{opinion_id}"
                 )
                 if delete_opinion:
-                    participant.opinions.remove(opinion)
+                    app_state.delete_participant_opinion(participant.name, opinion_id)
                     st.rerun()
-                opinion_count += 1
             st.write("---")
         cols = st.columns([1, 8])
         with cols[0]:
             edit_participant = st.button(
-                f"Edit Participant", key=f"edit_participant_{participant.name}"
+                f"Edit Participant", key=f"edit_participant_{participant.id}"
             )
             if edit_participant:
-                edit_participant_dialog(
-                    state=app_state, participant_name=participant.name, participant_description=participant.description, participant_opener=participant.opener
-                )
+                edit_participant_dialog(state=app_state, participant_id=participant.id)
         with cols[1]:
             add_opinion_button = st.button(
-                f"Add Opinion", key=f"add_opinion_{participant.name}"
+                f"Add Opinion", key=f"add_opinion_{participant.id}"
             )
             if add_opinion_button:
                 add_opinion_dialog(state=app_state, participant_name=participant.name)
@@ -298,10 +435,8 @@ def main():
         if len(participants) < 2:
             st.error("Please add atleast 2 participants!")
             return
-        spinner = st.spinner("Generating resolution...")
-        resolution = generate_debate_resolution(
-            participants=participants, debate_context=debate_context_input
-        )
+        with st.spinner("Generating resolution..."):
+            resolution = resolve_debate(app_state)
         st.markdown("## 🎉 Debate Resolution")
         st.write(resolution)
         st.success("🎉 Resolution ready!")
@@ -0,0 +1,249 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+import re
+from typing import Deque, Dict, List, Optional
+from uuid import uuid4
+import streamlit as st
+
+
+## Constants
+DEFAULT_HISTORY_PATH = "data/app_history.db"
+DEFAULT_RING_SIZE = 200
+DEFAULT_PAGE_SIZE = 20
+# A history with no new entry for this long is pruned as a whole.
+DEFAULT_RETENTION_SECONDS = 7 * 24 * 60 * 60
+# The per-user history ID lives in the URL, so it survives refreshes and server restarts.
+HISTORY_QUERY_PARAM = "history"
+HISTORY_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+MAX_OPEN_HISTORIES = 256
+# Sorts after any real character, so [prefix, prefix + PREFIX_END) is an index range.
+PREFIX_END = "\U0010ffff"
+
+
+@dataclass
+class HistoryEntry:
+    id: int
+    category: str
+    entry: str
+    created_at: float
+
+
+class HistoryStore:
+    """
+    A persistent, searchable history log for one user of a small Streamlit app.
+
+    Every row carries the user's history ID and every query filters on it, so
+    visitors never see (or delete) each other's history. Entries go to an
+    append-only SQLite table and into bounded in-memory ring
+    buffers (one for all entries and one per category) holding the most
+    recent ones. Pages that fall inside a ring buffer are served from memory.
+    Older pages and prefix searches use indexed queries, so the cost of
+    rendering a page does not depend on how long the history is.
+    """
+
+    def __init__(
+        self,
+        app: str,
+        history_id: str,
+        path: str = DEFAULT_HISTORY_PATH,
+        ring_size: int = DEFAULT_RING_SIZE,
+        retention_seconds: float = DEFAULT_RETENTION_SECONDS,
+    ):
+        self.app = app
+        self.history_id = history_id
+        self.ring_size = ring_size
+        self._rings: Dict[Optional[str], Deque[HistoryEntry]] = {}
+        self._counts: Dict[Optional[str], int] = {}
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS history
+               (id INTEGER PRIMARY KEY AUTOINCREMENT, app TEXT, history_id TEXT, category TEXT,
+                entry TEXT, search_key TEXT, created_at REAL)"""
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(history)")]
+        if "history_id" not in columns:
+            self._conn.execute("ALTER TABLE history ADD COLUMN history_id TEXT")
+        for index in (
+            "idx_history_app",
+            "idx_history_category",
+            "idx_history_search",
+            "idx_history_session",
+            "idx_history_session_category",
+            "idx_history_session_search",
+        ):
+            self._conn.execute(f"DROP INDEX IF EXISTS {index}")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_history_user ON history (app, history_id, id)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_history_user_category ON history (app, history_id, category, id)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_history_user_search ON history (app, history_id, search_key)"
+        )
+        self._conn.execute(
+            """DELETE FROM history WHERE app = ? AND history_id IN (
+                   SELECT history_id FROM history WHERE app = ?
+                   GROUP BY history_id HAVING MAX(created_at) < ?)""",
+            (app, app, time.time() - retention_seconds),
+        )
+        self._conn.commit()
+
+    def _filters(self, category: Optional[str], prefix: str = ""):
+        clauses, params = ["app = ? AND history_id = ?"], [self.app, self.history_id]
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if prefix:
+            clauses.append("search_key >= ? AND search_key < ?")
+            params.extend([prefix.lower(), prefix.lower() + PREFIX_END])
+        return " AND ".join(clauses), params
+
+    def _query(self, category: Optional[str], prefix: str, limit: int, offset: int) -> List[HistoryEntry]:
+        where, params = self._filters(category, prefix)
+        rows = self._conn.execute(
+            f"""SELECT id, category, entry, created_at FROM history
+                WHERE {where} ORDER BY id DESC LIMIT ? OFFSET ?""",
+            [*params, limit, offset],
+        ).fetchall()
+        return [HistoryEntry(*row) for row in rows]
+
+    def _ring(self, category: Optional[str]) -> Deque[HistoryEntry]:
+        # Loaded lazily, newest first.
+        if category not in self._rings:
+            self._rings[category] = deque(
+                self._query(category, "", self.ring_size, 0), maxlen=self.ring_size
+            )
+        return self._rings[category]
+
+    def append(self, entry: str, category: str = "") -> HistoryEntry:
+        """
+        Adds an entry to the log.
+
+        Args:
+            entry (str): The text to record, e.g. "Addition : 1 + 2 = 3".
+            category (str): An optional group, e.g. "Increment".
+
+        Returns:
+            HistoryEntry: The stored entry.
+        """
+        created_at = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """INSERT INTO history (app, history_id, category, entry, search_key, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (self.app, self.history_id, category, entry, entry.lower(), created_at),
+            )
+            self._conn.commit()
+            item = HistoryEntry(cursor.lastrowid, category, entry, created_at)
+            for key in (None, category):
+                if key in self._rings:
+                    self._rings[key].appendleft(item)
+                if key in self._counts:
+                    self._counts[key] += 1
+        return item
+
+    def count(self, category: Optional[str] = None, prefix: str = "") -> int:
+        """Returns the number of entries, optionally within a category or matching a prefix."""
+        with self._lock:
+            if not prefix and category in self._counts:
+                return self._counts[category]
+            where, params = self._filters(category, prefix)
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM history WHERE {where}", params
+            ).fetchone()[0]
+            if not prefix:
+                self._counts[category] = total
+            return total
+
+    def page(
+        self,
+        page: int,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        category: Optional[str] = None,
+        prefix: str = "",
+    ) -> List[HistoryEntry]:
+        """
+        Returns one page of entries, newest first.
+
+        Args:
+            page (int): The zero-based page number.
+            page_size (int): The number of entries per page.
+            category (Optional[str]): Only entries of this category, or all if None.
+            prefix (str): Only entries starting with this text (case-insensitive).
+
+        Returns:
+            List[HistoryEntry]: The entries on the page.
+        """
+        start, end = page * page_size, (page + 1) * page_size
+        with self._lock:
+            if not prefix:
+                ring = self._ring(category)
+                if end <= len(ring) or len(ring) < self.ring_size:
+                    return [ring[i] for i in range(start, min(end, len(ring)))]
+            return self._query(category, prefix, page_size, start)
+
+    def clear(self, category: Optional[str] = None) -> None:
+        """Deletes this user's history, or only one category of it."""
+        with self._lock:
+            where, params = self._filters(category)
+            self._conn.execute(f"DELETE FROM history WHERE {where}", params)
+            self._conn.commit()
+            self._rings.clear()
+            self._counts.clear()
+
+
+@st.cache_resource(max_entries=MAX_OPEN_HISTORIES)
+def _get_history_store(app: str, history_id: str) -> HistoryStore:
+    # One store per history, so tabs sharing a history ID also share its ring buffers.
+    return HistoryStore(app, history_id)
+
+
+def get_user_history(app: str) -> HistoryStore:
+    """
+    Returns the current user's history store for the app.
+
+    The history ID is read from the `history` query parameter, and a new one
+    is generated and written to the URL on the first visit. Refreshing or
+    bookmarking the page keeps the same history, also across server restarts.
+    """
+    history_id = st.query_params.get(HISTORY_QUERY_PARAM, "")
+    if not HISTORY_ID_PATTERN.fullmatch(history_id):
+        history_id = uuid4().hex
+        st.query_params[HISTORY_QUERY_PARAM] = history_id
+    return _get_history_store(app, history_id)
+
+
+def render_history(
+    store: HistoryStore, key: str, category: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE
+) -> None:
+    """
+    Renders a searchable, paginated view of the history.
+
+    Only the visible page is fetched and it is drawn as a single element, so
+    reruns cost the same however long the history grows.
+
+    Args:
+        store (HistoryStore): The history to show.
+        key (str): A unique widget key prefix.
+        category (Optional[str]): Only show this category.
+        page_size (int): The number of entries per page.
+    """
+    prefix = st.text_input("🔎 Search", key=f"{key}_search", placeholder="Starts with...")
+    total = store.count(category, prefix)
+    if not total:
+        st.info("No matching entries" if prefix else "No history yet")
+        return
+    total_pages = -(-total // page_size)
+    page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1, key=f"{key}_page")
+    st.caption(f"{total} entries · page {page} of {total_pages}")
+    entries = store.page(page - 1, page_size, category, prefix)
+    st.text("\n".join(item.entry for item in entries))
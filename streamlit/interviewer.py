@@ -1,25 +1,21 @@
-import reportlab.lib
 import streamlit as st
 import traceback
 import os
-from typing import List, Any
+from typing import List, Any, Optional, Iterator, Tuple, Union
+from pydantic import BaseModel, ValidationError
 import openai
 from dotenv import load_dotenv
-import markdown2
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageTemplate, Frame
-from reportlab.pdfgen.canvas import Canvas
-from reportlab.platypus.flowables import HRFlowable
-import reportlab
+from pdf_export import export_markdown_pdf, PDF_MIME_TYPE
 from PyPDF2 import PdfReader
 import io
+import json
+import hashlib
 
 
 ## Constants
 DEFAULT_NUM_QUESTIONS = 10
 DEFAULT_OPENAI_MODEL = "gpt-4o-mini"
+RESUME_CACHE_MAX_ENTRIES = 32
 
 
 
@@ -36,75 +32,241 @@ def init():
     openai.api_key = os.getenv("OPENAI_API_KEY")
 
 
-def generate_questions(
+class InterviewQuestion(BaseModel):
+    category: str
+    question: str
+
+
+QUESTION_SYSTEM_PROMPT = """
+    You are Balesh, an intelligent and professional AI hiring manager.
+    You are sharp, can judge candidates by asking great questions and know how to optimize the hiring process of a company.
+    You ask professional, technical, behavioural and general (culture) questions to get the right, balanced evaluation of the candidate.
+    You will be evaluating candidates for multiple roles at a company, respond accordingly.
+
+    Respond in JSON Lines: one JSON object per line and nothing else, following this schema:
+    {"category": "Technical" | "Behavioral" | "HR", "question": "<the question>"}
+"""
+
+
+def _as_text(value: Union[str, List[str]]) -> str:
+    return value if isinstance(value, str) else ", ".join(value)
+
+
+def build_question_prompt(
+    role: str,
+    num_questions: int,
+    skills: str,
+    experience: str,
+    projects: str,
+    resume_content: str,
+) -> str:
+    """
+    Builds the question prompt from the role, inputs and resume.
+
+    Args:
+        role (str): The job role for which the questions are being generated.
+        num_questions (int): The number of questions to generate.
+        skills (str): The key skills required for the job role.
+        experience (str): The work experience required for the job role.
+        projects (str): The projects that the candidate has worked on.
+        resume_content (str): The parsed resume text, empty without a resume.
+
+    Returns:
+        str: The prompt.
+    """
+    if resume_content:
+        focus = f"Evaluate and generate the questions based on the resume.\nResume: '''{resume_content}'''"
+    else:
+        focus = (
+            "Focus on evaluating:\n"
+            f"- Skills: '''{skills}'''\n"
+            f"- Work Experience: {experience}\n"
+            f"- Projects: {projects}"
+        )
+    return f"""
+    Generate {num_questions} personalized interview questions for a candidate applying for the role of '{role}'.
+
+    The questions should be a mix of technical, behavioral, and HR questions.
+
+    {focus}
+
+    Include scenario-based questions, problem-solving questions, and questions that assess the candidate's contribution to past projects.
+    """
+
+
+def parse_question_line(line: str) -> Optional[InterviewQuestion]:
+    """
+    Parses and validates one JSON Lines record against the question schema.
+
+    Args:
+        line (str): A single line of model output.
+
+    Returns:
+        Optional[InterviewQuestion]: The question, or None if the line is not a valid record.
+    """
+    line = line.strip().rstrip(",")
+    if not line.startswith("{"):
+        return None
+    try:
+        return InterviewQuestion.model_validate_json(line)
+    except ValidationError:
+        return None
+
+
+def parse_question_buffer(text: str) -> List[InterviewQuestion]:
+    """
+    Parses questions from a whole model response that is not JSON Lines.
+
+    Accepts pretty-printed objects, a JSON array, or an object wrapping a
+    list of questions, with or without a markdown code fence around them.
+
+    Args:
+        text (str): The full model output.
+
+    Returns:
+        List[InterviewQuestion]: The valid questions found, in order.
+    """
+    decoder = json.JSONDecoder()
+    records, index = [], 0
+    while True:
+        starts = [i for i in (text.find("{", index), text.find("[", index)) if i >= 0]
+        if not starts:
+            break
+        try:
+            value, index = decoder.raw_decode(text, min(starts))
+        except ValueError:
+            index = min(starts) + 1
+            continue
+        if isinstance(value, dict):
+            nested = [v for v in value.values() if isinstance(v, list)]
+            records.extend(nested[0] if nested and "question" not in value else [value])
+        elif isinstance(value, list):
+            records.extend(value)
+
+    questions = []
+    for record in records:
+        try:
+            questions.append(InterviewQuestion.model_validate(record))
+        except ValidationError:
+            continue
+    return questions
+
+
+def stream_questions(
     role: str,
-    skills: List[str],
-    experience: List[str],
-    projects: List[str],
+    skills: Union[str, List[str]],
+    experience: Union[str, List[str]],
+    projects: Union[str, List[str]],
     num_questions=DEFAULT_NUM_QUESTIONS,
     resume_content="",
-) -> List[str]:
+) -> Iterator[InterviewQuestion]:
     """
-    Generate questions for a job role based on the specified skills, experience, and projects.
+    Streams interview questions, yielding each one as soon as its line completes.
 
     Args:
         - role (str): The job role for which the questions are being generated.
+        - skills (str | List[str]): The key skills required for the job role.
+        - experience (str | List[str]): The work experience required for the job role.
+        - projects (str | List[str]): The projects that the candidate has worked on.
         - num_questions (int): The number of questions to generate.
-        - skills (List[str]): The key skills required for the job role.
-        - experience (List[str]): The work experience required for the job role.
-        - projects (List[str]): The projects that the candidate has worked on.
+        - resume_content (str): The parsed resume text, if any.
+
+    Yields:
+        - InterviewQuestion: The next validated question.
+    """
+    prompt = build_question_prompt(
+        role, num_questions, _as_text(skills), _as_text(experience), _as_text(projects), resume_content
+    )
+
+    stream = openai.chat.completions.create(
+        model=DEFAULT_OPENAI_MODEL,
+        messages=[
+            {"role": "system", "content": QUESTION_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ],
+        stream=True,
+    )
+
+    buffer, parts, yielded = "", [], 0
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if not delta:
+            continue
+        parts.append(delta)
+        buffer += delta
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            question = parse_question_line(line)
+            if question:
+                yielded += 1
+                yield question
+
+    question = parse_question_line(buffer)
+    if question:
+        yielded += 1
+        yield question
+
+    # The model ignored the JSON Lines format: parse the whole response instead.
+    if not yielded:
+        yield from parse_question_buffer("".join(parts))
+
+
+def format_question(index: int, question: InterviewQuestion) -> str:
+    return f"{index}. **[{question.category}]** {question.question}"
+
+
+def question_cache_key(
+    role: str,
+    skills: str,
+    experience: str,
+    projects: str,
+    num_questions: int,
+    resume_content: str,
+) -> Tuple:
+    resume_hash = hashlib.sha256(resume_content.encode()).hexdigest() if resume_content else ""
+    return (role.strip().lower(), num_questions, skills, experience, projects, resume_hash)
+
+
+def render_streamed_questions(cache_key: Tuple, fresh: bool, **question_args) -> List[str]:
+    """
+    Renders questions into the page one by one as they stream in.
+
+    Completed question lists are kept in a per-session result cache, so
+    regenerating with the same inputs renders instantly without an API call.
+
+    Args:
+        cache_key (Tuple): The key identifying the inputs.
+        fresh (bool): Ignore the cached result and generate new questions.
+        **question_args: The arguments forwarded to `stream_questions`.
 
     Returns:
-        - List[str]: A list of generated questions.
+        List[str]: The formatted questions.
     """
+    cache = st.session_state.setdefault("question_cache", {})
+    if not fresh and cache_key in cache:
+        questions = cache[cache_key]
+        st.markdown("\n".join(questions))
+        st.caption("⚡ Loaded from cache")
+        return questions
+
+    questions: List[str] = []
     try:
-        prompt = f"""
-        Generate {num_questions} personalized interview questions for a candidate applying for the role of '{role}'.
-
-        The questions should be a mix of technical, behavioral, and HR questions. 
-        
-        Focus on evaluating:
-        - Skills: '''{",".join(skills)}'''
-        - Work Experience: {",".join(experience)}, 
-        - Projects: {",".join(projects)}. 
-        
-        Include scenario-based questions, problem-solving questions, and questions that assess the candidate's contribution to past projects.
-        """
-
-        if resume_content:
-            prompt += f"""
-            Generate {num_questions} personalized interview questions for a candidate applying for the role of '{role}'.
-
-            The questions should be a mix of technical, behavioral, and HR questions. 
-            
-            Evaluate and generate the questions based on the resume.
-            Resume: '''{resume_content}'''
-
-            Include scenario-based questions, problem-solving questions, and questions that assess the candidate's contribution to past projects.
-            """
-
-        system = f"""
-            You are Balesh, an intelligent and professional AI hiring manager. 
-            You are sharp, can judge candidates by asking great questions and know how to optimize the hiring process of a company. 
-            You ask professional, technical, behavioural and general (culture) questions to get the right, balanced evaluation of the candidate. 
-            You will be evaluating candidates for multiple roles at a company, respond accordingly.
-        """
-
-        response = openai.chat.completions.create(
-            model=DEFAULT_OPENAI_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": system,
-                },
-                {"role": "user", "content": prompt},
-            ],
-        )
-        return response.choices[0].message.content.split("\n")
+        for index, question in enumerate(stream_questions(**question_args), start=1):
+            formatted = format_question(index, question)
+            questions.append(formatted)
+            st.markdown(formatted)
     except Exception as e:
         print(f"Failed to generate questions: {e}")
         traceback.print_exc()
-        return []
+        st.error("❌ Failed to generate questions. Please try again.")
+        return questions
+
+    if questions:
+        cache[cache_key] = questions
+    else:
+        st.error("❌ The model did not return any questions in the expected format. Please try again.")
+    return questions
+
 
 def analyze_resume(candidate_resume: str, job_role: str) -> str:
     f"""
@@ -161,216 +323,58 @@ def analyze_resume(candidate_resume: str, job_role: str) -> str:
     return response.choices[0].message.content
 
 
-def add_header_footer(canvas: Canvas, doc: SimpleDocTemplate) -> None:
+def generate_pdf(content: str, title: str) -> Optional[bytes]:
     """
-    Adds a header and footer to each page of the PDF.
+    Generates a professional PDF from the given markdown content in memory.
 
     Args:
-        canvas (Canvas): The ReportLab canvas object.
-        doc (SimpleDocTemplate): The document being generated.
-    """
-    canvas.saveState()
-    _, height = A4
-
-    # Header
-    canvas.setFont("Helvetica-Bold", 14)
-    canvas.drawString(50, height - 50, "📄 Enterprise Report")
-
-    # Footer with page number
-    canvas.setFont("Helvetica", 10)
-    canvas.setFillColor(colors.grey)
-    canvas.drawString(50, 30, f"Page {doc.page}")
-
-    canvas.restoreState()
-
-
-def get_styled_paragraph(text: str, style_name: str) -> Paragraph:
-    """
-    Returns a styled paragraph for the PDF.
-
-    Args:
-        text (str): The content of the paragraph.
-        style_name (str): The predefined style name.
+        content (str): The text content to include in the PDF.
+        title (str): The title shown at the top of the document.
 
     Returns:
-        Paragraph: A formatted paragraph object.
-    """
-    styles = getSampleStyleSheet()
-
-    custom_styles = {
-        "Title": ParagraphStyle(
-            "Title",
-            fontName="Helvetica-Bold",
-            fontSize=18,
-            spaceAfter=12,
-            textColor=colors.darkblue,
-            alignment=1,  # Centered
-        ),
-        "Heading1": ParagraphStyle(
-            "Heading1",
-            parent=styles["Heading1"],
-            fontName="Helvetica-Bold",
-            fontSize=18,
-            spaceAfter=12,
-            textColor=colors.darkblue,
-        ),
-        "Heading2": ParagraphStyle(
-            "Heading2",
-            parent=styles["Heading2"],
-            fontName="Helvetica-Bold",
-            fontSize=16,
-            spaceAfter=10,
-            textColor=colors.darkred,
-        ),
-        "Heading3": ParagraphStyle(
-            "Heading3",
-            parent=styles["Heading3"],
-            fontName="Helvetica-Bold",
-            fontSize=14,
-            spaceAfter=8,
-            textColor=colors.darkgreen,
-        ),
-        "BodyText": ParagraphStyle(
-            "BodyText",
-            parent=styles["Normal"],
-            fontName="Helvetica",
-            fontSize=12,
-            leading=16,
-            spaceAfter=8,
-        ),
-        "CodeBlock": ParagraphStyle(
-            "CodeBlock",
-            parent=styles["Normal"],
-            fontName="Courier",
-            fontSize=11,
-            backColor=colors.lightgrey,
-            spaceBefore=5,
-            spaceAfter=5,
-            leftIndent=20,
-        ),
-        "ListItem": ParagraphStyle(
-            "ListItem",
-            parent=styles["Normal"],
-            fontName="Helvetica",
-            fontSize=12,
-            leftIndent=20,
-            bulletIndent=15,
-            spaceAfter=5,
-        ),
-    }
-
-    return Paragraph(text, custom_styles.get(style_name, styles["Normal"]))
-
-
-def markdown_to_pdf(content: str, filename: str) -> None:
-    """
-    Converts Markdown content to a professionally styled PDF.
-
-    Args:
-        content (str): The markdown content to be converted.
-        filename (str): The output PDF file name.
+        Optional[bytes]: The PDF document, or None if rendering failed.
     """
     try:
-        # Setup the document
-        doc = SimpleDocTemplate(
-            filename,
-            pagesize=A4,
-            leftMargin=50,
-            rightMargin=50,
-            topMargin=80,
-            bottomMargin=50,
-        )
-
-        elements: List[Paragraph] = []
-
-        elements.append(get_styled_paragraph("📄 Interview Questions", "Title"))
-        elements.append(Spacer(1, 12))
-
-        # Convert Markdown to HTML
-        md_html = markdown2.markdown(content, extras=["tables", "fenced-code-blocks"])
-        md_lines = md_html.split("\n")
-
-        for line in md_lines:
-            line = line.strip()
-            if not line:
-                continue  # Skip empty lines
-
-            if line.startswith("<h1>"):
-                elements.append(
-                    get_styled_paragraph(
-                        line.replace("<h1>", "").replace("</h1>", ""), "Heading1"
-                    )
-                )
-            elif line.startswith("<h2>"):
-                elements.append(
-                    get_styled_paragraph(
-                        line.replace("<h2>", "").replace("</h2>", ""), "Heading2"
-                    )
-                )
-            elif line.startswith("<h3>"):
-                elements.append(
-                    get_styled_paragraph(
-                        line.replace("<h3>", "").replace("</h3>", ""), "Heading3"
-                    )
-                )
-            elif line.startswith("<pre><code>") and line.endswith("</code></pre>"):
-                code_text = line.replace("<pre><code>", "").replace("</code></pre>", "")
-                elements.append(get_styled_paragraph(code_text, "CodeBlock"))
-            elif line.startswith("<ul><li>"):
-                list_item = line.replace("<ul><li>", "• ").replace("</li></ul>", "")
-                elements.append(get_styled_paragraph(list_item, "ListItem"))
-            elif line.startswith("<hr />"):
-                elements.append(
-                    HRFlowable(width="100%", thickness=1, color=colors.grey)
-                )
-            else:
-                elements.append(get_styled_paragraph(line, "BodyText"))
-
-            elements.append(Spacer(1, 6))  # Add small spacing between elements
-
-        # Define page template with header/footer
-        frame = Frame(
-            doc.leftMargin, doc.bottomMargin, doc.width, doc.height - 50, id="normal"
-        )
-        template = PageTemplate(id="page", frames=[frame], onPage=add_header_footer)
-        doc.addPageTemplates([template])
-
-        # Build the document
-        doc.build(elements)
-        print(f"✅ PDF successfully generated: {filename}")
-
+        return export_markdown_pdf(content, title)
     except Exception as e:
         print(f"❌ Error generating PDF: {e}")
+        traceback.print_exc()
+        return None
 
 
-def generate_pdf(content: str, filename: str) -> None:
+@st.cache_data(show_spinner=False, max_entries=RESUME_CACHE_MAX_ENTRIES)
+def extract_resume_text(resume_hash: str, _file_bytes: bytes) -> str:
     """
-    Generates a professional PDF from the given text content.
+    Extracts text from PDF bytes, cached by the SHA-256 of the upload.
+
+    Streamlit re-runs the script on every widget interaction, the cache makes
+    sure an already uploaded resume is parsed only once. The bytes argument is
+    prefixed with an underscore so Streamlit keys the cache on the hash alone.
 
     Args:
-        content (str): The text content to include in the PDF.
-        filename (str): The output PDF file name.
+        resume_hash (str): The SHA-256 hex digest of the PDF bytes.
+        _file_bytes (bytes): The raw PDF bytes.
+
+    Returns:
+        str: The extracted text content.
     """
-    return markdown_to_pdf(content, filename)
+    pdf_reader = PdfReader(io.BytesIO(_file_bytes))
+    return "".join(page.extract_text() or "" for page in pdf_reader.pages)
 
 
 def extract_resume_content_from_file(pdf_file: Any) -> str:
     """
-    Extracts text content from a PDF file.
+    Extracts text content from an uploaded PDF file.
 
     Args:
-        pdf_file (str): The path to the PDF file.
+        pdf_file (UploadedFile): The uploaded PDF file.
 
     Returns:
         str: The extracted text content.
     """
-    file_bytes = pdf_file.read()
-    pdf_reader = PdfReader(io.BytesIO(file_bytes))
-    resume_text = ""
-    for page_num in range(len(pdf_reader.pages)):
-        page = pdf_reader.pages[page_num]
-        resume_text += page.extract_text()
-    return resume_text
+    file_bytes = pdf_file.getvalue()
+    resume_hash = hashlib.sha256(file_bytes).hexdigest()
+    return extract_resume_text(resume_hash, file_bytes)
 
 
 def setup_streamlit_app() -> None:
@@ -425,6 +429,8 @@ def setup_streamlit_app() -> None:
                 "🚀 Projects", placeholder="e.g. Built a recommendation system", height=100
             )
 
+        fresh_questions = st.sidebar.checkbox("♻️ Generate fresh questions", value=False)
+
         if st.sidebar.button("🚀 Generate Questions"):
             if (
                 not role
@@ -433,25 +439,29 @@ def setup_streamlit_app() -> None:
                 or (not projects and not resume_text)
             ):
                 st.warning("⚠️ Please fill in all fields before generating questions.")
-            questions = generate_questions(
-                role=role,
-                skills=skills,
-                experience=experience,
-                projects=projects,
-                num_questions=num_questions,
-                resume_content=resume_text,
-            )
-            st.success("✅ Questions Generated!")
-            st.write("\n".join(questions))
-
-            generate_pdf("\n".join(questions), "Interview_Questions.pdf")
-            with open("Interview_Questions.pdf", "rb") as file:
-                st.download_button(
-                    "📄 Download Questions as PDF",
-                    file,
-                    "Interview_Questions.pdf",
-                    "application/pdf",
+                questions = []
+            else:
+                questions = render_streamed_questions(
+                    question_cache_key(role, skills, experience, projects, num_questions, resume_text),
+                    fresh=fresh_questions,
+                    role=role,
+                    skills=skills,
+                    experience=experience,
+                    projects=projects,
+                    num_questions=num_questions,
+                    resume_content=resume_text,
                 )
+            if questions:
+                st.success("✅ Questions Generated!")
+
+                pdf_bytes = generate_pdf("\n".join(questions), "📄 Interview Questions")
+                if pdf_bytes:
+                    st.download_button(
+                        "📄 Download Questions as PDF",
+                        pdf_bytes,
+                        "Interview_Questions.pdf",
+                        PDF_MIME_TYPE,
+                    )
     if resume_analyzer:
         role = st.sidebar.text_input("🔍 Job Role", placeholder="e.g. Data Scientist")
         uploaded_file = st.sidebar.file_uploader(
@@ -470,13 +480,13 @@ def setup_streamlit_app() -> None:
             st.success("✅ Resume Analyzed!")
             st.write(analysis)
 
-            generate_pdf(analysis, "Resume_Analysis.pdf")
-            with open("Resume_Analysis.pdf", "rb") as file:
+            pdf_bytes = generate_pdf(analysis, "📄 Resume Analysis")
+            if pdf_bytes:
                 st.download_button(
-                    "📄 Download Questions as PDF",
-                    file,
+                    "📄 Download Analysis as PDF",
+                    pdf_bytes,
                     "Resume_Analysis.pdf",
-                    "application/pdf",
+                    PDF_MIME_TYPE,
                 )
         
 if __name__ == "__main__":
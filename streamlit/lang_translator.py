@@ -1,5 +1,5 @@
 import streamlit as st
-from googletrans import Translator, LANGUAGES
+from translation_service import LANGUAGE_OPTIONS, TranslationService, get_language_code
 
 # Page Configuration
 st.set_page_config(
@@ -10,24 +10,22 @@ st.set_page_config(
 st.title("🌐 Professional Language Translator")
 st.markdown("Translate text, detect languages, and convert between text and speech with ease.")
 
-# Initialize Translator
-translator = Translator()
+# Shared translation service (translation cache + worker pool)
+@st.cache_resource
+def get_translation_service():
+    return TranslationService()
 
 # Sidebar for Features
 st.sidebar.title("Features")
 feature = st.sidebar.radio(
     "Choose a feature",
-    ["Text Translation", "Speech-to-Text", "Text-to-Speech", "Translation History"]
+    ["Text Translation", "Document Translation", "Speech-to-Text", "Text-to-Speech", "Translation History"]
 )
 
 # Initialize Session State
 if "history" not in st.session_state:
     st.session_state.history = []
 
-# Function to Get Language Code
-def get_language_code(language):
-    return list(LANGUAGES.keys())[list(LANGUAGES.values()).index(language.lower())]
-
 # Text Translation
 if feature == "Text Translation":
     st.header("Text Translation")
@@ -36,12 +34,12 @@ if feature == "Text Translation":
     
     source_language = st.selectbox(
         "Select source language:",
-        ["Auto-detect"] + [lang.capitalize() for lang in LANGUAGES.values()]
+        ("Auto-detect",) + LANGUAGE_OPTIONS
     )
     
     target_language = st.selectbox(
         "Select target language:",
-        [lang.capitalize() for lang in LANGUAGES.values()]
+        LANGUAGE_OPTIONS
     )
     
     # Disable the Translate button if no text is entered
@@ -58,15 +56,15 @@ if feature == "Text Translation":
                 )
                 dest_code = get_language_code(target_language)
                 
-                # Perform translation
-                translation = translator.translate(text_to_translate, src=src_code, dest=dest_code)
+                # Perform translation (cached lines are served instantly)
+                translated_text = get_translation_service().translate(text_to_translate, src_code, dest_code)
                 st.success(f"**Translated Text ({target_language}):**")
-                st.write(translation.text)
+                st.write(translated_text)
                 
                 # Add to history
                 st.session_state.history.append({
                     "source_text": text_to_translate,
-                    "translated_text": translation.text,
+                    "translated_text": translated_text,
                     "source_lang": source_language,
                     "target_lang": target_language
                 })
@@ -75,6 +73,42 @@ if feature == "Text Translation":
         else:
             st.warning("Please enter text to translate!")
 
+# Document Translation
+if feature == "Document Translation":
+    st.header("Document Translation")
+    st.markdown("Upload a `.txt` or `.md` file. It is translated segment by segment in parallel, keeping its markdown structure.")
+
+    uploaded_document = st.file_uploader("Upload a document:", type=["txt", "md"])
+
+    doc_source_language = st.selectbox("Select source language:", ("Auto-detect",) + LANGUAGE_OPTIONS, key="doc_src")
+    doc_target_language = st.selectbox("Select target language:", LANGUAGE_OPTIONS, key="doc_dest")
+
+    if st.button("Translate Document", disabled=uploaded_document is None):
+        document = uploaded_document.getvalue().decode("utf-8", errors="replace")
+        src_code = "auto" if doc_source_language == "Auto-detect" else get_language_code(doc_source_language)
+        dest_code = get_language_code(doc_target_language)
+
+        progress_bar = st.progress(0.0, text="Translating...")
+
+        def show_progress(done, total):
+            progress_bar.progress(done / total if total else 1.0, text=f"Translated {done}/{total} batches")
+
+        try:
+            translated_document = get_translation_service().translate_document(
+                document, src_code, dest_code, progress=show_progress
+            )
+            progress_bar.progress(1.0, text="Done")
+            st.success(f"**Translated Document ({doc_target_language}):**")
+            st.markdown(translated_document)
+            st.download_button(
+                "📥 Download Translation",
+                translated_document,
+                file_name=f"{dest_code}_{uploaded_document.name}",
+                mime="text/markdown",
+            )
+        except Exception as e:
+            st.error(f"Error: {e}")
+
 # Translation History (optional feature)
 if feature == "Translation History":
     st.header("Translation History")
@@ -0,0 +1,354 @@
+import re
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import (
+    Flowable,
+    Frame,
+    ListFlowable,
+    ListItem,
+    PageTemplate,
+    Paragraph,
+    Preformatted,
+    SimpleDocTemplate,
+    Spacer,
+    Table,
+    TableStyle,
+)
+from reportlab.platypus.flowables import HRFlowable
+
+
+## Style registry, built once at import time.
+_SAMPLE_STYLES = getSampleStyleSheet()
+
+STYLES: Dict[str, ParagraphStyle] = {
+    "Title": ParagraphStyle(
+        "Title",
+        fontName="Helvetica-Bold",
+        fontSize=18,
+        spaceAfter=12,
+        textColor=colors.darkblue,
+        alignment=1,  # Centered
+    ),
+    "Heading1": ParagraphStyle(
+        "Heading1",
+        parent=_SAMPLE_STYLES["Heading1"],
+        fontName="Helvetica-Bold",
+        fontSize=18,
+        spaceAfter=12,
+        textColor=colors.darkblue,
+    ),
+    "Heading2": ParagraphStyle(
+        "Heading2",
+        parent=_SAMPLE_STYLES["Heading2"],
+        fontName="Helvetica-Bold",
+        fontSize=16,
+        spaceAfter=10,
+        textColor=colors.darkred,
+    ),
+    "Heading3": ParagraphStyle(
+        "Heading3",
+        parent=_SAMPLE_STYLES["Heading3"],
+        fontName="Helvetica-Bold",
+        fontSize=14,
+        spaceAfter=8,
+        textColor=colors.darkgreen,
+    ),
+    "BodyText": ParagraphStyle(
+        "BodyText",
+        parent=_SAMPLE_STYLES["Normal"],
+        fontName="Helvetica",
+        fontSize=12,
+        leading=16,
+        spaceAfter=8,
+    ),
+    "CodeBlock": ParagraphStyle(
+        "CodeBlock",
+        parent=_SAMPLE_STYLES["Normal"],
+        fontName="Courier",
+        fontSize=11,
+        leading=14,
+        backColor=colors.lightgrey,
+        spaceBefore=5,
+        spaceAfter=5,
+        leftIndent=20,
+    ),
+    "ListItem": ParagraphStyle(
+        "ListItem",
+        parent=_SAMPLE_STYLES["Normal"],
+        fontName="Helvetica",
+        fontSize=12,
+        leading=16,
+        spaceAfter=5,
+    ),
+    "TableCell": ParagraphStyle(
+        "TableCell",
+        parent=_SAMPLE_STYLES["Normal"],
+        fontName="Helvetica",
+        fontSize=10,
+        leading=13,
+    ),
+}
+
+TABLE_STYLE = TableStyle(
+    [
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ]
+)
+
+## Block and inline patterns
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+FENCE_PATTERN = re.compile(r"^(```|~~~)")
+HR_PATTERN = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+UNORDERED_ITEM_PATTERN = re.compile(r"^\s*[-*+]\s+(.*)$")
+ORDERED_ITEM_PATTERN = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+TABLE_ROW_PATTERN = re.compile(r"^\s*\|.*\|\s*$")
+TABLE_SEPARATOR_PATTERN = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+
+INLINE_RULES = [
+    (re.compile(r"`([^`]+)`"), r'<font name="Courier">\1</font>'),
+    (re.compile(r"\*\*(.+?)\*\*|__(.+?)__"), lambda m: f"<b>{m.group(1) or m.group(2)}</b>"),
+    (re.compile(r"(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?![*\w])"), r"<i>\1</i>"),
+    (re.compile(r"\[([^\]]+)\]\(([^)\s]+)\)"), r'<link href="\2" color="blue">\1</link>'),
+]
+
+Token = Tuple[str, Any]
+
+
+def inline_markup(text: str) -> str:
+    """
+    Converts inline markdown (code, bold, italic, links) to ReportLab markup.
+
+    Args:
+        text (str): A single block of markdown text.
+
+    Returns:
+        str: The text escaped and converted to ReportLab paragraph markup.
+    """
+    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    for pattern, replacement in INLINE_RULES:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def _split_table_row(line: str) -> List[str]:
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+
+def tokenize_markdown(content: str) -> Iterator[Token]:
+    """
+    Walks the markdown once and yields block-level tokens.
+
+    Tokens are (type, payload) tuples:
+        - ("heading", (level, text))
+        - ("code", text)
+        - ("list", (ordered, items))
+        - ("table", rows)
+        - ("hr", None)
+        - ("paragraph", text)
+
+    Args:
+        content (str): The markdown content.
+
+    Yields:
+        Token: The next block token.
+    """
+    lines = content.splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+
+        if not stripped:
+            i += 1
+            continue
+
+        fence = FENCE_PATTERN.match(stripped)
+        if fence:
+            code_lines = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith(fence.group(1)):
+                code_lines.append(lines[i])
+                i += 1
+            i += 1  # Skip the closing fence
+            yield "code", "\n".join(code_lines)
+            continue
+
+        heading = HEADING_PATTERN.match(stripped)
+        if heading:
+            yield "heading", (len(heading.group(1)), heading.group(2))
+            i += 1
+            continue
+
+        if HR_PATTERN.match(stripped):
+            yield "hr", None
+            i += 1
+            continue
+
+        if (
+            TABLE_ROW_PATTERN.match(line)
+            and i + 1 < len(lines)
+            and TABLE_SEPARATOR_PATTERN.match(lines[i + 1])
+        ):
+            rows = [_split_table_row(line)]
+            i += 2
+            while i < len(lines) and TABLE_ROW_PATTERN.match(lines[i]):
+                rows.append(_split_table_row(lines[i]))
+                i += 1
+            yield "table", rows
+            continue
+
+        item_pattern = None
+        if UNORDERED_ITEM_PATTERN.match(line):
+            item_pattern = UNORDERED_ITEM_PATTERN
+        elif ORDERED_ITEM_PATTERN.match(line):
+            item_pattern = ORDERED_ITEM_PATTERN
+        if item_pattern:
+            items: List[str] = []
+            while i < len(lines) and lines[i].strip():
+                item = item_pattern.match(lines[i])
+                if item:
+                    items.append(item.group(1))
+                elif items and lines[i].startswith((" ", "\t")):
+                    items[-1] += " " + lines[i].strip()  # Continuation line
+                else:
+                    break
+                i += 1
+            yield "list", (item_pattern is ORDERED_ITEM_PATTERN, items)
+            continue
+
+        paragraph_lines = []
+        while i < len(lines) and lines[i].strip():
+            next_line = lines[i].strip()
+            if paragraph_lines and (
+                HEADING_PATTERN.match(next_line)
+                or FENCE_PATTERN.match(next_line)
+                or UNORDERED_ITEM_PATTERN.match(lines[i])
+                or ORDERED_ITEM_PATTERN.match(lines[i])
+            ):
+                break
+            paragraph_lines.append(next_line)
+            i += 1
+        yield "paragraph", " ".join(paragraph_lines)
+
+
+def _render_heading(payload: Tuple[int, str]) -> List[Flowable]:
+    level, text = payload
+    return [Paragraph(inline_markup(text), STYLES[f"Heading{min(level, 3)}"])]
+
+
+def _render_code(text: str) -> List[Flowable]:
+    return [Preformatted(text, STYLES["CodeBlock"])]
+
+
+def _render_list(payload: Tuple[bool, List[str]]) -> List[Flowable]:
+    ordered, items = payload
+    return [
+        ListFlowable(
+            [ListItem(Paragraph(inline_markup(item), STYLES["ListItem"])) for item in items],
+            bulletType="1" if ordered else "bullet",
+            start=None if ordered else "•",
+            leftIndent=20,
+        )
+    ]
+
+
+def _render_table(rows: List[List[str]]) -> List[Flowable]:
+    width = max(len(row) for row in rows)
+    cells = [
+        [Paragraph(inline_markup(cell), STYLES["TableCell"]) for cell in row]
+        + [""] * (width - len(row))
+        for row in rows
+    ]
+    return [Table(cells, style=TABLE_STYLE, repeatRows=1, hAlign="LEFT")]
+
+
+def _render_hr(_: None) -> List[Flowable]:
+    return [HRFlowable(width="100%", thickness=1, color=colors.grey)]
+
+
+def _render_paragraph(text: str) -> List[Flowable]:
+    return [Paragraph(inline_markup(text), STYLES["BodyText"])]
+
+
+BLOCK_RENDERERS: Dict[str, Callable[[Any], List[Flowable]]] = {
+    "heading": _render_heading,
+    "code": _render_code,
+    "list": _render_list,
+    "table": _render_table,
+    "hr": _render_hr,
+    "paragraph": _render_paragraph,
+}
+
+
+def render_markdown(content: str) -> List[Flowable]:
+    """
+    Renders markdown content into ReportLab flowables in a single pass.
+
+    Args:
+        content (str): The markdown content.
+
+    Returns:
+        List[Flowable]: The flowables, separated by small spacers.
+    """
+    elements: List[Flowable] = []
+    for block_type, payload in tokenize_markdown(content):
+        elements.extend(BLOCK_RENDERERS[block_type](payload))
+        elements.append(Spacer(1, 6))  # Add small spacing between elements
+    return elements
+
+
+def add_header_footer(canvas: Canvas, doc: SimpleDocTemplate) -> None:
+    """
+    Adds a header and footer to each page of the PDF.
+
+    Args:
+        canvas (Canvas): The ReportLab canvas object.
+        doc (SimpleDocTemplate): The document being generated.
+    """
+    canvas.saveState()
+    _, height = A4
+
+    # Header
+    canvas.setFont("Helvetica-Bold", 14)
+    canvas.drawString(50, height - 50, "📄 Enterprise Report")
+
+    # Footer with page number
+    canvas.setFont("Helvetica", 10)
+    canvas.setFillColor(colors.grey)
+    canvas.drawString(50, 30, f"Page {doc.page}")
+
+    canvas.restoreState()
+
+
+def build_markdown_pdf(content: str, output: Any, title: str) -> None:
+    """
+    Builds a styled PDF from markdown content.
+
+    Args:
+        content (str): The markdown content to be converted.
+        output (Any): A file name or a writable binary file object.
+        title (str): The title shown at the top of the first page.
+    """
+    doc = SimpleDocTemplate(
+        output,
+        pagesize=A4,
+        leftMargin=50,
+        rightMargin=50,
+        topMargin=80,
+        bottomMargin=50,
+    )
+
+    elements: List[Flowable] = [Paragraph(title, STYLES["Title"]), Spacer(1, 12)]
+    elements.extend(render_markdown(content))
+
+    # Define page template with header/footer
+    frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height - 50, id="normal")
+    template = PageTemplate(id="page", frames=[frame], onPage=add_header_footer)
+    doc.addPageTemplates([template])
+
+    doc.build(elements)
@@ -1,16 +1,27 @@
 import streamlit as st
 import pdfplumber
 import openai
-import sqlite3
-from fpdf import FPDF
+import io
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from report_store import ConnectionPool, ReportRepository
+from pdf_export import pdf_download_button
 from cryptography.fernet import Fernet
 import os
 from dotenv import load_dotenv
 import asyncio
 
 
+REPORTS_PAGE_SIZE = 10
+MAX_EXPLANATION_JOBS = 4
+MAX_CHUNK_WORKERS = 8
+PAGES_PER_CHUNK = 3
+JOB_POLL_SECONDS = 2
+
 load_dotenv()
-asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+if sys.platform == "win32":
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 st.set_page_config(page_title="Bharat HealthEasy.ai 🚑", page_icon="⚕️", layout="wide")
 st.title("🩺 Bharat HealthEasy 🚑")
@@ -29,7 +40,6 @@ if not SECRET_KEY:
     st.error("❌ SECRET_KEY Not Found")
     st.stop()
 
-cipher = Fernet(SECRET_KEY)
 
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
@@ -37,83 +47,193 @@ if not openai.api_key:
     st.error("❌ OpenAI API Key Not Found in .env File")
     st.stop()
 
-conn = sqlite3.connect("data/medical_reports.db")
-c = conn.cursor()
-c.execute('''CREATE TABLE IF NOT EXISTS reports 
-             (id INTEGER PRIMARY KEY, filename TEXT, content BLOB, explanation TEXT)''')
-conn.commit()
 
-def extract_pdf_text(file):
-    text = ""
-    with pdfplumber.open(file) as pdf:
+@st.cache_resource
+def get_report_repository() -> ReportRepository:
+    repository = ReportRepository(ConnectionPool(), SECRET_KEY)
+    repository.migrate()
+    return repository
+
+
+@st.cache_resource
+def get_job_executor() -> ThreadPoolExecutor:
+    """Runs whole-report explanation jobs, shared by every session."""
+    return ThreadPoolExecutor(max_workers=MAX_EXPLANATION_JOBS, thread_name_prefix="explain-job")
+
+
+class ExplanationJobs:
+    """
+    Explanation jobs by report hash, shared by every session.
+
+    Two sessions uploading the same report share one job. A failed job is
+    kept until someone retries it, so a failing report is never resubmitted
+    on its own by later reruns.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor):
+        self.executor = executor
+        self.jobs: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get(self, content_hash: str):
+        return self.jobs.get(content_hash)
+
+    def submit(self, content_hash: str, fn, *args) -> Future:
+        with self._lock:
+            if content_hash not in self.jobs:
+                self.jobs[content_hash] = self.executor.submit(fn, *args)
+            return self.jobs[content_hash]
+
+    def discard(self, content_hash: str) -> None:
+        with self._lock:
+            self.jobs.pop(content_hash, None)
+
+
+@st.cache_resource
+def get_explanation_jobs() -> ExplanationJobs:
+    return ExplanationJobs(get_job_executor())
+
+
+@st.cache_resource
+def get_chunk_executor() -> ThreadPoolExecutor:
+    """Runs the page-chunk calls of a job; separate so jobs never wait on their own pool."""
+    return ThreadPoolExecutor(max_workers=MAX_CHUNK_WORKERS, thread_name_prefix="explain-chunk")
+
+
+reports = get_report_repository()
+
+
+@st.cache_data(show_spinner=False)
+def extract_pdf_pages(file_bytes):
+    pages = []
+    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
         for page in pdf.pages:
             page_text = page.extract_text()
             if page_text:
-                text += page_text + "\n\n"
-    return text.strip()
+                pages.append(page_text)
+    return pages
+
 
 def explain_medical_report(text):
-    with st.spinner("🤖 AI is Writing Medical Explanation..."):
-        prompt = f"Explain this medical report in very simple language:\n{text}"
-        response = openai.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are an expert doctor explaining medical reports."},
-                {"role": "user", "content": prompt}
-            ]
+    prompt = f"Explain this medical report in very simple language:\n{text}"
+    response = openai.chat.completions.create(
+        model="gpt-4",
+        messages=[
+            {"role": "system", "content": "You are an expert doctor explaining medical reports."},
+            {"role": "user", "content": prompt}
+        ]
+    )
+    return response.choices[0].message.content
+
+
+def run_explanation_job(pages, filename, content_hash, repository, chunk_executor):
+    """
+    Explains a report in the background and stores the result.
+
+    Short reports are explained in one call. Longer reports are split into
+    chunks of PAGES_PER_CHUNK pages that are explained concurrently and
+    joined in page order.
+    """
+    text = "\n\n".join(pages).strip()
+    if len(pages) <= PAGES_PER_CHUNK:
+        explanation = explain_medical_report(text)
+    else:
+        chunks = [pages[i : i + PAGES_PER_CHUNK] for i in range(0, len(pages), PAGES_PER_CHUNK)]
+        parts = chunk_executor.map(lambda chunk: explain_medical_report("\n\n".join(chunk)), chunks)
+        explanation = "\n\n".join(
+            f"### Pages {i * PAGES_PER_CHUNK + 1}-{i * PAGES_PER_CHUNK + len(chunk)}\n{part}"
+            for i, (chunk, part) in enumerate(zip(chunks, parts))
         )
-        return response.choices[0].message.content
+    repository.add(filename, text, explanation, content_hash)
+    return explanation
+
+
+def submit_explanation_job(pages, filename, content_hash) -> Future:
+    st.session_state.setdefault("waited_reports", set()).add(content_hash)
+    return get_explanation_jobs().submit(
+        content_hash, run_explanation_job, pages, filename, content_hash, reports, get_chunk_executor()
+    )
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def render_job_status(content_hash):
+    job = get_explanation_jobs().get(content_hash)
+    if job is not None and not job.done():
+        st.info("🤖 AI is Writing Medical Explanation... you can keep using the app.")
+        return
+    # Finished, failed or cleared: a full rerun shows the result and stops polling.
+    st.rerun()
+
 
 uploaded_file = st.file_uploader("📄 Upload Medical Report (PDF Only)", type=["pdf"])
 
 if uploaded_file is not None:
     st.success("✅ Report Uploaded Successfully")
     with st.spinner("🔍 Reading PDF Report..."):
-        text = extract_pdf_text(uploaded_file)
-    
+        pages = extract_pdf_pages(uploaded_file.getvalue())
+        text = "\n\n".join(pages).strip()
+
     if not text:
         st.error("❌ PDF is Empty or Not Readable")
         st.stop()
-        
-    encrypted_text = cipher.encrypt(text.encode())
-
-    explanation = explain_medical_report(text)
 
-    c.execute("INSERT INTO reports (filename, content, explanation) VALUES (?, ?, ?)", 
-              (uploaded_file.name, encrypted_text, explanation))
-    conn.commit()
+    content_hash = reports.content_hash(text)
+    explanation = reports.find_explanation(content_hash)
+    explanation_jobs = get_explanation_jobs()
+    job = explanation_jobs.get(content_hash)
+    if explanation is not None and content_hash not in st.session_state.get("waited_reports", set()):
+        st.info("♻️ This report was analyzed before — showing the saved explanation.")
 
     st.subheader("📑 Report Content")
     st.write(text)
 
     st.subheader("🧠 AI Explanation")
-    st.success(explanation)
-
-    if st.button("📥 Download Full Report"):
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", size=12)
-        pdf.cell(200, 10, txt="Bharat HealthEasy.ai Report", ln=True, align='C')
-        pdf.multi_cell(0, 10, f"Original Report:\n{text}")
-        pdf.multi_cell(0, 10, f"\nAI Explanation:\n{explanation}")
-        pdf.output("Medical_Report.pdf")
-        st.download_button("Download Report", data=open("Medical_Report.pdf", "rb"), file_name="Medical_Report.pdf")
+    if explanation is None and job is not None and job.done() and job.exception() is not None:
+        st.error(f"❌ Failed to explain the report: {job.exception()}")
+        if st.button("🔁 Retry"):
+            explanation_jobs.discard(content_hash)
+            st.rerun()
+    elif explanation is None:
+        if job is not None and job.done():
+            # Finished, but its report has since been deleted: explain it again.
+            explanation_jobs.discard(content_hash)
+        submit_explanation_job(pages, uploaded_file.name, content_hash)
+        render_job_status(content_hash)
+    else:
+        if job is not None and job.done():
+            explanation_jobs.discard(content_hash)
+        st.success(explanation)
+
+        pdf_download_button(
+            "📥 Download Full Report",
+            f"## Original Report\n\n{text}\n\n## AI Explanation\n\n{explanation}",
+            title="Bharat HealthEasy.ai Report",
+            file_name="Medical_Report.pdf",
+        )
 
 if st.button("🗑️ Delete All Reports"):
     with st.spinner("🗑️ Deleting All Reports..."):
-        c.execute("DELETE FROM reports")
-        conn.commit()
+        reports.delete_all()
         st.success("✅ All Reports Deleted")
         st.stop()
 
 st.subheader("📂 Previous Reports")
-c.execute("SELECT * FROM reports")
-reports = c.fetchall()
-
-for report in reports:
-    with st.expander(f"{report[1]}"):
-        decrypted_text = cipher.decrypt(report[2]).decode()
-        st.write("### Original Report")
-        st.write(decrypted_text)
-        st.write("### AI Explanation")
-        st.success(report[3])
+total_reports = reports.count()
+total_pages = max(1, -(-total_reports // REPORTS_PAGE_SIZE))
+page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1) - 1
+st.caption(f"{total_reports} report(s) · page {page + 1} of {total_pages}")
+
+for report in reports.list_page(page, REPORTS_PAGE_SIZE):
+    with st.expander(f"{report.filename}"):
+        # Decrypt only when the user asks to see this report.
+        if st.toggle("🔓 Show report", key=f"show_report_{report.id}"):
+            saved_report = reports.get_report(report.id)
+            if saved_report is None:
+                # Deleted in another session since the list was loaded.
+                st.warning("⚠️ This report is no longer available.")
+                continue
+            decrypted_text, saved_explanation = saved_report
+            st.write("### Original Report")
+            st.write(decrypted_text)
+            st.write("### AI Explanation")
+            st.success(saved_explanation)
@@ -0,0 +1,89 @@
+import hashlib
+import io
+import streamlit as st
+from markdown_pdf import build_markdown_pdf
+
+
+## Constants
+PDF_MIME_TYPE = "application/pdf"
+PDF_CACHE_MAX_ENTRIES = 64
+
+
+def pdf_content_hash(content: str, title: str) -> str:
+    """
+    Returns the SHA-256 of everything that affects the rendered PDF.
+
+    Args:
+        content (str): The markdown content.
+        title (str): The document title.
+
+    Returns:
+        str: The hex digest used as the cache key.
+    """
+    digest = hashlib.sha256()
+    digest.update(title.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(content.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def render_markdown_pdf(content: str, title: str) -> bytes:
+    """
+    Renders markdown content to PDF bytes entirely in memory.
+
+    Args:
+        content (str): The markdown content.
+        title (str): The document title.
+
+    Returns:
+        bytes: The PDF document.
+    """
+    buffer = io.BytesIO()
+    build_markdown_pdf(content, buffer, title)
+    return buffer.getvalue()
+
+
+@st.cache_data(show_spinner=False, max_entries=PDF_CACHE_MAX_ENTRIES)
+def _cached_markdown_pdf(content_hash: str, _content: str, _title: str) -> bytes:
+    # Keyed on the content hash only; the underscored arguments are not hashed.
+    return render_markdown_pdf(_content, _title)
+
+
+def export_markdown_pdf(content: str, title: str) -> bytes:
+    """
+    Returns the PDF bytes for markdown content, cached by content hash.
+
+    Nothing is written to disk, so concurrent sessions never share a file,
+    and identical documents are rendered only once across sessions.
+
+    Args:
+        content (str): The markdown content.
+        title (str): The document title.
+
+    Returns:
+        bytes: The PDF document.
+    """
+    return _cached_markdown_pdf(pdf_content_hash(content, title), content, title)
+
+
+def pdf_download_button(label: str, content: str, title: str, file_name: str, **kwargs) -> bool:
+    """
+    Renders a download button serving an in-memory PDF of the content.
+
+    Args:
+        label (str): The button label.
+        content (str): The markdown content.
+        title (str): The document title.
+        file_name (str): The file name suggested to the browser.
+        **kwargs: Extra arguments forwarded to st.download_button.
+
+    Returns:
+        bool: True if the button was clicked on this run.
+    """
+    return st.download_button(
+        label,
+        data=export_markdown_pdf(content, title),
+        file_name=file_name,
+        mime=PDF_MIME_TYPE,
+        **kwargs,
+    )
@@ -1,68 +1,172 @@
 import streamlit as st
 import openai
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List
 from dotenv import load_dotenv
-import json
+from pydantic import BaseModel
 load_dotenv()
 
 openai.api_key = os.getenv('OPENAI_API_KEY')
-DEFAULT_OPENAI_MODEL = "gpt-4"
+# Structured outputs (schema-validated JSON) need a gpt-4o model.
+DEFAULT_OPENAI_MODEL = "gpt-4o"
+MAX_RECIPE_ATTEMPTS = 3
+MAX_CACHED_REQUESTS = 256
+NUM_COLUMNS = 3
+# One angle per parallel call keeps the recipes distinct without a shared prompt.
+RECIPE_ANGLES = [
+    "a classic, traditional version",
+    "a quick weeknight version",
+    "a street-food style version",
+    "a lighter, healthier version",
+    "a festive, special-occasion version",
+    "a one-pot or one-pan version",
+    "a regional specialty version",
+    "a modern fusion twist that stays true to the cuisine",
+    "a family-style, shareable version",
+    "a slow-cooked, rich version",
+]
+
+
+class Recipe(BaseModel):
+    item_of_choice: str
+    cuisine: str
+    name: str
+    ingredients: List[str]
+    additional_ingredients: List[str]
+    steps: List[str]
+
+
+def normalize_request(ingredients, item, cuisine):
+    """Cache key: the ingredient set (order, case and spacing ignored), dish and cuisine."""
+    ingredient_set = tuple(sorted({i.strip().lower() for i in ingredients.split(",") if i.strip()}))
+    return ingredient_set, " ".join(item.lower().split()), cuisine
+
+
+class RecipeCache:
+    """Generated recipes per normalized request, an LRU shared across sessions under a lock."""
+
+    def __init__(self, max_requests=MAX_CACHED_REQUESTS):
+        self.max_requests = max_requests
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
 
-def get_recipes_from_ingredients(ingredients, item, cuisine, num_recipes=5):
+    def get(self, key):
+        """Returns a copy of the recipes cached for the request, by slot."""
+        with self._lock:
+            if key not in self._entries:
+                return {}
+            self._entries.move_to_end(key)
+            return dict(self._entries[key])
+
+    def put(self, key, slot, recipe):
+        with self._lock:
+            self._entries.setdefault(key, {})[slot] = recipe
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_requests:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+@st.cache_resource
+def get_recipe_cache():
+    return RecipeCache()
+
+
+def generate_recipe(ingredients, item, cuisine, angle):
     system_prompt = f"""
-Create {num_recipes} unique and authentic {cuisine} recipes using the following core ingredients: {ingredients}.
-Generate a high-quality recipe for {item} in {cuisine} style, ensuring that it strictly adheres to the provided ingredients.
-If essential sauces, spices, or liquids are missing, intelligently infer and add them under an 'additional_ingredients' section.
-Provide the output **strictly** in this JSON format:
-[
-  {{
-    "item_of_choice": "{item}",
-    "cuisine": "{cuisine}",
-    "name": "Recipe Name",
-    "ingredients": ["ingredient1", "ingredient2", ...],
-    "additional_ingredients": [provide any additional items here if necessary],
-    "steps": ["Step 1", "Step 2", ...]
-  }},
-  ...
-]
-Do not include any additional text or explanations.
+Create one unique and authentic {cuisine} recipe using the following core ingredients: {ingredients}.
+Generate a high-quality recipe for {item} in {cuisine} style, as {angle}, ensuring that it strictly adheres to the provided ingredients.
+If essential sauces, spices, or liquids are missing, intelligently infer and add them under 'additional_ingredients'.
+Set item_of_choice to "{item}" and cuisine to "{cuisine}".
 """
-    try:
-        response = openai.chat.completions.create(
-            model=DEFAULT_OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-            ],
-            temperature=0.84,
-        )
-        recipes = json.loads(response.choices[0].message.content)
-        return recipes
-    except Exception as e:
-        st.error(f"Error fetching recipe data: {e}")
-        return None
-
-def display_recipes(recipes):
-    num_columns = 3  
-    columns = st.columns(num_columns)
-    
-    for idx, recipe in enumerate(recipes):
-        col = columns[idx % num_columns]  
-        with col:
-            st.subheader(f"🍽️ Recipe {idx + 1}: {recipe.get('name', 'Unnamed Recipe')}")
-            st.write("**Ingredients:**")
-            for ingredient in recipe.get('ingredients', []):
-                st.write(f"- {ingredient}")
-            
-            if "additional_ingredients" in recipe and recipe["additional_ingredients"]:
-                st.write("**Additional Items:**")
-                for add_ingredient in recipe.get('additional_ingredients', []):
-                    st.write(f"- {add_ingredient}")
-            
-            st.write("**Instructions:**")
-            for step_num, step in enumerate(recipe.get('steps', []), 1):
-                st.write(f"{step_num}. {step}")
-
-            st.markdown("---") 
+    response = openai.beta.chat.completions.parse(
+        model=DEFAULT_OPENAI_MODEL,
+        messages=[
+            {"role": "system", "content": system_prompt},
+        ],
+        temperature=0.84,
+        response_format=Recipe,
+    )
+    recipe = response.choices[0].message.parsed
+    if recipe is None:
+        raise ValueError(response.choices[0].message.refusal or "Empty recipe")
+    return recipe.model_dump()
+
+
+def get_recipes_from_ingredients(ingredients, item, cuisine, num_recipes=5, on_recipe=None, regenerate=False):
+    """
+    Generates recipes with one structured call per recipe, run in parallel.
+
+    Recipes already generated for the same normalized request are reused
+    unless regenerate is set, and a failed call is retried on its own without
+    discarding the others.
+
+    Args:
+        ingredients (str): Comma-separated ingredients.
+        item (str): The dish.
+        cuisine (str): The cuisine.
+        num_recipes (int): How many recipes to return.
+        on_recipe (Callable[[int, dict], None]): Called on the script thread
+            with (slot, recipe) as each recipe becomes available.
+        regenerate (bool): Drop the cached recipes for this request and
+            generate fresh ones.
+
+    Returns:
+        List[dict]: The recipes that were generated, in slot order.
+    """
+    cache = get_recipe_cache()
+    key = normalize_request(ingredients, item, cuisine)
+    if regenerate:
+        cache.discard(key)
+    recipes = cache.get(key)
+
+    for slot in range(num_recipes):
+        if slot in recipes and on_recipe:
+            on_recipe(slot, recipes[slot])
+
+    attempts = {slot: 0 for slot in range(num_recipes) if slot not in recipes}
+    with ThreadPoolExecutor(max_workers=max(len(attempts), 1)) as executor:
+        def submit(slot):
+            attempts[slot] += 1
+            return executor.submit(generate_recipe, ingredients, item, cuisine, RECIPE_ANGLES[slot % len(RECIPE_ANGLES)])
+
+        pending = {submit(slot): slot for slot in attempts}
+        while pending:
+            future = next(as_completed(pending))
+            slot = pending.pop(future)
+            try:
+                recipes[slot] = future.result()
+                cache.put(key, slot, recipes[slot])
+            except Exception as e:
+                if attempts[slot] < MAX_RECIPE_ATTEMPTS:
+                    pending[submit(slot)] = slot
+                else:
+                    st.error(f"Error fetching recipe {slot + 1}: {e}")
+                continue
+            if on_recipe:
+                on_recipe(slot, recipes[slot])
+
+    return [recipes[slot] for slot in range(num_recipes) if slot in recipes]
+
+def display_recipe(recipe, idx):
+    st.subheader(f"🍽️ Recipe {idx + 1}: {recipe.get('name', 'Unnamed Recipe')}")
+    st.write("**Ingredients:**")
+    st.markdown("\n".join(f"- {ingredient}" for ingredient in recipe.get('ingredients', [])))
+
+    if "additional_ingredients" in recipe and recipe["additional_ingredients"]:
+        st.write("**Additional Items:**")
+        st.markdown("\n".join(f"- {add_ingredient}" for add_ingredient in recipe['additional_ingredients']))
+
+    st.write("**Instructions:**")
+    st.markdown("\n".join(f"{step_num}. {step}" for step_num, step in enumerate(recipe.get('steps', []), 1)))
+
+    st.markdown("---")
 
 def main():
     st.set_page_config(page_title="Modern Recipe Generator", layout="wide")
@@ -76,7 +180,10 @@ def main():
     ])
     num_recipes = st.slider("Number of recipes to generate", 1, 10, 5)
 
-    if st.button("Generate Recipes"):
+    generate = st.button("Generate Recipes")
+    regenerate = st.button("🔁 Regenerate", help="Ignore previously generated recipes for this request")
+
+    if generate or regenerate:
         if len(item.split()) > 2:
             st.warning("Please enter only one dish name. Avoid listing multiple items.")
         elif not item:
@@ -86,11 +193,21 @@ def main():
         elif ',' not in ingredients:
             st.warning("Please separate ingredients with commas.")
         else:
-            with st.spinner("Generating recipes..."):
-                recipes = get_recipes_from_ingredients(ingredients, item, cuisine, num_recipes)
+            status = st.empty()
+            status.info("Generating recipes...")
+            columns = st.columns(NUM_COLUMNS)
+            # One placeholder per recipe, so each card renders as soon as it arrives.
+            cards = [columns[idx % NUM_COLUMNS].empty() for idx in range(num_recipes)]
+
+            def show_recipe(slot, recipe):
+                with cards[slot].container():
+                    display_recipe(recipe, slot)
+
+            recipes = get_recipes_from_ingredients(ingredients, item, cuisine, num_recipes, on_recipe=show_recipe, regenerate=regenerate)
             if recipes:
-                st.success("Recipes generated successfully!")
-                display_recipes(recipes)
+                status.success(f"{len(recipes)} of {num_recipes} recipes generated successfully!")
+            else:
+                status.error("Could not generate any recipes. Please try again.")
 
     st.markdown(
         """
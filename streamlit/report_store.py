@@ -0,0 +1,144 @@
+import hashlib
+import hmac
+import os
+import queue
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+from cryptography.fernet import Fernet
+
+
+## Constants
+DEFAULT_DB_PATH = "data/medical_reports.db"
+DEFAULT_PAGE_SIZE = 10
+DEFAULT_POOL_SIZE = 4
+
+
+@dataclass
+class ReportSummary:
+    id: int
+    filename: str
+    created_at: float
+
+
+class ConnectionPool:
+    """
+    A fixed-size, thread-safe pool of WAL-mode SQLite connections.
+
+    Each caller borrows its own connection, so concurrent sessions never share
+    a cursor; WAL lets readers proceed while another connection writes.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, size: int = DEFAULT_POOL_SIZE):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connections: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=size)
+        for _ in range(size):
+            conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._connections.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrows a connection, committing on success and rolling back on error."""
+        conn = self._connections.get()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._connections.put(conn)
+
+
+class ReportRepository:
+    """
+    Encrypted storage for medical reports.
+
+    Report text is Fernet-encrypted at rest. Listing only reads metadata, and
+    content is decrypted on demand for a single report. Uploads are
+    deduplicated by a keyed hash of the report text, so re-uploading the same
+    report reuses the stored explanation instead of calling the LLM again.
+    """
+
+    def __init__(self, pool: ConnectionPool, secret_key: str):
+        self.pool = pool
+        self.cipher = Fernet(secret_key)
+        self._hash_key = secret_key.encode("utf-8")
+
+    def migrate(self) -> None:
+        """Creates the schema and upgrades databases from the original layout."""
+        with self.pool.connection() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS reports
+                   (id INTEGER PRIMARY KEY, filename TEXT, content BLOB, explanation TEXT)"""
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(reports)")}
+            if "content_hash" not in columns:
+                conn.execute("ALTER TABLE reports ADD COLUMN content_hash TEXT")
+            if "created_at" not in columns:
+                conn.execute("ALTER TABLE reports ADD COLUMN created_at REAL DEFAULT 0")
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_reports_content_hash ON reports (content_hash)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_reports_created_at ON reports (created_at DESC, id DESC)"
+            )
+
+    def content_hash(self, text: str) -> str:
+        """
+        Returns a keyed hash of the report text.
+
+        An HMAC with the secret key is used rather than a bare SHA-256 so the
+        stored hashes reveal nothing about report contents.
+        """
+        return hmac.new(self._hash_key, text.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def find_explanation(self, content_hash: str) -> Optional[str]:
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT explanation FROM reports WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def add(self, filename: str, text: str, explanation: str, content_hash: str) -> None:
+        """Stores a report; a report with the same content hash is kept only once."""
+        encrypted_text = self.cipher.encrypt(text.encode())
+        with self.pool.connection() as conn:
+            conn.execute(
+                """INSERT OR IGNORE INTO reports (filename, content, explanation, content_hash, created_at)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (filename, encrypted_text, explanation, content_hash, time.time()),
+            )
+
+    def count(self) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def list_page(self, page: int, page_size: int = DEFAULT_PAGE_SIZE) -> List[ReportSummary]:
+        """Returns one page of report metadata, newest first, without reading content."""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                """SELECT id, filename, created_at FROM reports
+                   ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?""",
+                (page_size, page * page_size),
+            ).fetchall()
+        return [ReportSummary(*row) for row in rows]
+
+    def get_report(self, report_id: int) -> Optional[Tuple[str, str]]:
+        """Decrypts and returns (report text, explanation) for one report."""
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT content, explanation FROM reports WHERE id = ?", (report_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return self.cipher.decrypt(row[0]).decode(), row[1]
+
+    def delete_all(self) -> None:
+        with self.pool.connection() as conn:
+            conn.execute("DELETE FROM reports")
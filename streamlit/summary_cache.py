@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+
+## Constants
+DEFAULT_CACHE_PATH = "data/book_summary_cache.db"
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 2000
+
+
+def normalize_title(title: str) -> str:
+    """Lower-cases the title and collapses whitespace and punctuation."""
+    cleaned = "".join(ch if ch.isalnum() else " " for ch in title.lower())
+    return " ".join(cleaned.split())
+
+
+class SummaryCache:
+    """
+    A small persistent key/value cache for the book summarizer, backed by SQLite.
+
+    Keys combine the entry kind (metadata, a section name, markdown), the
+    normalized book title, the model and the prompt version, so changing the
+    model or prompt never serves stale output. Entries expire after a TTL and
+    the least recently used ones are evicted once the cache grows too large.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS cache_entries
+               (key TEXT PRIMARY KEY, kind TEXT, title TEXT, value TEXT,
+                created_at REAL, accessed_at REAL)"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed ON cache_entries (accessed_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(kind: str, title: str, model: str, prompt_version: str) -> str:
+        raw = "|".join([kind, normalize_title(title), model, prompt_version])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, kind: str, title: str, model: str, prompt_version: str) -> Optional[Any]:
+        """
+        Returns the cached value, or None on a miss or an expired entry.
+
+        Args:
+            kind (str): The entry kind, e.g. "metadata" or "markdown".
+            title (str): The book title.
+            model (str): The model that produced the value.
+            prompt_version (str): The prompt version that produced the value.
+
+        Returns:
+            Optional[Any]: The JSON-decoded value.
+        """
+        key = self.make_key(kind, title, model, prompt_version)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, kind: str, title: str, model: str, prompt_version: str, value: Any) -> None:
+        """
+        Stores a JSON-serializable value and evicts the oldest entries if needed.
+
+        Args:
+            kind (str): The entry kind, e.g. "metadata" or "markdown".
+            title (str): The book title.
+            model (str): The model that produced the value.
+            prompt_version (str): The prompt version that produced the value.
+            value (Any): The value to store.
+        """
+        key = self.make_key(kind, title, model, prompt_version)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO cache_entries
+                   (key, kind, title, value, created_at, accessed_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (key, kind, normalize_title(title), json.dumps(value), now, now),
+            )
+            self._conn.execute(
+                """DELETE FROM cache_entries WHERE key IN (
+                       SELECT key FROM cache_entries ORDER BY accessed_at DESC
+                       LIMIT -1 OFFSET ?)""",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Removes every entry from the cache."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+            self._conn.commit()
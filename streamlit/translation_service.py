@@ -0,0 +1,323 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from googletrans import LANGUAGES, Translator
+
+
+## Constants
+DEFAULT_CACHE_PATH = "data/translation_cache.db"
+DEFAULT_LRU_SIZE = 5000
+MAX_TRANSLATION_WORKERS = 4
+# Google rejects requests over ~5000 characters.
+MAX_BATCH_CHARS = 4500
+MAX_SEGMENT_CHARS = 1000
+MAX_TRANSLATION_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 1.0
+AUTO_DETECT = "auto"
+BATCH_SEPARATOR = "\n"
+
+## Markdown handling for document translation
+CODE_FENCE = re.compile(r"^\s*(```|~~~)")
+# Lines with nothing to translate: rules and table separators.
+STRUCTURAL_LINE = re.compile(r"^\s*([-*_]\s*){3,}$|^\s*\|?(\s*:?-+:?\s*\|)+\s*:?-*:?\s*$")
+# Leading markup kept verbatim: indentation, quotes, headings, list markers.
+LINE_PREFIX = re.compile(r"^(\s*(?:>\s*)*(?:#{1,6}\s+|[-*+]\s+(?:\[[ xX]\]\s+)?|\d+[.)]\s+)?)")
+SENTENCE_END = re.compile(r"(?<=[.!?।。！？])\s+")
+
+# Built once: display name -> code, and the selectbox options.
+LANGUAGE_CODES: Dict[str, str] = {name.lower(): code for code, name in LANGUAGES.items()}
+LANGUAGE_OPTIONS: Tuple[str, ...] = tuple(name.capitalize() for name in LANGUAGES.values())
+
+
+def get_language_code(language: str) -> str:
+    """Returns the language code for a display name, e.g. "Hindi" -> "hi"."""
+    return LANGUAGE_CODES[language.lower()]
+
+
+class TranslationCache:
+    """
+    A two-level translation cache: an in-memory LRU in front of SQLite.
+
+    Entries are keyed by a hash of (source language, target language, text),
+    so the on-disk store never holds the key text twice and lookups stay
+    fixed-size regardless of segment length.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, lru_size: int = DEFAULT_LRU_SIZE):
+        self.lru_size = lru_size
+        self._lru: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, translation TEXT)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(src: str, dest: str, text: str) -> str:
+        return hashlib.sha256(f"{src}|{dest}|{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, translation: str) -> None:
+        self._lru[key] = translation
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get_many(self, src: str, dest: str, texts: Sequence[str]) -> Dict[str, str]:
+        """Returns {text: translation} for the texts that are cached."""
+        keys = {self.make_key(src, dest, text): text for text in texts}
+        found: Dict[str, str] = {}
+        with self._lock:
+            missing = []
+            for key, text in keys.items():
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[text] = self._lru[key]
+                else:
+                    missing.append(key)
+            # SQLite caps bound parameters; query in slices.
+            for i in range(0, len(missing), 500):
+                chunk = missing[i : i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, translation FROM translations WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, translation in rows:
+                    self._remember(key, translation)
+                    found[keys[key]] = translation
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, src: str, dest: str, translations: Dict[str, str]) -> None:
+        with self._lock:
+            rows = [(self.make_key(src, dest, text), value) for text, value in translations.items()]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (key, translation) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+            for key, value in rows:
+                self._remember(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM translations")
+            self._conn.commit()
+            self._lru.clear()
+
+
+def make_batches(texts: Sequence[str], max_chars: int = MAX_BATCH_CHARS) -> List[List[str]]:
+    """Groups texts into batches whose joined length stays under `max_chars`."""
+    batches: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    for text in texts:
+        if current and size + len(text) + len(BATCH_SEPARATOR) > max_chars:
+            batches.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += len(text) + len(BATCH_SEPARATOR)
+    if current:
+        batches.append(current)
+    return batches
+
+
+class TranslationService:
+    """
+    Translates text through googletrans with caching, batching and parallelism.
+
+    Text is split into lines. Cached lines are answered from the
+    TranslationCache, and the remaining unique lines are joined into
+    newline-separated batches (one backend call each) that are translated
+    concurrently. Each worker thread gets its own Translator.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[TranslationCache] = None,
+        max_workers: int = MAX_TRANSLATION_WORKERS,
+        translator_factory: Callable[[], Translator] = Translator,
+    ):
+        self.cache = cache or TranslationCache()
+        self.translator_factory = translator_factory
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="translate")
+        self._local = threading.local()
+
+    def _translator(self) -> Translator:
+        if not hasattr(self._local, "translator"):
+            self._local.translator = self.translator_factory()
+        return self._local.translator
+
+    def _translate_batch(self, batch: List[str], src: str, dest: str) -> Dict[str, str]:
+        for attempt in range(1, MAX_TRANSLATION_ATTEMPTS + 1):
+            try:
+                return self._translate_batch_once(batch, src, dest)
+            except Exception:
+                if attempt == MAX_TRANSLATION_ATTEMPTS:
+                    raise
+                traceback.print_exc()
+                # Start over with a fresh client; the old one may hold a broken connection.
+                self._local.__dict__.pop("translator", None)
+                time.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+    def _translate_batch_once(self, batch: List[str], src: str, dest: str) -> Dict[str, str]:
+        translator = self._translator()
+        joined = translator.translate(BATCH_SEPARATOR.join(batch), src=src, dest=dest).text
+        lines = joined.split(BATCH_SEPARATOR)
+        if len(lines) != len(batch):
+            # The backend merged or split lines; translate them one by one instead.
+            lines = [translator.translate(text, src=src, dest=dest).text for text in batch]
+        return dict(zip(batch, lines))
+
+    def translate_segments(
+        self,
+        segments: Sequence[str],
+        src: str,
+        dest: str,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> List[str]:
+        """
+        Translates segments, using the cache and one backend call per batch.
+
+        Identical segments (repeated headers, boilerplate) are translated once.
+
+        Args:
+            segments (Sequence[str]): Single-line texts to translate.
+            src (str): The source language code, or "auto".
+            dest (str): The target language code.
+            progress (Optional[Callable[[int, int], None]]): Called with
+                (finished batches, total batches) on the calling thread.
+
+        Returns:
+            List[str]: The translations, in the same order as `segments`.
+        """
+        unique = list(dict.fromkeys(segment for segment in segments if segment.strip()))
+        translations = self.cache.get_many(src, dest, unique)
+        missing = [segment for segment in unique if segment not in translations]
+        batches = make_batches(missing)
+        if progress:
+            progress(0, len(batches))
+        if batches:
+            futures = [self._executor.submit(self._translate_batch, batch, src, dest) for batch in batches]
+            for done, future in enumerate(as_completed(futures), start=1):
+                fresh = future.result()
+                # Cache as batches finish so a failure keeps the finished work.
+                self.cache.set_many(src, dest, fresh)
+                translations.update(fresh)
+                if progress:
+                    progress(done, len(batches))
+        return [translations.get(segment, segment) for segment in segments]
+
+    def translate(self, text: str, src: str, dest: str) -> str:
+        """
+        Translates multi-line text, preserving line breaks.
+
+        Args:
+            text (str): The text to translate.
+            src (str): The source language code, or "auto".
+            dest (str): The target language code.
+
+        Returns:
+            str: The translated text.
+        """
+        return "\n".join(self.translate_segments(text.split("\n"), src, dest))
+
+    def translate_document(
+        self,
+        text: str,
+        src: str,
+        dest: str,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> str:
+        """
+        Translates a plain-text or markdown document segment-wise in parallel.
+
+        Args:
+            text (str): The document contents.
+            src (str): The source language code, or "auto".
+            dest (str): The target language code.
+            progress (Optional[Callable[[int, int], None]]): See `translate_segments`.
+
+        Returns:
+            str: The translated document with its markdown structure preserved.
+        """
+        lines = split_document(text)
+        segments = [segment for line in lines for segment in line.segments]
+        translated = iter(self.translate_segments(segments, src, dest, progress))
+        return "\n".join(
+            line.prefix + line.joiner.join(next(translated) for _ in line.segments) + line.suffix
+            for line in lines
+        )
+
+
+@dataclass
+class DocumentLine:
+    """One document line: markup kept verbatim around the text segments to translate."""
+
+    prefix: str
+    segments: List[str] = field(default_factory=list)
+    joiner: str = " "
+    suffix: str = ""
+
+
+def split_sentences(text: str, max_chars: int = MAX_SEGMENT_CHARS) -> List[str]:
+    """
+    Splits text on sentence boundaries into segments of at most `max_chars`.
+
+    Consecutive short sentences are packed together; a single sentence longer
+    than `max_chars` is split on whitespace.
+    """
+    segments: List[str] = []
+    current = ""
+    for sentence in SENTENCE_END.split(text.strip()):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            segments.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            segments.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        segments.append(current)
+    return segments
+
+
+def split_document(text: str, max_chars: int = MAX_SEGMENT_CHARS) -> List[DocumentLine]:
+    """
+    Splits a document into lines of verbatim markup and translatable segments.
+
+    Code blocks, horizontal rules and table separators are kept as they are,
+    table rows are translated cell by cell, and other lines keep their heading,
+    list or quote marker while their text is split into sentence segments.
+    """
+    lines: List[DocumentLine] = []
+    in_code = False
+    for raw in text.split("\n"):
+        if CODE_FENCE.match(raw):
+            in_code = not in_code
+            lines.append(DocumentLine(raw))
+        elif in_code or not raw.strip() or STRUCTURAL_LINE.match(raw):
+            lines.append(DocumentLine(raw))
+        elif raw.strip().startswith("|"):
+            cells = [cell.strip() for cell in raw.strip().strip("|").split("|")]
+            lines.append(DocumentLine("| ", cells, joiner=" | ", suffix=" |"))
+        else:
+            prefix = LINE_PREFIX.match(raw).group(1)
+            lines.append(DocumentLine(prefix, split_sentences(raw[len(prefix):], max_chars)))
+    return lines
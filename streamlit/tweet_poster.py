@@ -0,0 +1,292 @@
+import hashlib
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+from requests_oauthlib import OAuth1Session
+
+
+## Constants
+X_API_BASE_URL = os.getenv("X_API_BASE_URL", "https://api.twitter.com")
+DEFAULT_RATE_LIMIT = 100
+DEFAULT_RATE_LIMIT_WINDOW_SECONDS = 15 * 60
+REQUEST_TIMEOUT_SECONDS = 15
+MAX_POST_ATTEMPTS = 3
+POSTING_WORKERS = 4
+# Finished jobs are kept this long so their status (and Resume for a failed thread) stays available.
+FINISHED_JOB_RETENTION_SECONDS = 24 * 60 * 60
+
+## Job statuses
+QUEUED = "queued"
+POSTING = "posting"
+WAITING = "waiting for rate limit"
+POSTED = "posted"
+FAILED = "failed"
+
+
+class RateLimited(Exception):
+    def __init__(self, reset_at: float):
+        super().__init__(f"Rate limited until {reset_at:.0f}")
+        self.reset_at = reset_at
+
+
+class TokenBucket:
+    """
+    Paces requests against the X API rate limit.
+
+    The bucket starts full and refills at `limit / window`. Every response
+    re-synchronizes it with the `x-rate-limit-*` headers, so pacing follows
+    the server's view of the remaining budget.
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_RATE_LIMIT,
+        window_seconds: float = DEFAULT_RATE_LIMIT_WINDOW_SECONDS,
+    ):
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.refill_per_second = capacity / window_seconds
+        self.blocked_until = 0.0
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+        self.updated_at = now
+
+    def wait_time(self) -> float:
+        """Returns the seconds until a token is available (0 if one is available now)."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            if self.tokens >= 1:
+                return 0.0
+            return (1 - self.tokens) / self.refill_per_second
+
+    def acquire(self) -> None:
+        """Blocks until a token is available and consumes it."""
+        while True:
+            wait = self.wait_time()
+            if wait <= 0:
+                with self._lock:
+                    self._refill(time.monotonic())
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                continue
+            time.sleep(min(wait, 1.0))
+
+    def update_from_headers(self, headers: Dict[str, str]) -> None:
+        """Synchronizes the bucket with the `x-rate-limit-*` response headers."""
+        try:
+            limit = int(headers["x-rate-limit-limit"])
+            remaining = int(headers["x-rate-limit-remaining"])
+            reset_at = float(headers["x-rate-limit-reset"])
+        except (KeyError, ValueError):
+            return
+        with self._lock:
+            now = time.monotonic()
+            seconds_to_reset = max(reset_at - time.time(), 1.0)
+            self.capacity = limit
+            self.tokens = float(remaining)
+            # Spread what is left evenly over the rest of the window.
+            self.refill_per_second = max(remaining, 1) / seconds_to_reset
+            self.updated_at = now
+            if remaining <= 0:
+                self.blocked_until = now + seconds_to_reset
+
+    def block_until(self, reset_at: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = 0.0
+            self.blocked_until = now + max(reset_at - time.time(), 1.0)
+
+
+class XApiClient:
+    """
+    A minimal X API v2 client on a keep-alive OAuth 1.0a session.
+
+    `base_url` can point at a local fake API for testing.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        access_token: str,
+        access_secret: str,
+        base_url: str = X_API_BASE_URL,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.session = OAuth1Session(
+            api_key,
+            client_secret=api_secret,
+            resource_owner_key=access_token,
+            resource_owner_secret=access_secret,
+        )
+        self.bucket = TokenBucket()
+        # One post at a time per credential set keeps threads in order.
+        self.lock = threading.Lock()
+
+    def create_tweet(self, text: str, reply_to: Optional[str] = None) -> str:
+        """
+        Posts a tweet, pacing against the rate limit.
+
+        Args:
+            text (str): The tweet content.
+            reply_to (Optional[str]): The tweet ID to reply to, for threads.
+
+        Returns:
+            str: The new tweet ID.
+
+        Raises:
+            RateLimited: If the API answers 429.
+            requests.HTTPError: For any other error response.
+        """
+        payload = {"text": text}
+        if reply_to:
+            payload["reply"] = {"in_reply_to_tweet_id": reply_to}
+
+        self.bucket.acquire()
+        response = self.session.post(
+            f"{self.base_url}/2/tweets", json=payload, timeout=REQUEST_TIMEOUT_SECONDS
+        )
+        self.bucket.update_from_headers(response.headers)
+        if response.status_code == 429:
+            reset_at = float(response.headers.get("x-rate-limit-reset", time.time() + 60))
+            self.bucket.block_until(reset_at)
+            raise RateLimited(reset_at)
+        response.raise_for_status()
+        return response.json()["data"]["id"]
+
+
+_clients: Dict[str, XApiClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_x_client(
+    api_key: str, api_secret: str, access_token: str, access_secret: str
+) -> XApiClient:
+    """Returns the shared client for a credential set, creating it on first use."""
+    key = hashlib.sha256(
+        "\0".join([api_key, api_secret, access_token, access_secret]).encode("utf-8")
+    ).hexdigest()
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = XApiClient(api_key, api_secret, access_token, access_secret)
+        return _clients[key]
+
+
+@dataclass
+class PostJob:
+    tweets: List[str]
+    client: XApiClient
+    id: str = field(default_factory=lambda: uuid4().hex[:12])
+    status: str = QUEUED
+    tweet_ids: List[str] = field(default_factory=list)
+    error: str = ""
+    finished_at: Optional[float] = None
+
+
+class PostingQueue:
+    """
+    Posts tweets and threads on a small, process-wide worker pool.
+
+    One queue is shared by every session, and jobs are looked up by their ID.
+    Jobs for the same credentials are posted one at a time under the client's
+    lock; a thread job posts each tweet as a reply to the previous one.
+    Posted tweet IDs are recorded on the job, so a thread that fails partway
+    can be resumed from where it stopped. The Streamlit script only enqueues
+    jobs and reads their status, so button handlers never block on the network.
+    """
+
+    def __init__(self, workers: int = POSTING_WORKERS):
+        self.jobs: Dict[str, PostJob] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tweet-poster")
+
+    def submit(self, tweets: List[str], client: XApiClient) -> str:
+        """
+        Enqueues a tweet (one item) or a thread (several items).
+
+        Returns:
+            str: The job ID used to look up its status.
+        """
+        job = PostJob(tweets=tweets, client=client)
+        with self._lock:
+            self._prune()
+            self.jobs[job.id] = job
+        self._executor.submit(self._run, job)
+        return job.id
+
+    def status(self, job_id: str) -> Tuple[str, str]:
+        job = self.jobs.get(job_id)
+        return (job.status, job.error) if job else (FAILED, "Unknown job")
+
+    def progress(self, job_id: str) -> Tuple[int, int, Optional[str]]:
+        """
+        Returns how far a job got: (tweets posted, tweets in the job, last posted ID).
+
+        For a failed thread this tells the user which tweets already went out.
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return 0, 0, None
+        return len(job.tweet_ids), len(job.tweets), job.tweet_ids[-1] if job.tweet_ids else None
+
+    def is_active(self, job_id: str) -> bool:
+        job = self.jobs.get(job_id)
+        return job is not None and job.status not in (POSTED, FAILED)
+
+    def resume(self, job_id: str) -> bool:
+        """
+        Re-queues a failed job. Posting continues after the last posted tweet,
+        replying to it, so a partly posted thread is completed rather than duplicated.
+
+        Returns:
+            bool: True if the job was re-queued.
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.status != FAILED:
+                return False
+            job.status, job.error, job.finished_at = QUEUED, "", None
+        self._executor.submit(self._run, job)
+        return True
+
+    def _prune(self) -> None:
+        cutoff = time.time() - FINISHED_JOB_RETENTION_SECONDS
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished_at and job.finished_at < cutoff]:
+            del self.jobs[job_id]
+
+    def _run(self, job: PostJob) -> None:
+        try:
+            self._post(job)
+        except Exception as e:
+            job.status, job.error = FAILED, str(e)
+            traceback.print_exc()
+        finally:
+            job.finished_at = time.time()
+
+    def _post(self, job: PostJob) -> None:
+        with job.client.lock:
+            for text in job.tweets[len(job.tweet_ids):]:
+                reply_to = job.tweet_ids[-1] if job.tweet_ids else None
+                for attempt in range(1, MAX_POST_ATTEMPTS + 1):
+                    job.status = WAITING if job.client.bucket.wait_time() > 0 else POSTING
+                    try:
+                        job.tweet_ids.append(job.client.create_tweet(text, reply_to))
+                        break
+                    except RateLimited:
+                        # The bucket is now blocked until the reset; retry after it.
+                        if attempt == MAX_POST_ATTEMPTS:
+                            raise
+            job.status = POSTED
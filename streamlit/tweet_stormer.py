@@ -1,21 +1,24 @@
 import streamlit as st
 import os
 import traceback
-from typing import Union
+from typing import Dict, Iterator, List, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import httpx
 from openai import OpenAI
 from pydantic import BaseModel
 from dotenv import load_dotenv
-import tweepy
+from tweet_poster import PostingQueue, get_x_client, POSTED, FAILED
 
 load_dotenv(override=True, dotenv_path=".env")
 
 ## constants
 DEFAULT_OPENAI_MODEL = "gpt-4o"
+MAX_REFINE_WORKERS = 10
+POST_STATUS_REFRESH_SECONDS = 2
 API_KEY = os.getenv("API_KEY")
 API_SECRET = os.getenv("API_SECRET")
 ACCESS_TOKEN = os.getenv("ACCESS_TOKEN")
 ACCESS_SECRET = os.getenv("ACCESS_SECRET")
-BEARER_TOKEN = os.getenv("BEARER_TOKEN")
 
 
 class Tweet(BaseModel):
@@ -25,24 +28,40 @@ class Tweet(BaseModel):
 class GenerateTweetResponse(BaseModel):
     tweets: list[Tweet]
 
-if not all([API_KEY, API_SECRET, ACCESS_TOKEN, ACCESS_SECRET, BEARER_TOKEN]):
+if not all([API_KEY, API_SECRET, ACCESS_TOKEN, ACCESS_SECRET]):
     raise ValueError("❌ Missing API credentials. Check your .env file.")
 
 
-def validate_openai_api_key(openai_api_key: str) -> str:
+def validate_openai_api_key(openai_api_key: str) -> None:
     if not openai_api_key:
         st.error("❌ OpenAI API Key Not Found in .env File")
         st.stop()
 
 
+@st.cache_resource
 def get_openai_client() -> OpenAI:
-    try:
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        validate_openai_api_key(openai_api_key)
-        return OpenAI(api_key=openai_api_key)
-    except Exception as e:
-        print(f"Failed to create OpenAI client. Error: {str(e)}")
-        traceback.print_exc()
+    """
+    Returns one long-lived OpenAI client shared by every rerun and session.
+
+    The client keeps a pooled HTTP connection, so concurrent refinements reuse
+    open connections instead of paying a new TLS handshake per call. Errors
+    are raised rather than reported here, so a failure is never cached.
+
+    Raises:
+        RuntimeError: If the OpenAI API key is not set.
+    """
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    if not openai_api_key:
+        raise RuntimeError("OPENAI_API_KEY is not set.")
+    return OpenAI(
+        api_key=openai_api_key,
+        http_client=httpx.Client(
+            limits=httpx.Limits(
+                max_connections=MAX_REFINE_WORKERS,
+                max_keepalive_connections=MAX_REFINE_WORKERS,
+            )
+        ),
+    )
 
 
 def generate_system_prompt(context: str, tweet_context: str, tweet_number: int) -> str:
@@ -93,9 +112,11 @@ def generate_tweets(
         return None
 
 
-def refine_tweet(tweet: Tweet, refine_prompt: str, context="") -> Union[Tweet, None]:
+def refine_tweet(
+    tweet: Tweet, refine_prompt: str, context="", openai_client: Union[OpenAI, None] = None
+) -> Union[Tweet, None]:
     try:
-        openai_client = get_openai_client()
+        openai_client = openai_client or get_openai_client()
         system_prompt = (
             "Refine the tweet strictly based on the provided instructions, enhancing clarity, engagement, and impact while maintaining a 280-character limit. Ensure precision, readability, and alignment with the given input without introducing additional context."
         )
@@ -116,29 +137,81 @@ def refine_tweet(tweet: Tweet, refine_prompt: str, context="") -> Union[Tweet, N
         traceback.print_exc()
         return None
     
-def post_tweet(tweet_content: str, api_key, api_secret, access_token, access_secret, bearer_token) -> bool:
-    try:
-        client = tweepy.Client(
-            consumer_key=api_key,
-            consumer_secret=api_secret,
-            access_token=access_token,
-            access_token_secret=access_secret,
-            bearer_token=bearer_token
-        )
+def refine_tweets_batch(
+    tweets: Dict[int, Tweet], refine_prompt: str, context=""
+) -> Iterator[Tuple[int, Union[Tweet, None]]]:
+    """
+    Refines several tweets with one instruction, concurrently.
 
-        response = client.create_tweet(text=tweet_content)
+    Args:
+        tweets (Dict[int, Tweet]): The tweets to refine, keyed by their index.
+        refine_prompt (str): The refinement instructions applied to every tweet.
+        context (str): The context for the tweets.
 
-        if response and response.data and "id" in response.data:
-            tweet_id = response.data["id"]
-            print(f"✅ Tweet posted successfully! ID: {tweet_id}")
-            return True
-        else:
-            print(f"❌ Failed to post tweet. {response}")
-            return False
-    except Exception as e:
-        print(f"❌ Failed to post tweet. Error: {str(e)}")
-        traceback.print_exc()
-        return False
+    Yields:
+        Tuple[int, Tweet | None]: The index and refined tweet, in completion order.
+    """
+    if not tweets:
+        return
+    # Resolve the shared client on the script thread; workers only use it.
+    openai_client = get_openai_client()
+    with ThreadPoolExecutor(max_workers=min(MAX_REFINE_WORKERS, len(tweets))) as executor:
+        futures = {
+            executor.submit(refine_tweet, tweet, refine_prompt, context, openai_client): idx
+            for idx, tweet in tweets.items()
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+@st.cache_resource
+def get_posting_queue() -> PostingQueue:
+    """Returns the posting queue shared by every session; each session tracks its own job IDs."""
+    return PostingQueue()
+
+
+def enqueue_post(tweet_contents: List[str], api_key, api_secret, access_token, access_secret) -> str:
+    """
+    Queues a tweet, or a thread when several contents are given, for posting.
+
+    Posting happens on the shared worker pool with one reused client per
+    credential set, paced against the X API rate-limit headers.
+
+    Returns:
+        str: The job ID, stored in session state to track the post.
+    """
+    client = get_x_client(api_key, api_secret, access_token, access_secret)
+    return get_posting_queue().submit(tweet_contents, client)
+
+
+@st.fragment(run_every=POST_STATUS_REFRESH_SECONDS)
+def poll_post_status(job_id: str) -> None:
+    """Polls an active job; once it settles, a full rerun renders the result without polling."""
+    posting_queue = get_posting_queue()
+    if not posting_queue.is_active(job_id):
+        st.rerun()
+    status, _ = posting_queue.status(job_id)
+    posted, total, _ = posting_queue.progress(job_id)
+    progress = f" ({posted}/{total})" if total > 1 else ""
+    st.info(f"⏳ {status.capitalize()}{progress}...")
+
+
+def render_post_status(job_id: str) -> None:
+    posting_queue = get_posting_queue()
+    if posting_queue.is_active(job_id):
+        poll_post_status(job_id)
+        return
+    status, error = posting_queue.status(job_id)
+    posted, total, last_id = posting_queue.progress(job_id)
+    if status == POSTED:
+        st.success("✅ Thread Posted!" if total > 1 else "✅ Tweet Posted!")
+    elif total > 1 and posted:
+        st.error(f"❌ Thread stopped after {posted} of {total} tweets (last posted ID {last_id}). {error}")
+        if st.button("▶️ Resume Thread", key=f"resume_{job_id}"):
+            posting_queue.resume(job_id)
+            st.rerun()
+    else:
+        st.error(f"❌ Failed to post tweet. {error}")
 
 
 tweets_generated = []
@@ -151,6 +224,7 @@ def main():
     st.set_page_config(page_title="Tweet Stormer 🚀", page_icon="🐦", layout="wide")
 
     st.title("🚀 Tweet Stormer 🐦")
+    validate_openai_api_key(os.getenv("OPENAI_API_KEY"))
 
     st.caption(
         "Tweet Stormer is a Twitter Bot that generates Tweets based on a given context."
@@ -163,7 +237,6 @@ def main():
         user_api_secret = st.text_input("X API Secret", type="password")
         user_access_token = st.text_input("Access Token", type="password")
         user_access_secret = st.text_input("Access Secret", type="password")
-        user_bearer_token = st.text_input("Bearer Token", type="password")
 
     context = st.sidebar.text_input(
         "📝 Context", placeholder="Enter your context here..."
@@ -200,28 +273,53 @@ def main():
     if tweets and len(tweets) > 0:
         st.success("✅ Tweets Generated Successfully!")
 
+        batch_column1, batch_column2 = st.columns([1, 0.2])
+        batch_refine_prompt = batch_column1.text_input(
+            "🔧 Refine Selected Tweets",
+            placeholder="One instruction applied to every selected tweet.",
+            key="batch_refine_input",
+        )
+        batch_refine_button = batch_column2.button("🔧 Refine Selected", key="batch_refine")
+
+        x_credentials = [user_api_key, user_api_secret, user_access_token, user_access_secret]
+        thread_column1, thread_column2 = st.columns([1, 0.2])
+        if st.session_state.get("post_status_thread"):
+            with thread_column1:
+                render_post_status(st.session_state["post_status_thread"])
+        elif thread_column2.button("🧵 Post as Thread", key="post_thread"):
+            if not all(x_credentials):
+                st.error("❌ Please enter valid X API credentials before posting.")
+            else:
+                st.session_state["post_status_thread"] = enqueue_post(
+                    [tweet.content for tweet in tweets], *x_credentials
+                )
+                st.rerun()
+        st.markdown("---")
+
+        tweet_placeholders = {}
+        selected_tweets = {}
+
         for idx, tweet in enumerate(tweets):
             column1, column2 = st.columns([1, 0.2])
-            column1.markdown(f"🐦 {tweet.content}")
+            if column1.checkbox("Select", key=f"select_tweet_{idx}"):
+                selected_tweets[idx] = tweet
+            tweet_placeholders[idx] = column1.empty()
+            tweet_placeholders[idx].markdown(f"🐦 {tweet.content}")
 
             post_key = f"post_status_{idx}"
-            
-            if st.session_state.get(post_key, False):
-                column2.success("✅ Tweet Posted!")
+
+            if st.session_state.get(post_key):
+                with column2:
+                    render_post_status(st.session_state[post_key])
             else:
                 post_tweet_button = column2.button("🚀 Post Tweet", key=f"post_tweet_{idx}")
 
                 if post_tweet_button:
-                    if not all ([user_api_key, user_api_secret, user_access_token, user_access_secret, user_bearer_token]):
+                    if not all(x_credentials):
                         st.error("❌ Please enter valid X API credentials before posting.")
                     else:
-                        success = post_tweet(tweet.content, user_api_key, user_api_secret, user_access_token, user_access_secret, user_bearer_token)
-                        if success:
-                            st.session_state[post_key] = True
-                            st.success("✅ Tweet Posted Successfully!")
-                            st.rerun()
-                        else:
-                            st.error("❌ Failed to post tweet. Please try again.")
+                        st.session_state[post_key] = enqueue_post([tweet.content], *x_credentials)
+                        st.rerun()
 
             column1, column2 = st.columns([1, 2])
             refine_input_prompt = column1.text_input(
@@ -244,5 +342,24 @@ def main():
                     st.success("✅ Tweet Refined Successfully!")
                     st.rerun()
 
+        if batch_refine_button:
+            if not selected_tweets:
+                st.warning("❌ Please select at least one tweet to refine.")
+            elif not batch_refine_prompt:
+                st.warning("❌ Please enter refinement instructions.")
+            else:
+                for idx in selected_tweets:
+                    tweet_placeholders[idx].markdown(f"⏳ _Refining..._ 🐦 {tweets[idx].content}")
+                refined_count = 0
+                for idx, refined_tweet in refine_tweets_batch(selected_tweets, batch_refine_prompt, context):
+                    if not refined_tweet:
+                        tweet_placeholders[idx].markdown(f"❌ _Refinement failed._ 🐦 {tweets[idx].content}")
+                        continue
+                    refined_count += 1
+                    st.session_state.tweets_generated[idx] = refined_tweet
+                    st.session_state.pop(f"post_status_{idx}", None)
+                    tweet_placeholders[idx].markdown(f"✨ {refined_tweet.content}")
+                st.success(f"✅ Refined {refined_count} of {len(selected_tweets)} tweets!")
+
 if __name__ == "__main__":
     main()